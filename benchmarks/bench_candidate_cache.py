@@ -0,0 +1,73 @@
+"""
+Candidate enumeration with and without CandidateCache, on tokens drawn from
+a Zipfian word frequency distribution over a random vocabulary.
+
+Usage:
+PYTHONPATH=. python benchmarks/bench_candidate_cache.py
+"""
+
+import random
+import string
+import time
+
+import numpy as np
+
+from decepticonlp.transforms import candidate_cache
+from decepticonlp.transforms import perturbations
+
+VOCABULARY = 20000
+TOKENS = 50000
+ZIPF_EXPONENT = 1.1
+
+
+def main():
+    random.seed(0)
+    vocabulary = [
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(2, 10)))
+        for _ in range(VOCABULARY)
+    ]
+    # rank r is drawn with probability proportional to 1 / r ** ZIPF_EXPONENT
+    weights = 1 / np.arange(1, VOCABULARY + 1) ** ZIPF_EXPONENT
+    ranks = np.random.default_rng(0).choice(
+        VOCABULARY, size=TOKENS, p=weights / weights.sum()
+    )
+    tokens = [vocabulary[rank] for rank in ranks]
+
+    print("{} tokens, {} distinct words".format(len(tokens), len(set(tokens))))
+    print(
+        "{:>36} {:>10} {:>10} {:>9} {:>10}".format(
+            "", "plain (s)", "cached (s)", "hit rate", "MiB"
+        )
+    )
+    for perturbation, kwargs in [
+        (perturbations.TypoCharacterPerturbations(), {}),
+        (perturbations.DeleteCharacterPerturbations(), {"max_edits": 2}),
+        (perturbations.InsertSpaceCharacterPerturbations(), {"char_perturb": True}),
+    ]:
+        start = time.perf_counter()
+        for token in tokens:
+            for _ in perturbation.candidates(token, **kwargs):
+                pass
+        plain_seconds = time.perf_counter() - start
+
+        cache = candidate_cache.CandidateCache()
+        start = time.perf_counter()
+        for token in tokens:
+            for _ in cache.candidates(perturbation, token, **kwargs):
+                pass
+        cached_seconds = time.perf_counter() - start
+
+        stats = cache.stats()
+        print(
+            "{:>36} {:>10.2f} {:>10.2f} {:>9.3f} {:>10.1f}".format(
+                type(perturbation).__name__,
+                plain_seconds,
+                cached_seconds,
+                stats["hit_rate"],
+                stats["bytes"] / 2 ** 20,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compose with 1 to 10 stages, passing the text between transforms
+(tokenize=False) against splitting it once and passing the list of words
+(tokenize=True). Both modes are seeded alike and must give the same output.
+
+Usage:
+PYTHONPATH=. python benchmarks/bench_compose.py
+"""
+
+import random
+import string
+import time
+
+from decepticonlp.transforms import transforms
+
+SENTENCES = 2000
+REPEATS = 3
+
+
+def make_sentences():
+    return [
+        " ".join(
+            "".join(random.choices(string.ascii_lowercase, k=random.randint(1, 10)))
+            for _ in range(random.randint(10, 40))
+        )
+        for _ in range(SENTENCES)
+    ]
+
+
+def make_stages(count):
+    stages = [
+        transforms.AddChar(char_perturb=True),
+        transforms.ShuffleChar(mid=False),
+        transforms.DeleteChar(),
+        transforms.TypoChar(probability=0.3),
+        transforms.ShuffleChar(mid=True),
+    ]
+    return [stages[i % len(stages)] for i in range(count)]
+
+
+def run(tfms, sentences):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        outputs = [tfms(text, rng=i) for i, text in enumerate(sentences)]
+        best = min(best, time.perf_counter() - start)
+    return outputs, best
+
+
+def main():
+    random.seed(0)
+    sentences = make_sentences()
+    print(
+        "{:>7} {:>13} {:>13} {:>9}".format(
+            "stages", "string (s)", "tokens (s)", "speedup"
+        )
+    )
+    for count in range(1, 11):
+        stages = make_stages(count)
+        text_outputs, text_seconds = run(
+            transforms.Compose(stages, tokenize=False), sentences
+        )
+        token_outputs, token_seconds = run(
+            transforms.Compose(stages, tokenize=True), sentences
+        )
+        assert text_outputs == token_outputs
+        print(
+            "{:>7} {:>13.4f} {:>13.4f} {:>8.2f}x".format(
+                count, text_seconds, token_seconds, text_seconds / token_seconds
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
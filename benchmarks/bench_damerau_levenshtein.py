@@ -0,0 +1,96 @@
+"""
+Benchmark the array-backed Damerau-Levenshtein distance (unrestricted and
+restricted) against the list-of-lists implementation it replaced, for time
+and peak memory.
+
+Usage:
+PYTHONPATH=. python benchmarks/bench_damerau_levenshtein.py
+"""
+
+import random
+import string
+import timeit
+import tracemalloc
+
+from decepticonlp.metrics import char_metrics
+
+
+def damerau_levenshtein_lists(text1, text2):
+    """The previous (m+2)x(n+2) list-of-lists implementation."""
+    INF = len(text1) + len(text2)
+    matrix = [[INF for n in range(len(text2) + 2)]]
+    matrix += [[INF] + list(range(len(text2) + 1))]
+    matrix += [[INF, m] + [0] * len(text2) for m in range(1, len(text1) + 1)]
+    last_row = {}
+    for row in range(1, len(text1) + 1):
+        char_text1 = text1[row - 1]
+        last_match_column = 0
+        for col in range(1, len(text2) + 1):
+            char_text2 = text2[col - 1]
+            last_match_row = last_row.get(char_text2, 0)
+            cost_substitution = 0 if char_text1 == char_text2 else 1
+            matrix[row + 1][col + 1] = min(
+                matrix[row][col] + cost_substitution,
+                matrix[row + 1][col] + 1,
+                matrix[row][col + 1] + 1,
+            )
+            matrix[row + 1][col + 1] = min(
+                matrix[last_match_row][last_match_column]
+                + (row - last_match_row - 1)
+                + 1
+                + (col - last_match_column - 1),
+                matrix[row + 1][col + 1],
+            )
+            if cost_substitution == 0:
+                last_match_column = col
+        last_row[char_text1] = row
+    return matrix[-1][-1]
+
+
+def measure(function, number):
+    seconds = timeit.timeit(function, number=number) / number
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    random.seed(0)
+    damerau_levenshtein = char_metrics.DamerauLevenshtein()
+    implementations = [
+        ("lists", damerau_levenshtein_lists),
+        ("arrays", damerau_levenshtein.calculate),
+        (
+            "restricted",
+            lambda text1, text2: damerau_levenshtein.calculate(
+                text1, text2, restricted=True
+            ),
+        ),
+    ]
+    print(
+        "{:>6} {:>12} {:>12} {:>14}".format(
+            "length", "variant", "time (s)", "peak (KiB)"
+        )
+    )
+    for length in [10, 100, 500, 2000]:
+        text1 = "".join(random.choices(string.ascii_letters + " ", k=length))
+        chars = list(text1)
+        for _ in range(max(1, length // 10)):
+            index = random.randrange(length - 1)
+            chars[index], chars[index + 1] = chars[index + 1], chars[index]
+        text2 = "".join(chars)
+
+        number = max(1, 1000 // length)
+        for name, function in implementations:
+            seconds, peak = measure(lambda: function(text1, text2), number)
+            print(
+                "{:>6} {:>12} {:>12.6f} {:>14.1f}".format(
+                    length, name, seconds, peak / 1024
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
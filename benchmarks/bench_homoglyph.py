@@ -0,0 +1,69 @@
+"""
+Homoglyph substitution with the compiled SubstitutionTable (apply and
+apply_batch) against the previous per-character np.random.choice loop,
+on 1M random words.
+
+Usage:
+PYTHONPATH=. python benchmarks/bench_homoglyph.py
+"""
+
+import random
+import string
+import time
+
+import numpy as np
+
+from decepticonlp.transforms import perturbations
+
+NUM_WORDS = 1000000
+
+
+def per_character(homoglyph_dic, word):
+    """the implementation before the compiled table"""
+    char_list_glyph = []
+    for char in word:
+        if char in homoglyph_dic:
+            glyph_string = homoglyph_dic[char]
+            glyph_pick = np.random.choice(len(glyph_string), 1)[0]
+            char_list_glyph.append(glyph_string[glyph_pick])
+        else:
+            char_list_glyph.append(char)
+    return "".join(char_list_glyph)
+
+
+def main():
+    random.seed(0)
+    words = [
+        "".join(random.choices(string.ascii_letters, k=random.randint(1, 12)))
+        for _ in range(NUM_WORDS)
+    ]
+    viz = perturbations.VisuallySimilarCharacterPerturbations("homoglyph")
+
+    # the per-character loop is timed on a sample and extrapolated
+    sample = words[: NUM_WORDS // 20]
+    start = time.perf_counter()
+    for word in sample:
+        per_character(viz.homoglyph_dic, word)
+    loop_seconds = (time.perf_counter() - start) * len(words) / len(sample)
+
+    start = time.perf_counter()
+    for word in sample:
+        viz.apply(word)
+    apply_seconds = (time.perf_counter() - start) * len(words) / len(sample)
+
+    start = time.perf_counter()
+    viz.apply_batch(words)
+    batch_seconds = time.perf_counter() - start
+
+    print("{} words".format(len(words)))
+    print("{:>28} {:>10.2f} s (extrapolated)".format("per-character", loop_seconds))
+    print("{:>28} {:>10.2f} s (extrapolated)".format("apply", apply_seconds))
+    print(
+        "{:>28} {:>10.2f} s ({:.0f}x)".format(
+            "apply_batch", batch_seconds, loop_seconds / batch_seconds
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
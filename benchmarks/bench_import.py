@@ -0,0 +1,70 @@
+"""
+Measure the import time and peak RSS of the metrics in a fresh interpreter,
+to guard against heavy backends (TensorFlow) being imported eagerly again.
+
+Usage:
+PYTHONPATH=. python benchmarks/bench_import.py
+"""
+
+import subprocess
+import sys
+
+STATEMENTS = [
+    ("baseline", "pass"),
+    ("char_metrics", "from decepticonlp.metrics import char_metrics"),
+    (
+        "levenshtein",
+        "from decepticonlp.metrics import char_metrics\n"
+        "char_metrics.Levenshtein().calculate('Word', 'Wordy')",
+    ),
+    ("transforms", "from decepticonlp.transforms import transforms"),
+    (
+        "semantic (encoder load)",
+        "from decepticonlp.metrics import char_metrics\n" "import tensorflow_hub",
+    ),
+]
+
+PROBE = """
+import resource, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(seconds, rss, 'tensorflow' in sys.modules)
+"""
+
+
+def measure(statement, repeat=3):
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement)],
+            check=True,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        ).stdout.split()
+        runs.append((float(output[0]), int(output[1]), output[2] == "True"))
+    return min(runs)
+
+
+def main():
+    print(
+        "{:>24} {:>12} {:>14} {:>12}".format(
+            "import", "time (s)", "max RSS (MiB)", "tensorflow"
+        )
+    )
+    for name, statement in STATEMENTS:
+        try:
+            seconds, rss, tensorflow = measure(statement)
+        except subprocess.CalledProcessError:
+            print("{:>24} {:>12}".format(name, "unavailable"))
+            continue
+        print(
+            "{:>24} {:>12.3f} {:>14.1f} {:>12}".format(
+                name, seconds, rss / 1024, str(tensorflow)
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
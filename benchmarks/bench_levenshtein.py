@@ -0,0 +1,66 @@
+"""
+Benchmark the bit-parallel Levenshtein engine against the dynamic
+programming implementation it replaced.
+
+Usage:
+PYTHONPATH=. python benchmarks/bench_levenshtein.py
+"""
+
+import random
+import string
+import timeit
+
+import numpy as np
+
+from decepticonlp.metrics import char_metrics
+
+
+def levenshtein_dp(text1, text2):
+    """The previous O(m*n) numpy matrix implementation."""
+    size_x, size_y = len(text1) + 1, len(text2) + 1
+    matrix = np.zeros((size_x, size_y))
+    x, y = np.arange(size_x), np.arange(size_y)
+    matrix[x, 0] = x
+    matrix[0, y] = y
+
+    for x in range(1, size_x):
+        for y in range(1, size_y):
+            if text1[x - 1] == text2[y - 1]:
+                matrix[x, y] = min(
+                    matrix[x - 1, y] + 1, matrix[x - 1, y - 1], matrix[x, y - 1] + 1
+                )
+            else:
+                matrix[x, y] = min(
+                    matrix[x - 1, y] + 1,
+                    matrix[x - 1, y - 1] + 1,
+                    matrix[x, y - 1] + 1,
+                )
+    return matrix[size_x - 1, size_y - 1]
+
+
+def perturb(text, edits):
+    chars = list(text)
+    for _ in range(edits):
+        chars[random.randrange(len(chars))] = random.choice(string.ascii_letters)
+    return "".join(chars)
+
+
+def main():
+    random.seed(0)
+    levenshtein = char_metrics.Levenshtein()
+    print("{:>6} {:>14} {:>14} {:>10}".format("length", "dp (s)", "bit (s)", "speedup"))
+    for length in [5, 50, 500, 1000, 5000]:
+        text1 = "".join(random.choices(string.ascii_letters + " ", k=length))
+        text2 = perturb(text1, max(1, length // 10))
+        assert levenshtein_dp(text1, text2) == levenshtein.calculate(text1, text2)
+
+        number = max(1, 2000 // length)
+        dp_number = max(1, number // 100) if length > 50 else number
+        dp = timeit.timeit(lambda: levenshtein_dp(text1, text2), number=dp_number)
+        bit = timeit.timeit(lambda: levenshtein.calculate(text1, text2), number=number)
+        dp, bit = dp / dp_number, bit / number
+        print("{:>6} {:>14.6f} {:>14.6f} {:>9.1f}x".format(length, dp, bit, dp / bit))
+
+
+if __name__ == "__main__":
+    main()
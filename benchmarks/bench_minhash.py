@@ -0,0 +1,90 @@
+"""
+Accuracy versus speed of MinHash/LSH near-duplicate search against
+exact all-pairs Jaccard.calculate, on a corpus of perturbed sentences.
+
+Usage:
+PYTHONPATH=. python benchmarks/bench_minhash.py
+"""
+
+import random
+import string
+import time
+
+from decepticonlp.metrics import char_metrics
+from decepticonlp.metrics import minhash
+from decepticonlp.transforms import perturbations
+
+THRESHOLD = 0.3
+NGRAMS = 3
+
+
+def make_corpus(originals, variants):
+    typo = perturbations.TypoCharacterPerturbations()
+    corpus = []
+    for _ in range(originals):
+        words = [
+            "".join(random.choices(string.ascii_lowercase, k=random.randint(2, 9)))
+            for _ in range(random.randint(6, 14))
+        ]
+        corpus.append(" ".join(words))
+        for _ in range(variants):
+            perturbed = list(words)
+            index = random.randrange(len(perturbed))
+            perturbed[index] = typo.apply(perturbed[index], probability=0.3)
+            corpus.append(" ".join(perturbed))
+    return corpus
+
+
+def main():
+    random.seed(0)
+    jaccard = char_metrics.Jaccard()
+    corpus = make_corpus(originals=400, variants=4)
+    queries = random.sample(range(len(corpus)), 50)
+
+    start = time.perf_counter()
+    exact = {
+        query: {
+            i
+            for i, text in enumerate(corpus)
+            if jaccard.calculate(corpus[query], text, ngrams=NGRAMS) < THRESHOLD
+        }
+        for query in queries
+    }
+    exact_seconds = time.perf_counter() - start
+
+    print(
+        "{:>9} {:>7} {:>12} {:>12} {:>8} {:>10}".format(
+            "num_perm", "bands", "index (s)", "query (s)", "recall", "precision"
+        )
+    )
+    for num_perm in [32, 64, 128, 256]:
+        start = time.perf_counter()
+        index = minhash.LSHIndex(
+            threshold=THRESHOLD, minhash=minhash.MinHash(num_perm, ngrams=NGRAMS)
+        )
+        index.add_many(range(len(corpus)), corpus)
+        index_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = {
+            query: {key for key, _ in index.query(corpus[query])} for query in queries
+        }
+        query_seconds = time.perf_counter() - start
+
+        true_positives = sum(len(found[q] & exact[q]) for q in queries)
+        recall = true_positives / sum(len(exact[q]) for q in queries)
+        precision = true_positives / max(1, sum(len(found[q]) for q in queries))
+        print(
+            "{:>9} {:>7} {:>12.4f} {:>12.4f} {:>8.3f} {:>10.3f}".format(
+                num_perm, index.bands, index_seconds, query_seconds, recall, precision
+            )
+        )
+    print(
+        "exact Jaccard, {} queries x {} texts: {:.4f} s".format(
+            len(queries), len(corpus), exact_seconds
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
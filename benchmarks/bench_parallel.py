@@ -0,0 +1,84 @@
+"""
+Throughput of a five stage Compose run by ParallelAugmenter on 1 to N
+worker processes (N = os.cpu_count()), against the single process
+StreamAugmenter. Outputs must be identical for every worker count.
+
+Usage:
+PYTHONPATH=. python benchmarks/bench_parallel.py
+"""
+
+import os
+import random
+import string
+import time
+
+from decepticonlp.pipeline import parallel
+from decepticonlp.pipeline import stream
+from decepticonlp.transforms import transforms
+
+SENTENCES = 20000
+SEED = 0
+
+
+def make_sentences():
+    return [
+        " ".join(
+            "".join(random.choices(string.ascii_lowercase, k=random.randint(1, 10)))
+            for _ in range(random.randint(10, 40))
+        )
+        for _ in range(SENTENCES)
+    ]
+
+
+def make_pipeline():
+    return transforms.Compose(
+        [
+            transforms.AddChar(char_perturb=True),
+            transforms.ShuffleChar(mid=False),
+            transforms.DeleteChar(),
+            transforms.TypoChar(probability=0.3),
+            transforms.VisuallySimilarChar(),
+        ]
+    )
+
+
+def main():
+    random.seed(0)
+    sentences = make_sentences()
+
+    start = time.perf_counter()
+    expected = list(stream.StreamAugmenter(make_pipeline(), seed=SEED)(sentences))
+    baseline = time.perf_counter() - start
+
+    print(
+        "{:>8} {:>10} {:>14} {:>9} {:>12}".format(
+            "workers", "time (s)", "sentences/s", "speedup", "mean chunk"
+        )
+    )
+    print(
+        "{:>8} {:>10.3f} {:>14.0f} {:>8.2f}x {:>12}".format(
+            "stream", baseline, SENTENCES / baseline, 1.0, "-"
+        )
+    )
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        augmenter = parallel.ParallelAugmenter(
+            make_pipeline(), workers=workers, seed=SEED
+        )
+        start = time.perf_counter()
+        output = list(augmenter(sentences))
+        seconds = time.perf_counter() - start
+        assert output == expected
+        chunks = augmenter.chunk_sizes
+        print(
+            "{:>8} {:>10.3f} {:>14.0f} {:>8.2f}x {:>12.0f}".format(
+                workers,
+                seconds,
+                SENTENCES / seconds,
+                baseline / seconds,
+                sum(chunks) / len(chunks),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Throughput of CharacterPerturbations.apply_batch against calling apply
+once per word, on a list of random lowercase words.
+
+Usage:
+PYTHONPATH=. python benchmarks/bench_perturb_batch.py
+"""
+
+import random
+import string
+import time
+
+from decepticonlp.transforms import perturbations
+
+NUM_WORDS = 200000
+
+
+def main():
+    random.seed(0)
+    words = [
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(1, 12)))
+        for _ in range(NUM_WORDS)
+    ]
+    print("{:>45} {:>10} {:>10} {:>8}".format("", "apply (s)", "batch (s)", "speedup"))
+    for perturbation, kwargs in [
+        (perturbations.InsertSpaceCharacterPerturbations(), {}),
+        (perturbations.ShuffleCharacterPerturbations(), {}),
+        (perturbations.ShuffleCharacterPerturbations(), {"mid": False}),
+        (perturbations.DeleteCharacterPerturbations(), {}),
+        (perturbations.TypoCharacterPerturbations(), {"probability": 0.3}),
+    ]:
+        start = time.perf_counter()
+        [perturbation.apply(word, **kwargs) for word in words]
+        loop_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        perturbation.apply_batch(words, **kwargs)
+        batch_seconds = time.perf_counter() - start
+
+        name = type(perturbation).__name__ + "".join(
+            " {}={}".format(key, value) for key, value in kwargs.items()
+        )
+        print(
+            "{:>45} {:>10.3f} {:>10.3f} {:>7.1f}x".format(
+                name, loop_seconds, batch_seconds, loop_seconds / batch_seconds
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
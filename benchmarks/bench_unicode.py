@@ -0,0 +1,74 @@
+"""
+Combining-mark ("unicode" mode) perturbation with the interleaved int32
+buffer (combine_word, apply and apply_batch) against the previous np.char.add
+implementation, on random words.
+
+Usage:
+PYTHONPATH=. python benchmarks/bench_unicode.py
+"""
+
+import random
+import string
+import time
+
+import numpy as np
+
+from decepticonlp.transforms import glyphs
+from decepticonlp.transforms import perturbations
+
+NUM_WORDS = 200000
+
+
+def np_char(word):
+    """the implementation before the interleaved buffer"""
+    unicode_array = np.array(
+        [u"\u0301", u"\u0310", u"\u0305", u"\u0315", u"\u0312", u"\u0302"]
+    )
+    char_array = np.array(list(word))
+    picked_unicode = np.random.choice(unicode_array, size=len(word))
+    perturbed_array = np.char.add(char_array, picked_unicode)
+    return "".join(perturbed_array)
+
+
+def main():
+    random.seed(0)
+    words = [
+        "".join(random.choices(string.ascii_letters, k=random.randint(1, 12)))
+        for _ in range(NUM_WORDS)
+    ]
+    viz = perturbations.VisuallySimilarCharacterPerturbations("unicode")
+
+    start = time.perf_counter()
+    for word in words:
+        np_char(word)
+    char_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for word in words:
+        glyphs.combine_word(word, viz.marks)
+    word_seconds = time.perf_counter() - start
+
+    # apply also draws the method for every word
+    start = time.perf_counter()
+    for word in words:
+        viz.apply(word)
+    apply_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    viz.apply_batch(words)
+    batch_seconds = time.perf_counter() - start
+
+    print("{} words".format(len(words)))
+    for name, seconds in [
+        ("np.char.add", char_seconds),
+        ("combine_word", word_seconds),
+        ("apply", apply_seconds),
+        ("apply_batch", batch_seconds),
+    ]:
+        print(
+            "{:>14} {:>8.2f} s {:>7.1f}x".format(name, seconds, char_seconds / seconds)
+        )
+
+
+if __name__ == "__main__":
+    main()
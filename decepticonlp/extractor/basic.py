@@ -1,5 +1,8 @@
 import abc
-import random
+
+import numpy as np
+
+from decepticonlp.utils import randomness
 
 
 class ImportantWordExtractor(metaclass=abc.ABCMeta):
@@ -10,6 +13,8 @@ class ImportantWordExtractor(metaclass=abc.ABCMeta):
         -------
         extract(self, words: list, **kwargs)
             returns the index of important words in the list.
+        extract_buffer(self, buffer: TokenBuffer, **kwargs)
+            returns the token indices of important words in every sentence.
     """
 
     @abc.abstractmethod
@@ -17,6 +22,21 @@ class ImportantWordExtractor(metaclass=abc.ABCMeta):
         """Extracts Important Word and returns the Index."""
         raise NotImplementedError
 
+    def extract_buffer(self, buffer, eligible=None, **kwargs):
+        """
+            Extracts the important words of every sentence of a TokenBuffer.
+            eligible is an optional boolean mask over the tokens.
+            returns an int64 array of token indices into the buffer
+        """
+        indices = []
+        for sentence in range(len(buffer)):
+            first, last = buffer.sentence_offsets[sentence : sentence + 2].tolist()
+            words = buffer.tokens(sentence)
+            mask = None if eligible is None else eligible[first:last]
+            extracted = self.extract(words, eligible=mask, **kwargs)
+            indices.extend(first + index for index in extracted)
+        return np.array(indices, dtype=np.int64)
+
     def empty_error_msg(self):
         return "given list of words is empty or invalid"
 
@@ -30,18 +50,64 @@ class RandomImportantWordExtractor(ImportantWordExtractor):
 
         Methods
         -------
-        extract(self, words: list, top_k = 1, **kwargs)
+        extract(self, words: list, top_k = 1, eligible = None, **kwargs)
             - extracts top_k random words and returns their index.
+        extract_buffer(self, buffer: TokenBuffer, top_k = 1, **kwargs)
+            - extracts top_k random words of every sentence at once.
         
         Parameters
         --------
         words - List of words.
         top_k - Number of words to be extracted
+        rng - None (global random state), a seed or a np.random.Generator
+        eligible - None, a boolean mask of the words that may be extracted, or
+            a predicate called on the drawn words only; fewer than top_k
+            indices are returned if fewer words are eligible
     """
 
-    def extract(self, words: list, top_k=1, **kwargs):
+    def extract(self, words: list, top_k=1, rng=None, eligible=None, **kwargs):
 
         assert len(words) > 0, self.empty_error_msg()
         assert len(words) >= top_k, self.word_less_than_k()
 
-        return random.sample(range(len(words)), top_k)
+        rng = randomness.get_rng(rng)
+        indices = rng.sample(range(len(words)), top_k)
+        if eligible is None:
+            return indices
+
+        def check(index):
+            return eligible(words[index]) if callable(eligible) else eligible[index]
+
+        kept = [index for index in indices if check(index)]
+        if len(kept) == top_k:
+            return indices
+
+        # keep the eligible picks and walk the other words in random order
+        # until enough are eligible, so seeded outputs only change where they
+        # were no-ops and only the words looked at are checked
+        drawn = set(indices)
+        remaining = [index for index in range(len(words)) if index not in drawn]
+        for index in rng.sample(remaining, len(remaining)):
+            if check(index):
+                kept.append(index)
+                if len(kept) == top_k:
+                    break
+        return kept
+
+    def extract_buffer(self, buffer, top_k=1, rng=None, eligible=None, **kwargs):
+
+        counts = np.diff(buffer.sentence_offsets)
+        assert len(counts) > 0 and counts.min() > 0, self.empty_error_msg()
+        assert counts.min() >= top_k, self.word_less_than_k()
+
+        # rank the tokens of every sentence by a random key, keep the top_k;
+        # ineligible tokens get keys above every eligible one and are dropped
+        keys = randomness.get_rng(rng).random(buffer.num_tokens)
+        if eligible is not None:
+            keys = np.where(eligible, keys, 2.0)
+        order = np.lexsort((keys, buffer.sentence_ids()))
+        ranks = np.arange(len(order)) - np.repeat(buffer.sentence_offsets[:-1], counts)
+        selected = ranks < top_k
+        if eligible is not None:
+            selected &= eligible[order]
+        return np.sort(order[selected])
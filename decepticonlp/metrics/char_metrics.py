@@ -2,10 +2,334 @@ import abc
 import math
 import random
 import string
+import threading
 import numpy as np
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import tensorflow as tf
-import tensorflow_hub as hub
+
+
+def _pattern_masks(text: str):
+    """
+        Returns a dict mapping every character of text to a bitmask
+        with bit i set wherever text[i] is that character.
+    """
+    masks = {}
+    bit = 1
+    for char in text:
+        masks[char] = masks.get(char, 0) | bit
+        bit <<= 1
+    return masks
+
+
+def _bit_parallel_levenshtein(text1: str, text2: str, masks=None):
+    """
+        Levenshtein distance using the bit-vector algorithm of Myers (1999),
+        in the formulation of Hyyro (2001).
+
+        A column of the DP matrix is encoded as two bit-vectors of vertical
+        deltas (+1 / -1), so each character of text2 costs a constant number
+        of word operations. Python integers are used as the bit-vectors: they
+        are a single machine word for short strings and transparently become
+        multi-word for long ones.
+
+        :params
+        :text1 : The pattern, encoded into bitmasks
+        :text2 : The text scanned column by column
+        :masks : Optional precomputed _pattern_masks(text1)
+
+        returns levenshtein distance
+        :return type: int
+    """
+    if not text1:
+        return len(text2)
+    if not text2:
+        return len(text1)
+    if masks is None:
+        masks = _pattern_masks(text1)
+
+    length = len(text1)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    vp, vn = full, 0
+    distance = length
+
+    for char in text2:
+        x = masks.get(char, 0) | vn
+        d0 = ((((x & vp) + vp) & full) ^ vp) | x
+        hp = vn | (~(d0 | vp) & full)
+        hn = vp & d0
+        if hp & last:
+            distance += 1
+        elif hn & last:
+            distance -= 1
+        x = ((hp << 1) | 1) & full
+        vn = x & d0
+        vp = ((hn << 1) & full) | (~(x | d0) & full)
+
+    return distance
+
+
+def _dense_ids(text1: str, text2: str):
+    """
+        Maps the characters of both strings to dense integer ids 0..A-1.
+        returns (ids of text1, ids of text2, alphabet size A)
+    """
+    alphabet = {}
+    ids1 = array("i", [alphabet.setdefault(char, len(alphabet)) for char in text1])
+    ids2 = array("i", [alphabet.setdefault(char, len(alphabet)) for char in text2])
+    return ids1, ids2, len(alphabet)
+
+
+def _damerau_levenshtein(text1: str, text2: str):
+    """
+        Unrestricted Damerau-Levenshtein distance (Lowrance-Wagner).
+
+        Rows are typed int arrays and the alphabet is remapped to dense ids,
+        so the last-occurrence table is an array. A transposition only ever
+        reads the row preceding the last occurrence of a character, hence
+        only one row per distinct character is kept alive instead of the
+        whole (m+2)x(n+2) matrix: O(min(A, m)*n) memory.
+
+        :return type: int
+    """
+    ids1, ids2, alphabet_size = _dense_ids(text1, text2)
+    len2 = len(text2)
+
+    # INF = number greater than maximum possible distance
+    INF = len(text1) + len2
+
+    # matrix rows have len(text2) + 2 entries, matrix[0] is all INF
+    blank = array("i", [INF]) * (len2 + 2)
+    previous = array("i", [INF]) + array("i", range(len2 + 1))
+
+    # row where each element was last encountered, and the matrix row before it
+    last_row = array("i", [0]) * alphabet_size
+    row_before_last = [blank] * alphabet_size
+
+    # fill in costs
+    for row in range(1, len(text1) + 1):
+        char_text1 = ids1[row - 1]
+        current = array("i", blank)
+        current[1] = row
+
+        # column where this particular element was last matched
+        last_match_column = 0
+
+        for col in range(1, len2 + 1):
+            char_text2 = ids2[col - 1]
+
+            # substitution, addition, deletion
+            if char_text1 == char_text2:
+                value = previous[col]
+            else:
+                value = previous[col] + 1
+            if current[col] < value:
+                value = current[col] + 1
+            if previous[col + 1] < value:
+                value = previous[col + 1] + 1
+
+            # transposition
+            last_match_row = last_row[char_text2]
+            transposition = (
+                row_before_last[char_text2][last_match_column]
+                + (row - last_match_row - 1)
+                + 1
+                + (col - last_match_column - 1)
+            )
+            if transposition < value:
+                value = transposition
+
+            current[col + 1] = value
+            if char_text1 == char_text2:
+                last_match_column = col
+
+        last_row[char_text1] = row
+        row_before_last[char_text1] = previous
+        previous = current
+
+    return previous[-1]
+
+
+def _optimal_string_alignment(text1: str, text2: str):
+    """
+        Restricted Damerau-Levenshtein (optimal string alignment) distance,
+        where no substring is edited more than once.
+        Needs only three rolling typed rows: O(n) memory.
+
+        :return type: int
+    """
+    ids1, ids2, _ = _dense_ids(text1, text2)
+    len2 = len(text2)
+
+    before_previous = array("i", [0]) * (len2 + 1)
+    previous = array("i", range(len2 + 1))
+    current = array("i", [0]) * (len2 + 1)
+
+    for row in range(1, len(text1) + 1):
+        char_text1 = ids1[row - 1]
+        current[0] = row
+        for col in range(1, len2 + 1):
+            char_text2 = ids2[col - 1]
+
+            # substitution, addition, deletion
+            if char_text1 == char_text2:
+                value = previous[col - 1]
+            else:
+                value = previous[col - 1] + 1
+            if current[col - 1] < value:
+                value = current[col - 1] + 1
+            if previous[col] < value:
+                value = previous[col] + 1
+
+            # transposition of two adjacent characters
+            if (
+                row > 1
+                and col > 1
+                and char_text1 == ids2[col - 2]
+                and ids1[row - 2] == char_text2
+                and before_previous[col - 2] + 1 < value
+            ):
+                value = before_previous[col - 2] + 1
+
+            current[col] = value
+        before_previous, previous, current = previous, current, before_previous
+
+    return previous[len2]
+
+
+# The banded DP runs in pure Python, one step per cell, while the bit-parallel
+# engine handles ~30 cells per (C-level) integer operation. Banding only pays
+# off for Levenshtein when the band is this many times narrower than the text.
+_BANDED_LEVENSHTEIN_RATIO = 256
+
+
+def _banded_edit_distance(
+    text1: str, text2: str, max_distance: int, transpositions=False, restricted=False
+):
+    """
+        Edit distance restricted to the diagonal band |i - j| <= max_distance,
+        with early termination.
+
+        Returns the exact distance when it is at most max_distance and
+        max_distance + 1 otherwise. Strings whose lengths differ by more than
+        max_distance are rejected without any DP, only the 2k+1 cells of the
+        band are computed per row and the computation stops as soon as a whole
+        row exceeds max_distance (row minima never decrease).
+        O(k*min(m,n)) complexity.
+
+        :params
+        :text1 : First string to be compared
+        :text2 : Second string to be compared
+        :max_distance : The edit budget k
+        :transpositions : If True, computes the (unrestricted) Damerau-Levenshtein distance
+        :restricted : If True (with transpositions), computes the optimal string alignment distance
+
+        :return type: int
+    """
+    len1, len2 = len(text1), len(text2)
+    cutoff = max_distance + 1
+    if abs(len1 - len2) > max_distance:
+        return cutoff
+
+    # row[j - i + band] holds D[i][j], values are capped at cutoff
+    band = max_distance
+    width = 2 * band + 1
+    row = [cutoff] * width
+    for col in range(min(band, len2) + 1):
+        row[col + band] = col
+    rows = [row]
+    before_previous = [cutoff] * width
+
+    # row where each element was last encountered
+    last_row = {}
+
+    for i in range(1, len1 + 1):
+        char_text1 = text1[i - 1]
+        previous, row = row, [cutoff] * width
+        row_min = cutoff
+        if i <= band:
+            row[band - i] = row_min = i
+
+        # column where this particular element was last matched
+        last_match_column = 0
+
+        for j in range(max(1, i - band), min(len2, i + band) + 1):
+            idx = j - i + band
+            char_text2 = text2[j - 1]
+
+            # substitution, deletion, insertion
+            value = previous[idx] + (char_text1 != char_text2)
+            if idx + 1 < width and previous[idx + 1] < value:
+                value = previous[idx + 1] + 1
+            if idx and row[idx - 1] < value:
+                value = row[idx - 1] + 1
+
+            if transpositions and restricted:
+                # D[i - 2][j - 2] shares the band offset of D[i][j]
+                if (
+                    i > 1
+                    and j > 1
+                    and char_text1 == text2[j - 2]
+                    and text1[i - 2] == char_text2
+                    and before_previous[idx] + 1 < value
+                ):
+                    value = before_previous[idx] + 1
+            elif transpositions:
+                last_match_row = last_row.get(char_text2, 0)
+                if last_match_row and last_match_column:
+                    # D[last_match_row - 1][last_match_column - 1], if it is in the band
+                    prior = last_match_column - last_match_row + band
+                    if 0 <= prior < width:
+                        value = min(
+                            value,
+                            rows[last_match_row - 1][prior]
+                            + (i - last_match_row)
+                            + (j - last_match_column - 1),
+                        )
+                if char_text1 == char_text2:
+                    last_match_column = j
+
+            if value > cutoff:
+                value = cutoff
+            row[idx] = value
+            if value < row_min:
+                row_min = value
+
+        if row_min > max_distance:
+            return cutoff
+        before_previous = previous
+        if transpositions and not restricted:
+            rows.append(row)
+            last_row[char_text1] = i
+
+    return row[len2 - len1 + band]
+
+
+def _normalize_distance(distance, length1, length2, normalize):
+    """Applies the "sum"/"lcs"/"none" normalisation shared by the edit distances."""
+    if normalize == "sum":
+        return distance / (length1 + length2)
+    elif normalize == "lcs":
+        return distance / max(length1, length2)
+    else:
+        return distance
+
+
+def _ngram_set(text: str, ngrams: int):
+    """Returns the set of character n-grams (as tuples) of text."""
+    return {tuple(text[i : i + ngrams]) for i in range(len(text) - ngrams + 1)}
+
+
+def _split_chunks(items, chunks):
+    """Splits items into at most `chunks` contiguous, nearly equal parts."""
+    size = -(-len(items) // chunks)
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _run_chunk(metric, method, args, kwargs):
+    """Process pool entry point: runs metric.method(*args, workers=1, **kwargs)."""
+    return getattr(metric, method)(*args, workers=1, **kwargs)
 
 
 class CharacterMetrics(metaclass=abc.ABCMeta):
@@ -15,6 +339,10 @@ class CharacterMetrics(metaclass=abc.ABCMeta):
         -------
         apply(self, text1: str, text2: str, **kwargs)
             - calculates the similarity/distance between two strings using the appropriate metric.
+        cdist(self, queries: list, choices: list, workers=1, **kwargs)
+            - calculates the metric for every (query, choice) pair and returns a matrix.
+        calculate_many(self, texts1: list, texts2: list, workers=1, **kwargs)
+            - calculates the metric for aligned pairs and returns a 1-D array.
     """
 
     @abc.abstractmethod
@@ -25,6 +353,115 @@ class CharacterMetrics(metaclass=abc.ABCMeta):
     def get_ignore_default_value(self):
         return True
 
+    def _prepare(self, text: str, **kwargs):
+        """
+            Precomputes the per-string state used by _calculate_prepared.
+            Subclasses override this to build bitmasks, n-gram sets etc. once per string.
+        """
+        return text
+
+    def _calculate_prepared(self, prepared1, prepared2, **kwargs):
+        """Calculates the metric from two values returned by _prepare."""
+        return self.calculate(prepared1, prepared2, **kwargs)
+
+    def _prepare_key(self, **kwargs):
+        """
+            Identifies the representation built by _prepare, so that metrics
+            producing the same state from the same text can share it.
+        """
+        return ("text",)
+
+    def cdist(self, queries, choices, workers=1, **kwargs):
+        """
+            Calculates the metric between every query and every choice.
+            Every string is preprocessed only once.
+
+            Example:
+            lev = Levenshtein()
+            print(lev.cdist(["Hey", "Word"], ["HEY", "Wordy", "Hey"]))
+            [[2. 4. 0.]
+             [4. 1. 4.]]
+
+            :params
+            :queries: list of strings, one row of the result each
+            :choices: list of strings, one column of the result each
+            :workers: number of processes the queries are split across
+            :kwargs: passed on to calculate (normalize, ngrams, norm, ...)
+            :type queries: list
+            :type choices: list
+            :type workers: int
+
+            returns a (len(queries), len(choices)) matrix
+            :return type: numpy.ndarray
+        """
+        queries, choices = list(queries), list(choices)
+        if workers > 1 and len(queries) > 1:
+            chunks = _split_chunks(queries, workers)
+            with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+                futures = [
+                    pool.submit(_run_chunk, self, "cdist", (chunk, choices), kwargs)
+                    for chunk in chunks
+                ]
+                return np.vstack([future.result() for future in futures])
+        return self._cdist(queries, choices, **kwargs)
+
+    def calculate_many(self, texts1, texts2, workers=1, **kwargs):
+        """
+            Calculates the metric between texts1[i] and texts2[i] for every i.
+            Repeated strings (e.g. an original with many perturbations) are preprocessed only once.
+
+            Example:
+            lev = Levenshtein()
+            print(lev.calculate_many(["Word", "Word"], ["Wordy", "Wrod"]))
+            [1. 2.]
+
+            :params
+            :texts1: list of first strings
+            :texts2: list of second strings, aligned with texts1
+            :workers: number of processes the pairs are split across
+            :kwargs: passed on to calculate (normalize, ngrams, norm, ...)
+            :type texts1: list
+            :type texts2: list
+            :type workers: int
+
+            returns a (len(texts1),) array
+            :return type: numpy.ndarray
+        """
+        texts1, texts2 = list(texts1), list(texts2)
+        assert len(texts1) == len(texts2), "texts1 and texts2 must be of equal length"
+        if workers > 1 and len(texts1) > 1:
+            chunks = list(
+                zip(_split_chunks(texts1, workers), _split_chunks(texts2, workers))
+            )
+            with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+                futures = [
+                    pool.submit(_run_chunk, self, "calculate_many", chunk, kwargs)
+                    for chunk in chunks
+                ]
+                return np.concatenate([future.result() for future in futures])
+        return self._calculate_many(texts1, texts2, **kwargs)
+
+    def _cdist(self, queries, choices, **kwargs):
+        prepared_queries = [self._prepare(text, **kwargs) for text in queries]
+        prepared_choices = [self._prepare(text, **kwargs) for text in choices]
+        matrix = np.empty((len(queries), len(choices)))
+        for i, prepared1 in enumerate(prepared_queries):
+            for j, prepared2 in enumerate(prepared_choices):
+                matrix[i, j] = self._calculate_prepared(prepared1, prepared2, **kwargs)
+        return matrix
+
+    def _calculate_many(self, texts1, texts2, **kwargs):
+        prepared = {}
+        for text in texts1 + texts2:
+            if text not in prepared:
+                prepared[text] = self._prepare(text, **kwargs)
+        result = np.empty(len(texts1))
+        for i, (text1, text2) in enumerate(zip(texts1, texts2)):
+            result[i] = self._calculate_prepared(
+                prepared[text1], prepared[text2], **kwargs
+            )
+        return result
+
 
 class Levenshtein(CharacterMetrics):
     """
@@ -36,10 +473,12 @@ class Levenshtein(CharacterMetrics):
             - calculates levenshtein distance and returns the same
     """
 
-    def calculate(self, text1: str, text2: str, normalize="none", **kwargs):
+    def calculate(
+        self, text1: str, text2: str, normalize="none", max_distance=None, **kwargs
+    ):
         """
-        Calculate Levenshtein Distance using dynamic programming optimized with (np)
-        DP - O(m*n) complexity - Recursive approach - O(3^m)
+        Calculate Levenshtein Distance using the bit-parallel algorithm of Myers/Hyyro
+        O(ceil(m/w)*n) complexity, w being the machine word size - DP - O(m*n)
 
         Example:
         from perturb import levenshtein
@@ -54,14 +493,21 @@ class Levenshtein(CharacterMetrics):
         print(levenshtein("HeyS", "HEY", normalize="lcs"))
         0.75
 
+        #Edit budget - distances above max_distance are reported as max_distance + 1
+        print(levenshtein("Hey", "HEY", max_distance=1))
+        2.0
+
 
         :params
         :text1 : First string to be compared
         :text2 : Second string to be compared
         :normalize: pass "sum" for total Levenshtein distance, "lcs" for maximum normalization, "none" default
+        :max_distance: default (None), if given, the distance is only computed exactly up to max_distance.
+                       Larger distances are returned as max_distance + 1 (before normalization).
         :type text1: String
         :type text2: String
         :type normalize: String
+        :type max_distance: int
 
         returns levenshtein distance
         :return type: float
@@ -71,31 +517,35 @@ class Levenshtein(CharacterMetrics):
         https://stackoverflow.com/questions/45783385/normalizing-the-edit-distance
         """
 
-        size_x, size_y = len(text1) + 1, len(text2) + 1
-        matrix = np.zeros((size_x, size_y))
-        x, y = np.arange(size_x), np.arange(size_y)
-        matrix[x, 0] = x
-        matrix[0, y] = y
-
-        for x in range(1, size_x):
-            for y in range(1, size_y):
-                if text1[x - 1] == text2[y - 1]:
-                    matrix[x, y] = min(
-                        matrix[x - 1, y] + 1, matrix[x - 1, y - 1], matrix[x, y - 1] + 1
-                    )
-                else:
-                    matrix[x, y] = min(
-                        matrix[x - 1, y] + 1,
-                        matrix[x - 1, y - 1] + 1,
-                        matrix[x, y - 1] + 1,
-                    )
-        distance = matrix[size_x - 1, size_y - 1]
-        if normalize == "sum":
-            return distance / (size_x + size_y - 2)
-        elif normalize == "lcs":
-            return distance / (max(size_x, size_y) - 1)
+        return self._calculate_prepared(
+            (text1, None), (text2, None), normalize, max_distance
+        )
+
+    def _prepare(self, text: str, **kwargs):
+        return text, _pattern_masks(text)
+
+    def _prepare_key(self, **kwargs):
+        return ("pattern_masks",)
+
+    def _calculate_prepared(
+        self, prepared1, prepared2, normalize="none", max_distance=None, **kwargs
+    ):
+        (text1, masks), (text2, _) = prepared1, prepared2
+        if max_distance is None:
+            distance = _bit_parallel_levenshtein(text1, text2, masks)
+        elif abs(len(text1) - len(text2)) > max_distance:
+            distance = max_distance + 1
+        elif (2 * max_distance + 1) * _BANDED_LEVENSHTEIN_RATIO < min(
+            len(text1), len(text2)
+        ):
+            distance = _banded_edit_distance(text1, text2, max_distance)
         else:
-            return matrix[size_x - 1, size_y - 1]
+            distance = min(
+                _bit_parallel_levenshtein(text1, text2, masks), max_distance + 1
+            )
+        return _normalize_distance(
+            np.float64(distance), len(text1), len(text2), normalize
+        )
 
 
 class Jaccard(CharacterMetrics):
@@ -139,9 +589,21 @@ class Jaccard(CharacterMetrics):
             len(text1) >= ngrams and len(text2) >= ngrams
         ), "text size lesser than ngrams passed"
 
-        grams1 = [tuple(text1[i : i + ngrams]) for i in range(len(text1) - ngrams + 1)]
-        grams2 = [tuple(text2[i : i + ngrams]) for i in range(len(text2) - ngrams + 1)]
-        x, y = set(grams1), set(grams2)
+        x, y = _ngram_set(text1, ngrams), _ngram_set(text2, ngrams)
+        n, d = len(x.intersection(y)), len(x.union(y))
+        return 1 - (n / d)
+
+    def _prepare(self, text: str, ngrams=1, **kwargs):
+        return text, _ngram_set(text, ngrams)
+
+    def _prepare_key(self, ngrams=1, **kwargs):
+        return ("ngrams", ngrams)
+
+    def _calculate_prepared(self, prepared1, prepared2, ngrams=1, **kwargs):
+        (text1, x), (text2, y) = prepared1, prepared2
+        if not (len(text1) >= ngrams and len(text2) >= ngrams):
+            # fall back to calculate for the ignore/assertion handling
+            return self.calculate(text1, text2, ngrams=ngrams, **kwargs)
         n, d = len(x.intersection(y)), len(x.union(y))
         return 1 - (n / d)
 
@@ -205,15 +667,199 @@ class Euclidean(CharacterMetrics):
         else:
             return dist
 
+    def _count_vectors(self, *texts):
+        """
+            Builds one word count matrix per list of texts, all over a shared vocabulary.
+        """
+        vocab = {}
+        word_ids = [
+            [
+                [vocab.setdefault(word, len(vocab)) for word in text.split(" ")]
+                for text in batch
+            ]
+            for batch in texts
+        ]
+        vectors = []
+        for batch_ids in word_ids:
+            counts = np.zeros((len(batch_ids), len(vocab)))
+            rows = np.repeat(np.arange(len(batch_ids)), [len(ids) for ids in batch_ids])
+            cols = np.array(
+                [word_id for ids in batch_ids for word_id in ids], dtype=int
+            )
+            np.add.at(counts, (rows, cols), 1)
+            vectors.append(counts)
+        return vectors
+
+    def _cdist(self, queries, choices, norm=False, **kwargs):
+        vec_queries, vec_choices = self._count_vectors(queries, choices)
+        squared = (
+            np.sum(vec_queries ** 2, axis=1)[:, None]
+            + np.sum(vec_choices ** 2, axis=1)[None, :]
+            - 2 * vec_queries @ vec_choices.T
+        )
+        dist = np.sqrt(np.maximum(squared, 0))
+        if norm:
+            present_queries, present_choices = vec_queries > 0, vec_choices > 0
+            vocab_size = (
+                np.sum(present_queries, axis=1)[:, None]
+                + np.sum(present_choices, axis=1)[None, :]
+                - present_queries.astype(float) @ present_choices.T
+            )
+            return dist / np.sqrt(vocab_size)
+        return dist
+
+    def _calculate_many(self, texts1, texts2, norm=False, **kwargs):
+        vec_text1, vec_text2 = self._count_vectors(texts1, texts2)
+        dist = np.linalg.norm(vec_text1 - vec_text2, axis=1)
+        if norm:
+            vocab_size = np.sum((vec_text1 > 0) | (vec_text2 > 0), axis=1)
+            return dist / np.sqrt(vocab_size)
+        return dist
+
+
+UNIVERSAL_SENTENCE_ENCODER = "https://tfhub.dev/google/universal-sentence-encoder/4"
+
+# process-wide cache of loaded encoders, keyed by their handle
+_encoders = {}
+_encoders_lock = threading.Lock()
+
+
+def load_encoder(handle: str = UNIVERSAL_SENTENCE_ENCODER):
+    """
+        Loads a sentence encoder once per process and returns it.
+        Later calls with the same handle return the already loaded model.
+        TensorFlow is only imported here, so the other metrics never pay for it.
+
+        Example:
+        # air-gapped machines can point at a downloaded SavedModel directory
+        encoder = load_encoder("/models/universal-sentence-encoder_4")
+        embeddings = encoder(["He is playing the guitar."])
+
+        :params
+        :handle: tfhub.dev URL or path to a local SavedModel directory
+        :type handle: string
+
+        returns the loaded encoder
+    """
+    if handle not in _encoders:
+        with _encoders_lock:
+            if handle not in _encoders:
+                import tensorflow_hub as hub
+
+                _encoders[handle] = hub.load(handle)
+    return _encoders[handle]
+
 
 class SemanticSimilarity(CharacterMetrics):
     """A class used to calculate the semantic similarity (cosine) between two sentences.
        Methods
        -------
        calculate(text1: str, text2: str, **kwargs)
-        -Computes the Semantic Similarity and returns it.   
+        -Computes the Semantic Similarity and returns it.
+       warmup()
+        -Loads the encoder and runs one forward pass, so that later calls only pay for inference.
+       embed(texts: list, batch_size=256, dtype=np.float32)
+        -Returns unit-norm embeddings, encoding every distinct text once in chunks of batch_size.
+       cdist(queries: list, choices: list, **kwargs), calculate_many(texts1: list, texts2: list, **kwargs)
+        -Similarity matrix / paired similarities from one matmul per chunk of embeddings.
+
+       Args:
+       encoder: str or callable (default: Universal Sentence Encoder on tfhub.dev)
+        -tfhub.dev URL or local SavedModel directory, loaded lazily and only once per process.
+        -Or any callable taking a list of strings and returning one embedding per string.
+       cache: decepticonlp.metrics.embedding_cache.EmbeddingCache (default: None)
+        -If given, embed() looks sentences up in the cache before encoding them.
     """
 
+    def __init__(self, encoder=UNIVERSAL_SENTENCE_ENCODER, cache=None):
+        self.encoder = encoder
+        self.cache = cache
+
+    def get_encoder(self):
+        """Returns the encoder callable, loading it on first use."""
+        if callable(self.encoder):
+            return self.encoder
+        return load_encoder(self.encoder)
+
+    def warmup(self):
+        """Loads the encoder and runs a forward pass to trigger any lazy initialisation."""
+        self._encode(["warm up"])
+        return self
+
+    def _encode(self, texts):
+        embeddings = self.get_encoder()(texts)
+        if hasattr(embeddings, "numpy"):
+            embeddings = embeddings.numpy()
+        return np.asarray(embeddings)
+
+    def embed(self, texts, batch_size=256, dtype=np.float32):
+        """
+            Embeds a list of sentences in chunks of batch_size forward passes.
+            Identical sentences, and sentences found in the cache, are encoded only once.
+
+            Example:
+            semantic_similarity = SemanticSimilarity()
+            embeddings = semantic_similarity.embed(["He has insomnia.", "He has insomnia."])
+            print(embeddings.shape)
+            (2, 512)
+
+            :params
+            :texts: list of sentences
+            :batch_size: number of sentences per forward pass
+            :dtype: dtype the embeddings are kept in, eg. np.float16 to halve memory
+            :type texts: list
+            :type batch_size: int
+
+            returns L2-normalised embeddings, one row per text
+            :return type: numpy.ndarray
+        """
+        unique = {}
+        rows = np.array([unique.setdefault(text, len(unique)) for text in texts])
+        unique = list(unique)
+        if not unique:
+            return np.empty((0, 0), dtype=dtype)
+
+        if self.cache is None:
+            embeddings = [None] * len(unique)
+        else:
+            embeddings = self.cache.get_many(unique)
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        for start in range(0, len(missing), batch_size):
+            chunk = missing[start : start + batch_size]
+            encoded = self._encode([unique[i] for i in chunk])
+            encoded = encoded / np.linalg.norm(encoded, axis=1, keepdims=True)
+            if self.cache is not None:
+                self.cache.put_many([unique[i] for i in chunk], encoded)
+            for i, embedding in zip(chunk, encoded):
+                embeddings[i] = embedding
+        return np.array(embeddings, dtype=dtype)[rows]
+
+    def _cdist(self, queries, choices, batch_size=256, dtype=np.float32, **kwargs):
+        embeddings = self.embed(queries + choices, batch_size, dtype)
+        embeddings_queries = embeddings[: len(queries)]
+        embeddings_choices = embeddings[len(queries) :].astype(np.float32).T
+        matrix = np.empty((len(queries), len(choices)), dtype=np.float32)
+        for start in range(0, len(queries), batch_size):
+            chunk = embeddings_queries[start : start + batch_size].astype(np.float32)
+            matrix[start : start + batch_size] = chunk @ embeddings_choices
+        return matrix
+
+    def _calculate_many(
+        self, texts1, texts2, batch_size=256, dtype=np.float32, **kwargs
+    ):
+        embeddings = self.embed(texts1 + texts2, batch_size, dtype)
+        embeddings1, embeddings2 = embeddings[: len(texts1)], embeddings[len(texts1) :]
+        similarities = np.empty(len(texts1), dtype=np.float32)
+        for start in range(0, len(texts1), batch_size):
+            end = start + batch_size
+            similarities[start:end] = np.einsum(
+                "ij,ij->i",
+                embeddings1[start:end].astype(np.float32),
+                embeddings2[start:end].astype(np.float32),
+            )
+        return similarities
+
     def calculate(self, text1: str, text2: str, **kwargs):
         """
             
@@ -235,14 +881,8 @@ class SemanticSimilarity(CharacterMetrics):
 
         """
 
-        # Load the Universal Sentence Encoder. The user should have an active user connection.
-        universal_sentence_encoder = hub.load(
-            "https://tfhub.dev/google/universal-sentence-encoder/4"
-        )
-
         # Compute the embeddings of the two sentences
-        embeddings = universal_sentence_encoder([text1, text2])
-        embeddings = embeddings.numpy()
+        embeddings = self._encode([text1, text2])
 
         # Compute the cosine similarity and return the value
         return np.dot(embeddings[0], embeddings[1]) / (
@@ -260,7 +900,15 @@ class DamerauLevenshtein(CharacterMetrics):
             - calculates Damerau-Levenshtein's edit distance and returns the same
     """
 
-    def calculate(self, text1: str, text2: str, normalize="none", **kwargs):
+    def calculate(
+        self,
+        text1: str,
+        text2: str,
+        normalize="none",
+        max_distance=None,
+        restricted=False,
+        **kwargs
+    ):
         """
         edit operations:
             insertion: xyz -> xayz, xyzb
@@ -273,6 +921,9 @@ class DamerauLevenshtein(CharacterMetrics):
             
             #damerau levenshtein edit distance
             "a cat" -> "an abct" = 3
+
+            #restricted edit distance (optimal string alignment), no substring is edited twice
+            "a cat" -> "an abct" = 4
         
         Usage:
         DL = DamerauLevenshtein()
@@ -282,74 +933,37 @@ class DamerauLevenshtein(CharacterMetrics):
         0.25
         DL.calculate("a cat", "an abct", normalize="lcs")
         0.42857142857142855
+        DL.calculate("a cat", "an abct", max_distance=2)
+        3
+        DL.calculate("a cat", "an abct", restricted=True)
+        4
             
         
         :params
         :text1: First string
         :text2: Second string
         :normalize: pass "sum" for total Levenshtein distance, "lcs" for maximum normalization, "none" default
+        :max_distance: default (None), if given, only the band of width 2*max_distance+1 is computed.
+                       Distances above max_distance are returned as max_distance + 1 (before normalization).
+        :restricted: default (False), if True computes the optimal string alignment distance using three rolling rows
         :type text1: String
         :type text2: String
         :type normalize: String
+        :type max_distance: int
+        :type restricted: Boolean
         
         https://en.wikipedia.org/wiki/Damerau%E2%80%93Levenshtein_distance
         https://gist.github.com/badocelot/5327337
         """
 
-        # INF = number greater than maximum possible distance
-        INF = len(text1) + len(text2)
-
-        # MATRIX: (len(text1) + 2) x (len(text2) + 2)
-        matrix = [[INF for n in range(len(text2) + 2)]]
-        matrix += [[INF] + list(range(len(text2) + 1))]
-        matrix += [[INF, m] + [0] * len(text2) for m in range(1, len(text1) + 1)]
-
-        # row where each element was last encountered
-        last_row = {}
-
-        # fill in costs
-        for row in range(1, len(text1) + 1):
-            # current char in text1
-            char_text1 = text1[row - 1]
-
-            # column where this particular element was last matched
-            last_match_column = 0
-
-            for col in range(1, len(text2) + 1):
-                # current char in text2
-                char_text2 = text2[col - 1]
-
-                # last matching row for this particular element
-                last_match_row = last_row.get(char_text2, 0)
-
-                cost_substitution = 0 if char_text1 == char_text2 else 1
-
-                # substitution, addition, deletion
-                matrix[row + 1][col + 1] = min(
-                    matrix[row][col] + cost_substitution,
-                    matrix[row + 1][col] + 1,
-                    matrix[row][col + 1] + 1,
-                )
-
-                # transposition
-                matrix[row + 1][col + 1] = min(
-                    matrix[last_match_row][last_match_column]
-                    + (row - last_match_row - 1)
-                    + 1
-                    + (col - last_match_column - 1),
-                    matrix[row + 1][col + 1],
-                )
-
-                if cost_substitution == 0:
-                    last_match_column = col
-
-            last_row[char_text1] = row
-
-        distance = matrix[-1][-1]
+        if max_distance is not None:
+            distance = _banded_edit_distance(
+                text1, text2, max_distance, transpositions=True, restricted=restricted
+            )
+            return _normalize_distance(distance, len(text1), len(text2), normalize)
 
-        if normalize == "sum":
-            return distance / (len(text1) + len(text2))
-        elif normalize == "lcs":
-            return distance / (max(len(text1), len(text2)))
+        if restricted:
+            distance = _optimal_string_alignment(text1, text2)
         else:
-            return distance
+            distance = _damerau_levenshtein(text1, text2)
+        return _normalize_distance(distance, len(text1), len(text2), normalize)
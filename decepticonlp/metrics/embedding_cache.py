@@ -0,0 +1,210 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+
+def text_key(text: str):
+    """
+        Stable 64-bit key of a text. Unlike hash(), it does not change
+        between processes (PYTHONHASHSEED), so it can index an on-disk store.
+    """
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class DiskEmbeddingStore(object):
+    """
+        Append-only on-disk embedding store.
+
+        Embeddings are rows of a raw float array in `<path>.vectors` (after an 8 byte
+        header holding the dimension), which readers memory-map. `<path>.index.npy`
+        holds the (key, row) offset index sorted by key, also memory-mapped.
+        A writer first appends the vectors and then atomically replaces the index,
+        so any number of processes can read while one process writes.
+
+        Methods
+        -------
+        get_many(self, keys: list)
+            - returns the stored embeddings of keys, None for the missing ones.
+        put_many(self, keys: list, embeddings: numpy.ndarray)
+            - appends the embeddings of keys not stored yet.
+        refresh(self)
+            - picks up rows written by other processes.
+    """
+
+    index_dtype = np.dtype([("key", "<u8"), ("row", "<i8")])
+    header_size = 8
+
+    def __init__(self, path, dtype=np.float32):
+        self.vectors_path = str(path) + ".vectors"
+        self.index_path = str(path) + ".index.npy"
+        self.dtype = np.dtype(dtype)
+        self.refresh()
+
+    def refresh(self):
+        if os.path.exists(self.index_path):
+            self.index = np.load(self.index_path, mmap_mode="r")
+        else:
+            self.index = np.empty(0, dtype=self.index_dtype)
+        self.vectors = None
+        if os.path.exists(self.vectors_path):
+            rows, dim = self._shape()
+            if rows:
+                self.vectors = np.memmap(
+                    self.vectors_path,
+                    dtype=self.dtype,
+                    mode="r",
+                    offset=self.header_size,
+                    shape=(rows, dim),
+                )
+
+    def _shape(self):
+        """returns the number of complete rows in the vectors file and their dimension"""
+        with open(self.vectors_path, "rb") as vectors_file:
+            dim = int.from_bytes(vectors_file.read(self.header_size), "little")
+        size = os.path.getsize(self.vectors_path) - self.header_size
+        return size // (dim * self.dtype.itemsize), dim
+
+    def __len__(self):
+        return len(self.index)
+
+    def _lookup(self, keys):
+        keys = np.asarray(keys, dtype=np.uint64)
+        if not len(self.index):
+            return np.full(len(keys), -1)
+        positions = np.searchsorted(self.index["key"], keys)
+        positions = np.minimum(positions, len(self.index) - 1)
+        found = self.index["key"][positions] == keys
+        return np.where(found, self.index["row"][positions], -1)
+
+    def get_many(self, keys):
+        rows = self._lookup(keys)
+        return [None if row < 0 else self.vectors[row] for row in rows]
+
+    def put_many(self, keys, embeddings):
+        rows = self._lookup(keys)
+        new = OrderedDict()
+        for key, row, embedding in zip(keys, rows, embeddings):
+            if row < 0:
+                new.setdefault(key, embedding)
+        if not new:
+            return
+
+        vectors = np.asarray(list(new.values()), dtype=self.dtype)
+        if not os.path.exists(self.vectors_path):
+            with open(self.vectors_path, "wb") as vectors_file:
+                vectors_file.write(
+                    vectors.shape[1].to_bytes(self.header_size, "little")
+                )
+        first_row = self._shape()[0]
+        with open(self.vectors_path, "r+b") as vectors_file:
+            vectors_file.seek(self.header_size + first_row * vectors[0].nbytes)
+            vectors_file.write(vectors.tobytes())
+
+        added = np.empty(len(new), dtype=self.index_dtype)
+        added["key"] = list(new)
+        added["row"] = np.arange(first_row, first_row + len(new))
+        index = np.concatenate([self.index, added])
+        index.sort(order="key")
+
+        temporary_path = self.index_path + ".tmp.npy"
+        np.save(temporary_path, index)
+        os.replace(temporary_path, self.index_path)
+        self.refresh()
+
+
+class EmbeddingCache(object):
+    """
+        Embedding cache keyed by a stable hash of the text.
+
+        The in-memory tier is an LRU bounded by max_bytes of embedding data. If a path
+        is given, every embedding is also written to a DiskEmbeddingStore there, which
+        outlives the process and can be shared by several worker processes.
+
+        Example:
+        cache = EmbeddingCache(max_bytes=64 * 2 ** 20, path="/data/use4-cache")
+        semantic_similarity = SemanticSimilarity(cache=cache)
+        semantic_similarity.calculate_many(originals, perturbed)
+        print(cache.stats())
+        {'hits': 9000, 'misses': 1000, 'disk_hits': 0, 'evictions': 0, 'entries': 1000, 'bytes': 2048000}
+
+        Args:
+        max_bytes: int (default: 256 MiB)
+            -budget for the embeddings held in memory.
+        path: str (default: None)
+            -prefix of the on-disk store files, no disk tier if None.
+        dtype: numpy dtype (default: np.float32)
+            -dtype of the embeddings on disk.
+    """
+
+    def __init__(self, max_bytes=256 * 2 ** 20, path=None, dtype=np.float32):
+        self.max_bytes = max_bytes
+        self.store = None if path is None else DiskEmbeddingStore(path, dtype)
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = self.misses = self.disk_hits = self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.nbytes,
+        }
+
+    def _remember(self, key, embedding):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return
+        self.entries[key] = embedding
+        self.nbytes += embedding.nbytes
+        while self.nbytes > self.max_bytes and self.entries:
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+
+    def get_many(self, texts):
+        """
+            Looks up texts in memory, then on disk.
+            returns a list with the embedding of each text, or None if it is not cached
+        """
+        keys = [text_key(text) for text in texts]
+        embeddings = []
+        for key in keys:
+            embedding = self.entries.get(key)
+            if embedding is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+            embeddings.append(embedding)
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing and self.store is not None:
+            stored = self.store.get_many([keys[i] for i in missing])
+            for i, embedding in zip(missing, stored):
+                if embedding is not None:
+                    embedding = np.array(embedding)
+                    embeddings[i] = embedding
+                    self._remember(keys[i], embedding)
+                    self.disk_hits += 1
+        self.misses += sum(embedding is None for embedding in embeddings)
+        return embeddings
+
+    def get(self, text):
+        return self.get_many([text])[0]
+
+    def put_many(self, texts, embeddings):
+        keys = [text_key(text) for text in texts]
+        for key, embedding in zip(keys, embeddings):
+            self._remember(key, np.array(embedding))
+        if self.store is not None:
+            self.store.put_many(keys, embeddings)
+
+    def put(self, text, embedding):
+        self.put_many([text], [embedding])
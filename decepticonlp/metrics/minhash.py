@@ -0,0 +1,197 @@
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from decepticonlp.metrics.char_metrics import _ngram_set
+
+
+def ngram_hashes(text: str, ngrams=1, ignore=True):
+    """
+        Stable 32-bit hashes of the distinct character n-grams of text,
+        the same n-grams Jaccard.calculate compares.
+
+        :params
+        :text: string to be hashed
+        :ngrams: size of the n-grams
+        :ignore: default (True), texts shorter than ngrams fall back to unigrams instead of asserting
+        :type text: String
+        :type ngrams: int
+
+        :return type: numpy.ndarray of uint64
+    """
+    if len(text) < ngrams:
+        assert ignore, "text size lesser than ngrams passed"
+        ngrams = 1
+    return np.array(
+        [
+            zlib.crc32("".join(gram).encode("utf-8"))
+            for gram in _ngram_set(text, ngrams)
+        ],
+        dtype=np.uint64,
+    )
+
+
+class MinHash(object):
+    """
+        MinHash signatures of the character n-gram sets used by Jaccard.
+        The fraction of differing signature entries estimates the Jaccard distance.
+
+        Each of the num_perm hash functions is h(x) = ((a * x + b) mod 2^64) >> 32
+        (multiply-add-shift), applied to all n-grams of a batch of texts at once.
+
+        Example:
+        minhash = MinHash(num_perm=128, ngrams=2)
+        signatures = minhash.signatures(["This is fascinating!", "This is fascinatign!"])
+        print(MinHash.distance(signatures[0], signatures[1]))
+        0.1953125
+
+        Args:
+        num_perm: int (default: 128)
+            -number of hash functions, the estimate's standard error is about 1/sqrt(num_perm).
+        ngrams: int (default: 1)
+            -n-gram size, as for Jaccard.calculate.
+        seed: int (default: 1)
+            -seed of the hash functions; only signatures built with the same seed are comparable.
+    """
+
+    def __init__(self, num_perm=128, ngrams=1, seed=1):
+        self.num_perm = num_perm
+        self.ngrams = ngrams
+        self.seed = seed
+        random_state = np.random.RandomState(seed)
+        self.a = random_state.randint(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self.a = (self.a << np.uint64(1)) | np.uint64(1)
+        self.b = random_state.randint(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signatures(self, texts, batch_size=256):
+        """
+            returns a (len(texts), num_perm) uint32 array of signatures.
+            Empty texts get the all-maximum signature.
+        """
+        texts = list(texts)
+        result = np.full((len(texts), self.num_perm), 2 ** 32 - 1, dtype=np.uint32)
+        for start in range(0, len(texts), batch_size):
+            hashes = [
+                ngram_hashes(text, self.ngrams)
+                for text in texts[start : start + batch_size]
+            ]
+            rows = [i for i, grams in enumerate(hashes) if len(grams)]
+            if not rows:
+                continue
+            offsets = np.cumsum([0] + [len(hashes[i]) for i in rows[:-1]])
+            grams = np.concatenate([hashes[i] for i in rows])
+            values = (self.a[:, None] * grams[None, :] + self.b[:, None]) >> np.uint64(
+                32
+            )
+            result[start + np.array(rows)] = np.minimum.reduceat(
+                values, offsets, axis=1
+            ).T
+        return result
+
+    def signature(self, text: str):
+        return self.signatures([text])[0]
+
+    @staticmethod
+    def distance(signature1, signature2):
+        """Estimated Jaccard distance of two signatures."""
+        return 1 - np.mean(np.asarray(signature1) == np.asarray(signature2))
+
+
+def _lsh_parameters(threshold, num_perm):
+    """
+        Picks (bands, rows) with bands * rows <= num_perm minimising the sum of the
+        false positive and false negative areas under the LSH S-curve
+        P(candidate | s) = 1 - (1 - s^rows)^bands around the similarity 1 - threshold.
+    """
+    similarity = 1 - threshold
+    grid = np.linspace(0, 1, 201)
+    best, best_error = (1, num_perm), None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            probability = 1 - (1 - grid ** rows) ** bands
+            error = np.mean(np.where(grid < similarity, probability, 1 - probability))
+            if best_error is None or error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class LSHIndex(object):
+    """
+        Locality sensitive hashing index over MinHash signatures.
+
+        Signatures are cut into bands of rows entries, each band hashed into its own
+        table. A query only compares against the items sharing at least one band
+        bucket, instead of the whole corpus, and returns those whose estimated
+        Jaccard distance is below threshold.
+
+        Example:
+        index = LSHIndex(threshold=0.3, minhash=MinHash(ngrams=2))
+        index.add_many(range(len(corpus)), corpus)
+        print(index.query("This is fascinatign!"))
+        [(17, 0.1953125)]
+
+        Args:
+        threshold: float (default: 0.3)
+            -maximum Jaccard distance of the returned items.
+        minhash: MinHash (default: MinHash())
+            -signature generator, defines num_perm and ngrams.
+        bands, rows: int (default: None)
+            -banding, chosen from threshold and num_perm if not given.
+    """
+
+    def __init__(self, threshold=0.3, minhash=None, bands=None, rows=None):
+        self.threshold = threshold
+        self.minhash = MinHash() if minhash is None else minhash
+        if bands is None or rows is None:
+            bands, rows = _lsh_parameters(threshold, self.minhash.num_perm)
+        assert bands * rows <= self.minhash.num_perm, "bands * rows exceeds num_perm"
+        self.bands, self.rows = bands, rows
+        self.tables = [defaultdict(list) for _ in range(bands)]
+        self.keys = []
+        self.signatures = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _buckets(self, signature):
+        for band in range(self.bands):
+            yield signature[band * self.rows : (band + 1) * self.rows].tobytes()
+
+    def add_signatures(self, keys, signatures):
+        for key, signature in zip(keys, signatures):
+            item = len(self.keys)
+            self.keys.append(key)
+            self.signatures.append(signature)
+            for table, bucket in zip(self.tables, self._buckets(signature)):
+                table[bucket].append(item)
+
+    def add_many(self, keys, texts, batch_size=256):
+        self.add_signatures(keys, self.minhash.signatures(texts, batch_size))
+
+    def add(self, key, text: str):
+        self.add_many([key], [text])
+
+    def query_signature(self, signature):
+        candidates = set()
+        for table, bucket in zip(self.tables, self._buckets(signature)):
+            candidates.update(table.get(bucket, ()))
+        if not candidates:
+            return []
+        candidates = sorted(candidates)
+        distances = 1 - np.mean(
+            np.array([self.signatures[item] for item in candidates]) == signature,
+            axis=1,
+        )
+        return [
+            (self.keys[item], distance)
+            for item, distance in zip(candidates, distances)
+            if distance < self.threshold
+        ]
+
+    def query(self, text: str):
+        """
+            returns [(key, estimated Jaccard distance)] of the indexed texts
+            whose estimated distance to text is below threshold
+        """
+        return self.query_signature(self.minhash.signature(text))
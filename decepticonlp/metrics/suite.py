@@ -0,0 +1,142 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from decepticonlp.metrics import char_metrics
+
+metric_list = {
+    "levenshtein": char_metrics.Levenshtein,
+    "damerau_levenshtein": char_metrics.DamerauLevenshtein,
+    "jaccard": char_metrics.Jaccard,
+    "euclidean": char_metrics.Euclidean,
+    "semantic_similarity": char_metrics.SemanticSimilarity,
+}
+
+
+def _column_name(name, kwargs):
+    if not kwargs:
+        return name
+    return "{}({})".format(
+        name, ",".join("{}={}".format(key, kwargs[key]) for key in sorted(kwargs))
+    )
+
+
+class MetricSuite(object):
+    """
+        Computes several metrics over a batch of (original, perturbed) pairs in one pass.
+
+        Every distinct text is preprocessed once per representation (pattern bitmasks,
+        n-gram sets, ...) and that state is shared by all the metrics using it, e.g.
+        Levenshtein with different normalizations, or Jaccard and its ignore variants.
+        Metrics with a vectorised batch path (Euclidean, SemanticSimilarity) run it once
+        over the distinct pairs. Results of repeated pairs are memoised across calls.
+
+        Args:
+        metrics: list
+            -metric specs, each one of
+             "levenshtein" (a key of metric_list), a CharacterMetrics instance,
+             or a (name or instance, kwargs) tuple.
+        memo_size: int (default: 100000)
+            -number of pair results kept, 0 disables memoisation.
+
+        Example:
+        suite = MetricSuite(["levenshtein", ("jaccard", {"ngrams": 2}), "euclidean"])
+        scores = suite.calculate(["This is fascinating!"], ["This is fascinatign!"])
+        print(scores["levenshtein"], scores["jaccard(ngrams=2)"])
+        [2.] [0.26315789]
+        print(suite.calculate(originals, perturbed, as_dict=True).keys())
+        dict_keys(['levenshtein', 'jaccard(ngrams=2)', 'euclidean'])
+    """
+
+    def __init__(self, metrics, memo_size=100000):
+        self.columns = []
+        for spec in metrics:
+            metric, kwargs = spec if isinstance(spec, tuple) else (spec, {})
+            if isinstance(metric, str):
+                assert metric in metric_list, self.metric_not_valid_message()
+                name, metric = metric, metric_list[metric]()
+            else:
+                name = metric.__class__.__name__
+            self.columns.append((_column_name(name, kwargs), metric, dict(kwargs)))
+        names = [name for name, _, _ in self.columns]
+        assert len(set(names)) == len(names), "duplicate metric specs"
+        self.dtype = np.dtype([(name, np.float64) for name in names])
+
+        self.memo_size = memo_size
+        self.memo = OrderedDict()
+        self.hits = self.misses = 0
+
+    def metric_not_valid_message(self):
+        return "Metric chosen invalid. Please choose from " + str(list(metric_list))
+
+    def calculate(self, texts1, texts2, as_dict=False):
+        """
+            :params
+            :texts1: list of original texts
+            :texts2: list of perturbed texts, aligned with texts1
+            :as_dict: default (False), return a dict of columns instead of a structured array
+            :type texts1: list
+            :type texts2: list
+
+            returns one row per pair, one field per metric
+            :return type: numpy structured array or dict of numpy.ndarray
+        """
+        pairs = list(zip(texts1, texts2))
+        assert (
+            len(pairs) == len(texts1) == len(texts2)
+        ), "texts1 and texts2 must be of equal length"
+
+        pending = OrderedDict()
+        for pair in pairs:
+            if pair in self.memo:
+                self.memo.move_to_end(pair)
+                self.hits += 1
+            elif pair not in pending:
+                pending[pair] = None
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        computed = self._calculate_pairs(list(pending))
+        rows = {pair: row for pair, row in zip(pending, computed)}
+        result = np.empty(len(pairs), dtype=self.dtype)
+        for i, pair in enumerate(pairs):
+            result[i] = rows[pair] if pair in rows else self.memo[pair]
+
+        if self.memo_size:
+            for pair, row in rows.items():
+                self.memo[pair] = row
+            while len(self.memo) > self.memo_size:
+                self.memo.popitem(last=False)
+
+        if as_dict:
+            return {name: result[name] for name in self.dtype.names}
+        return result
+
+    def _calculate_pairs(self, pairs):
+        result = np.empty(len(pairs), dtype=self.dtype)
+        if not pairs:
+            return result
+        texts1 = [text1 for text1, _ in pairs]
+        texts2 = [text2 for _, text2 in pairs]
+
+        # prepared states shared between columns: representation -> text -> state
+        prepared = {}
+        for name, metric, kwargs in self.columns:
+            if (
+                type(metric)._calculate_many
+                is not char_metrics.CharacterMetrics._calculate_many
+            ):
+                # vectorised batch implementation
+                result[name] = metric.calculate_many(texts1, texts2, **kwargs)
+                continue
+
+            states = prepared.setdefault(metric._prepare_key(**kwargs), {})
+            for text in texts1 + texts2:
+                if text not in states:
+                    states[text] = metric._prepare(text, **kwargs)
+            result[name] = [
+                metric._calculate_prepared(states[text1], states[text2], **kwargs)
+                for text1, text2 in pairs
+            ]
+        return [tuple(row) for row in result]
@@ -0,0 +1,164 @@
+import asyncio
+import collections
+
+import numpy as np
+
+from decepticonlp.pipeline import stream
+
+
+def _transform_batch(augmenter, records, start):
+    return augmenter.transform_batch(records, start)
+
+
+class AsyncAugmenter(object):
+    """
+        asyncio front-end of a transform: concurrent apply_async calls are
+        collected into micro-batches, which run in an executor so the event
+        loop is never blocked.
+
+        A batch is closed when it holds max_batch_size requests or when its
+        first request has waited max_wait seconds. With a seed, the i-th
+        request (in arrival order) is transformed with
+        randomness.document_rng(seed, i).
+
+        Args:
+        transform: a Transforms, Compose or any callable(text, rng=...) -> text
+        max_batch_size: int (default: 32)
+        max_wait: float (default: 0.005)
+            -seconds a request may wait for others to join its batch.
+        executor: None or concurrent.futures.Executor (default: None)
+            -None runs the batches in the loop's default thread pool; a
+            ProcessPoolExecutor needs a picklable transform.
+        max_pending_batches: int (default: 1)
+            -batches running in the executor at once.
+        seed: None or int (default: None)
+        latency_window: int (default: 10000)
+            -number of most recent latencies the percentiles are computed on.
+
+        Example:
+        augmenter = AsyncAugmenter(transforms.Compose([...]), max_batch_size=64)
+        perturbed = await augmenter.apply_async("This is fascinating!")
+        print(augmenter.stats())
+    """
+
+    def __init__(
+        self,
+        transform,
+        max_batch_size=32,
+        max_wait=0.005,
+        executor=None,
+        max_pending_batches=1,
+        seed=None,
+        latency_window=10000,
+    ):
+        assert max_batch_size > 0, "max_batch_size should be positive"
+        assert max_wait >= 0, "max_wait should not be negative"
+        assert max_pending_batches > 0, "max_pending_batches should be positive"
+        self.augmenter = stream.StreamAugmenter(transform, seed=seed)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.executor = executor
+        self.max_pending_batches = max_pending_batches
+        self.latencies = collections.deque(maxlen=latency_window)
+        self.requests = 0
+        self.batches = 0
+        self.in_flight = 0
+        self._queue = None
+        self._batcher = None
+        self._running = set()
+
+    async def apply_async(self, text):
+        """returns the transformed text (or record), once its batch has run"""
+        loop = asyncio.get_event_loop()
+        if self._batcher is None or self._batcher.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_pending_batches)
+            self._batcher = asyncio.ensure_future(self._collect())
+        future = loop.create_future()
+        self._queue.put_nowait((text, future, loop.time()))
+        return await future
+
+    async def close(self):
+        """
+            stops collecting requests, cancelling the ones not yet in a batch,
+            and waits for the running batches
+        """
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            while not self._queue.empty():
+                self._queue.get_nowait()[1].cancel()
+            self._batcher = None
+        if self._running:
+            await asyncio.gather(*self._running)
+
+    def queue_depth(self):
+        """number of requests waiting for a batch"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self):
+        """
+            returns a dict with the queue depth, the requests in running
+            batches, the numbers of requests and batches served and the 50th,
+            90th and 99th latency percentiles in seconds
+        """
+        stats = {
+            "queue_depth": self.queue_depth(),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "batches": self.batches,
+        }
+        latencies = np.array(self.latencies)
+        for percentile in [50, 90, 99]:
+            key = "p{}".format(percentile)
+            stats[key] = (
+                float(np.percentile(latencies, percentile)) if len(latencies) else 0.0
+            )
+        return stats
+
+    async def _collect(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = batch[0][2] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    while len(batch) < self.max_batch_size and not self._queue.empty():
+                        batch.append(self._queue.get_nowait())
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._slots.acquire()
+            task = asyncio.ensure_future(self._run(batch, self.requests))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            self.requests += len(batch)
+            self.batches += 1
+
+    async def _run(self, batch, start):
+        loop = asyncio.get_event_loop()
+        self.in_flight += len(batch)
+        try:
+            records = [text for text, _, _ in batch]
+            results = await loop.run_in_executor(
+                self.executor, _transform_batch, self.augmenter, records, start
+            )
+        except Exception as error:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        finally:
+            self.in_flight -= len(batch)
+            self._slots.release()
+        now = loop.time()
+        for (_, future, enqueued), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+            self.latencies.append(now - enqueued)
@@ -0,0 +1,176 @@
+import array
+import io
+import mmap
+import os
+
+import numpy as np
+
+NEWLINE = ord("\n")
+# bytes scanned at once when indexing, so indexing memory does not grow with the file
+BLOCK_SIZE = 1 << 24
+
+
+def index_path(path):
+    """path of the line-offset index saved next to a corpus file"""
+    return str(path) + ".idx.npy"
+
+
+def build_index(path, block_size=BLOCK_SIZE):
+    """
+        Scans a corpus file of one text per line and saves its line-offset
+        index: an int64 array of len(lines) + 1 offsets, line i being the
+        bytes [offsets[i], offsets[i + 1]) without their trailing newline.
+
+        returns the offsets
+    """
+    size = os.path.getsize(path)
+    starts = [np.zeros(1, dtype=np.int64)]
+    if size:
+        with io.open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                for begin in range(0, size, block_size):
+                    block = np.frombuffer(
+                        mapped, np.uint8, min(block_size, size - begin), begin
+                    )
+                    starts.append(np.flatnonzero(block == NEWLINE) + begin + 1)
+                    del block
+            finally:
+                mapped.close()
+    offsets = np.concatenate(starts).astype(np.int64)
+    if offsets[-1] != size:
+        # the last line has no newline
+        offsets = np.append(offsets, size)
+    np.save(index_path(path), offsets)
+    return offsets
+
+
+class MappedCorpus(object):
+    """
+        Random access to the lines of a corpus file through mmap and its
+        line-offset index, built and saved next to the file when missing or
+        older than the file. Line i is found in O(1) without reading the rest.
+
+        A MappedCorpus is an iterable of str, so it is a source for
+        StreamAugmenter and ParallelAugmenter, and CorpusWriter is the sink.
+
+        Example:
+        with MappedCorpus("corpus.txt") as corpus, CorpusWriter("out.txt") as out:
+            out.write_many(StreamAugmenter(transforms.DeleteChar(), seed=0)(corpus))
+        print(MappedCorpus("out.txt")[123456])
+
+        Methods
+        -------
+        line_bytes(self, i)
+            - zero-copy memoryview of the bytes of line i.
+        shard(self, index, count)
+            - (start, stop) line range of shard index out of count.
+        byte_range(self, start, stop)
+            - (first byte, end byte) of lines [start, stop).
+        lines(self, start=0, stop=None)
+            - yields the lines of a range.
+    """
+
+    def __init__(self, path, encoding="utf-8"):
+        self.path = str(path)
+        self.encoding = encoding
+        size = os.path.getsize(self.path)
+        self.offsets = None
+        if os.path.exists(index_path(path)) and os.path.getmtime(
+            index_path(path)
+        ) >= os.path.getmtime(path):
+            self.offsets = np.load(index_path(path), mmap_mode="r")
+        if self.offsets is None or self.offsets[-1] != size:
+            self.offsets = build_index(path)
+        self._file = io.open(self.path, "rb")
+        self._mapped = None
+        self._view = memoryview(b"")
+        if size:
+            self._mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mapped)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return list(self.lines(*i.indices(len(self))[:2]))
+        if i < 0:
+            i += len(self)
+        return bytes(self.line_bytes(i)).decode(self.encoding)
+
+    def __iter__(self):
+        return self.lines()
+
+    def line_bytes(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError("line index out of range")
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        if end > start and self._view[end - 1] == NEWLINE:
+            end -= 1
+        return self._view[start:end]
+
+    def lines(self, start=0, stop=None):
+        stop = len(self) if stop is None else stop
+        for i in range(start, stop):
+            yield self[i]
+
+    def shard(self, index, count):
+        assert 0 <= index < count, "shard index should be in [0, count)"
+        return index * len(self) // count, (index + 1) * len(self) // count
+
+    def byte_range(self, start, stop):
+        return int(self.offsets[start]), int(self.offsets[stop])
+
+    def close(self):
+        self._view.release()
+        if self._mapped is not None:
+            self._mapped.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class CorpusWriter(object):
+    """
+        Writes one text per line and saves the line-offset index of the file
+        on close, so MappedCorpus opens the output without scanning it.
+    """
+
+    def __init__(self, path, encoding="utf-8"):
+        self.path = str(path)
+        self.encoding = encoding
+        self._file = io.open(self.path, "wb")
+        self._offsets = array.array("q", [0])
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def write(self, text):
+        assert "\n" not in text, "texts should not contain newlines"
+        data = text.encode(self.encoding) + b"\n"
+        self._file.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+
+    def write_many(self, texts):
+        """returns the number of texts written"""
+        count = len(self)
+        for text in texts:
+            self.write(text)
+        return len(self) - count
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        np.save(index_path(self.path), np.frombuffer(self._offsets, dtype=np.int64))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
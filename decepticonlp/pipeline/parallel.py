@@ -0,0 +1,145 @@
+import collections
+import itertools
+import multiprocessing
+import os
+import time
+
+from decepticonlp.pipeline import stream
+
+# the pipeline of the current worker process, built once by _init_worker
+_worker = {}
+
+
+def _init_worker(transform, seed, field):
+    _worker["augmenter"] = stream.StreamAugmenter(transform, seed=seed, field=field)
+
+
+def _run_chunk(start, records):
+    begin = time.perf_counter()
+    records = _worker["augmenter"].transform_batch(records, start)
+    return records, time.perf_counter() - begin
+
+
+class ParallelAugmenter(object):
+    """
+        Runs a transform over a corpus on a pool of processes, yielding the
+        results lazily and in input order.
+
+        Every worker receives the transform once, when it starts. Records are
+        sent in chunks whose size adapts to the measured cost per record, so
+        that a chunk takes about target_seconds. Document i is transformed
+        with randomness.document_rng(seed, i): for a fixed seed the output is
+        the same whatever the number of workers and the chunk sizes.
+
+        Args:
+        transform: a Transforms, Compose or any picklable callable(text, rng=...)
+        workers: None or int (default: None)
+            -number of processes, os.cpu_count() if None, and 0 to run in
+            the calling process.
+        seed: int (default: 0)
+            -base seed of the documents; None lets every worker draw from the
+            transform's own rng, which is not reproducible.
+        chunk_size: None or int (default: None)
+            -If None, adapt the chunk size, starting at min_chunk_size.
+            -Else, send chunks of this size.
+        target_seconds: float (default: 0.05)
+            -time a chunk should take to process.
+        max_pending: None or int (default: None)
+            -chunks in flight at once, 2 * workers if None.
+        field: str (default: "text")
+            -key of the text in dict records.
+
+        Example:
+        augmenter = ParallelAugmenter(transforms.Compose([...]), workers=8, seed=0)
+        write_records(augmenter(read_records("corpus.txt")), "augmented.txt")
+    """
+
+    min_chunk_size = 8
+    max_chunk_size = 4096
+
+    def __init__(
+        self,
+        transform,
+        workers=None,
+        seed=0,
+        chunk_size=None,
+        target_seconds=0.05,
+        max_pending=None,
+        field="text",
+        mp_context=None,
+    ):
+        assert chunk_size is None or chunk_size > 0, "chunk_size should be positive"
+        assert target_seconds > 0, "target_seconds should be positive"
+        self.transform = transform
+        self.workers = os.cpu_count() if workers is None else workers
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.target_seconds = target_seconds
+        self.max_pending = max_pending or 2 * max(self.workers, 1)
+        self.field = field
+        self.mp_context = mp_context
+        self.chunk_sizes = []
+
+    def __call__(self, records):
+        initargs = (self.transform, self.seed, self.field)
+        if not self.workers:
+            _init_worker(*initargs)
+            for chunk in self._run(records, lambda *args: _Done(_run_chunk(*args))):
+                yield chunk
+            return
+
+        context = self.mp_context or multiprocessing
+        with context.Pool(self.workers, _init_worker, initargs) as pool:
+            for chunk in self._run(records, self._submitter(pool)):
+                yield chunk
+
+    def _submitter(self, pool):
+        def submit(start, records):
+            return pool.apply_async(_run_chunk, (start, records))
+
+        return submit
+
+    def _run(self, records, submit):
+        records = iter(records)
+        pending = collections.deque()
+        chunk_size = self.chunk_size or self.min_chunk_size
+        seconds_per_record = None
+        start = 0
+        exhausted = False
+        self.chunk_sizes = []
+        while True:
+            while not exhausted and len(pending) < self.max_pending:
+                chunk = list(itertools.islice(records, chunk_size))
+                if not chunk:
+                    exhausted = True
+                    break
+                pending.append(submit(start, chunk))
+                self.chunk_sizes.append(len(chunk))
+                start += len(chunk)
+            if not pending:
+                return
+
+            chunk, seconds = pending.popleft().get()
+            if self.chunk_size is None and chunk:
+                # moving average of the cost of one record
+                cost = seconds / len(chunk)
+                if seconds_per_record is None:
+                    seconds_per_record = cost
+                else:
+                    seconds_per_record = 0.7 * seconds_per_record + 0.3 * cost
+                chunk_size = int(self.target_seconds / max(seconds_per_record, 1e-9))
+                chunk_size = min(
+                    max(chunk_size, self.min_chunk_size), self.max_chunk_size
+                )
+            for record in chunk:
+                yield record
+
+
+class _Done(object):
+    """an already computed result, with the interface of AsyncResult"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
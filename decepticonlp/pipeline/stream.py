@@ -0,0 +1,225 @@
+import csv
+import io
+import itertools
+import json
+import os
+import queue
+import threading
+
+from decepticonlp.utils import buffer
+from decepticonlp.utils import randomness
+
+FORMATS = ["lines", "jsonl", "csv"]
+
+_EXTENSIONS = {".jsonl": "jsonl", ".json": "jsonl", ".csv": "csv", ".tsv": "csv"}
+
+
+def _format_of(path, fmt):
+    if fmt is None:
+        fmt = _EXTENSIONS.get(os.path.splitext(str(path))[1].lower(), "lines")
+    assert fmt in FORMATS, "format should be one of " + str(FORMATS)
+    return fmt
+
+
+def read_records(path, fmt=None, encoding="utf-8", delimiter=None):
+    """
+        Lazily reads the records of a corpus file, one at a time.
+
+        :path: path of the file
+        :fmt: "lines" (one text per line), "jsonl" (one JSON object per line)
+            or "csv" (with a header row); guessed from the extension if None
+        :delimiter: csv delimiter, tab for .tsv files and comma otherwise
+
+        yields str for "lines", dict for "jsonl" and "csv"
+    """
+    fmt = _format_of(path, fmt)
+    with io.open(path, encoding=encoding, newline="" if fmt == "csv" else None) as f:
+        if fmt == "lines":
+            for line in f:
+                yield line.rstrip("\n")
+        elif fmt == "jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            if delimiter is None:
+                delimiter = "\t" if str(path).endswith(".tsv") else ","
+            for row in csv.DictReader(f, delimiter=delimiter):
+                yield row
+
+
+def write_records(records, path, fmt=None, encoding="utf-8", delimiter=None):
+    """
+        Writes records as they come, in the format read_records reads.
+        returns the number of records written
+    """
+    fmt = _format_of(path, fmt)
+    count = 0
+    with io.open(
+        path, "w", encoding=encoding, newline="" if fmt == "csv" else None
+    ) as f:
+        writer = None
+        for record in records:
+            if fmt == "lines":
+                f.write(record + "\n")
+            elif fmt == "jsonl":
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            else:
+                if writer is None:
+                    if delimiter is None:
+                        delimiter = "\t" if str(path).endswith(".tsv") else ","
+                    writer = csv.DictWriter(f, list(record), delimiter=delimiter)
+                    writer.writeheader()
+                writer.writerow(record)
+            count += 1
+    return count
+
+
+def batched(iterable, batch_size):
+    """yields lists of at most batch_size consecutive items"""
+    assert batch_size > 0, "batch_size should be positive"
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class StreamAugmenter(object):
+    """
+        Runs a transform over a corpus of any size in micro-batches, yielding
+        the results lazily: only the batches in flight are held in memory.
+
+        Records are str, or dicts whose field (default "text") is augmented,
+        the other keys being copied, as read_records returns them.
+
+        Args:
+        transform: a Transforms, Compose or any callable(text, rng=...) -> text
+        batch_size: int (default: 64)
+            -number of records read and transformed together.
+        seed: None or int (default: None)
+            -If None, the transform draws from its own rng.
+            -Else document i is transformed with randomness.document_rng(seed, i),
+            so the output does not depend on batch_size.
+        max_pending: int (default: 0)
+            -If 0, a batch is transformed when the consumer asks for it.
+            -Else a background thread transforms ahead, blocking once
+            max_pending batches wait for a slow consumer (backpressure).
+        use_buffer: boolean (default: False)
+            -If True, every batch goes through the transform as one
+            decepticonlp.utils.buffer.TokenBuffer; with a seed, batch b uses
+            document_rng(seed, b), so the output depends on batch_size.
+        field: str (default: "text")
+            -key of the text in dict records.
+
+        Example:
+        augmenter = StreamAugmenter(transforms.DeleteChar(), seed=0)
+        records = read_records("corpus.jsonl")
+        write_records(augmenter(records), "augmented.jsonl")
+    """
+
+    def __init__(
+        self,
+        transform,
+        batch_size=64,
+        seed=None,
+        max_pending=0,
+        use_buffer=False,
+        field="text",
+    ):
+        assert batch_size > 0, "batch_size should be positive"
+        assert max_pending >= 0, "max_pending should not be negative"
+        self.transform = transform
+        self.batch_size = batch_size
+        self.seed = seed
+        self.max_pending = max_pending
+        self.use_buffer = use_buffer
+        self.field = field
+        self.processed = 0
+
+    def __call__(self, records):
+        batches = self._batches(records)
+        if self.max_pending:
+            batches = self._prefetch(batches)
+        for batch in batches:
+            for record in batch:
+                yield record
+
+    def transform_batch(self, records, start=0, batch_index=0):
+        """
+            Transforms one micro-batch of records, whose first one is the
+            start-th document of the corpus.
+            returns the list of augmented records
+        """
+        texts = [self._text(record) for record in records]
+        if self.use_buffer:
+            rng = None
+            if self.seed is not None:
+                rng = randomness.document_rng(self.seed, batch_index)
+            batch = buffer.TokenBuffer.from_texts(texts)
+            texts = self.transform(batch, rng=rng).decode()
+        elif self.seed is None:
+            texts = [self.transform(text) for text in texts]
+        else:
+            texts = [
+                self.transform(text, rng=randomness.document_rng(self.seed, start + i))
+                for i, text in enumerate(texts)
+            ]
+        self.processed += len(texts)
+        return [self._record(r, text) for r, text in zip(records, texts)]
+
+    def _batches(self, records):
+        start = 0
+        for batch_index, batch in enumerate(batched(records, self.batch_size)):
+            yield self.transform_batch(batch, start, batch_index)
+            start += len(batch)
+
+    def _prefetch(self, batches):
+        pending = queue.Queue(maxsize=self.max_pending)
+        stop = threading.Event()
+        done = object()
+
+        def put(item):
+            # give up once the consumer is gone instead of blocking forever
+            while not stop.is_set():
+                try:
+                    pending.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce():
+            try:
+                for batch in batches:
+                    if not put((batch, None)):
+                        return
+            except Exception as error:
+                put((None, error))
+                return
+            put((done, None))
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                batch, error = pending.get()
+                if error is not None:
+                    raise error
+                if batch is done:
+                    return
+                yield batch
+        finally:
+            stop.set()
+            producer.join()
+
+    def _text(self, record):
+        return record[self.field] if isinstance(record, dict) else record
+
+    def _record(self, record, text):
+        if not isinstance(record, dict):
+            return text
+        record = dict(record)
+        record[self.field] = text
+        return record
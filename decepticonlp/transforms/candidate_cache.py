@@ -0,0 +1,148 @@
+import array
+import sys
+from collections import OrderedDict
+
+from decepticonlp.utils import randomness
+
+
+class CandidateList(object):
+    """
+        Read-only sequence of candidate words stored compactly, as one joined
+        string and an array of the end offsets of the candidates in it.
+
+        Args:
+        candidates: iterable of str
+    """
+
+    __slots__ = ("buffer", "offsets")
+
+    def __init__(self, candidates):
+        candidates = list(candidates)
+        self.buffer = "".join(candidates)
+        self.offsets = array.array("L", [0])
+        for candidate in candidates:
+            self.offsets.append(self.offsets[-1] + len(candidate))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("candidate index out of range")
+        return self.buffer[self.offsets[index] : self.offsets[index + 1]]
+
+    def __iter__(self):
+        buffer, offsets = self.buffer, self.offsets
+        for start, end in zip(offsets, offsets[1:]):
+            yield buffer[start:end]
+
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self.buffer) + self.offsets.itemsize * len(self.offsets)
+
+
+class CandidateCache(object):
+    """
+        LRU cache of the candidates of CharacterPerturbations, keyed by the
+        perturbation type, its parameters, the candidates arguments and the word.
+
+        Search-based attacks ask for the candidates of the same frequent words
+        over and over; the cache enumerates them once and keeps them as
+        CandidateLists, within max_bytes.
+
+        Example:
+        cache = CandidateCache(max_bytes=16 * 2 ** 20)
+        typo = perturbations.TypoCharacterPerturbations()
+        for word in words:
+            for candidate in cache.candidates(typo, word, max_edits=1):
+                ...
+        print(cache.stats())
+        {'hits': 9000, 'misses': 1000, 'evictions': 0, 'entries': 1000, 'bytes': 1800000, 'hit_rate': 0.9}
+
+        Args:
+        max_bytes: int (default: 64 MiB)
+            -budget for the candidates held in memory.
+    """
+
+    def __init__(self, max_bytes=64 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.nbytes,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def _remember(self, key, candidates):
+        self.entries[key] = candidates
+        self.nbytes += candidates.nbytes
+        while self.nbytes > self.max_bytes and self.entries:
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+
+    def get(self, perturbation, word, max_edits=1, limit=None, **kwargs):
+        """
+            returns the CandidateList of perturbation.candidates(word, max_edits,
+            limit, **kwargs), enumerated on the first call only
+        """
+        key = (
+            type(perturbation).__name__,
+            perturbation.get_params(),
+            max_edits,
+            limit,
+            tuple(sorted(kwargs.items())),
+            word,
+        )
+        candidates = self.entries.get(key)
+        if candidates is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return candidates
+
+        self.misses += 1
+        candidates = CandidateList(
+            perturbation.candidates(word, max_edits, limit=limit, **kwargs)
+        )
+        self._remember(key, candidates)
+        return candidates
+
+    def candidates(
+        self,
+        perturbation,
+        word,
+        max_edits=1,
+        limit=None,
+        sample=None,
+        rng=None,
+        **kwargs
+    ):
+        """
+            Cached counterpart of perturbation.candidates, same arguments.
+            The sample is drawn from the cached candidates.
+            returns an iterator of words
+        """
+        candidates = self.get(perturbation, word, max_edits, limit, **kwargs)
+        if sample is None:
+            return iter(candidates)
+        indices = randomness.get_rng(rng).sample(
+            range(len(candidates)), min(sample, len(candidates))
+        )
+        return (candidates[index] for index in indices)
@@ -0,0 +1,57 @@
+from collections import namedtuple
+
+# One edit made by a perturbation: the operation ("insert", "delete",
+# "substitute", "transpose" or "shuffle"), its character position in the word
+# before the edit, and its cost in Damerau-Levenshtein edits.
+EditRecord = namedtuple("EditRecord", ["operation", "position", "cost"])
+
+
+class EditLog(object):
+    """
+        Edits made on a sentence, with their total cost kept up to date as they
+        are added, so an edit budget is checked without computing a metric.
+
+        The total is the exact Damerau-Levenshtein distance for edits that do
+        not overlap, and an upper bound otherwise (e.g. when Compose perturbs
+        the same word twice, or for shuffles, costed as the number of moved
+        characters).
+
+        Records are (word_index, EditRecord) pairs, word_index being the index
+        of the word in the text split on spaces when the edit was made.
+
+        Example:
+        tfms = transforms.Compose([transforms.AddChar(), transforms.TypoChar()])
+        text, log = tfms("This is fascinating!", return_edits=True)
+        print(text, log.total)
+        Thi z is fascinating! 2
+        print(list(log))
+        [(0, EditRecord(operation='insert', position=3, cost=1)), (1, EditRecord(operation='substitute', position=0, cost=1))]
+        print(log.within(1))
+        False
+    """
+
+    def __init__(self):
+        self.records = []
+        self.total = 0
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def add(self, word_index, record):
+        self.records.append((word_index, record))
+        self.total += record.cost
+
+    def extend(self, word_index, records):
+        for record in records:
+            self.add(word_index, record)
+
+    def merge(self, other):
+        self.records.extend(other.records)
+        self.total += other.total
+
+    def within(self, budget):
+        """returns True if the total cost is at most budget"""
+        return self.total <= budget
@@ -0,0 +1,84 @@
+import numpy as np
+
+from decepticonlp.transforms import keyboard
+from decepticonlp.utils import randomness
+
+HOMOGLYPH_FILE = "homoglyph.json"
+
+# combining marks appended by the "unicode" method of VisuallySimilarCharacterPerturbations
+COMBINING_MARKS = u"\u0301\u0310\u0305\u0315\u0312\u0302"
+
+_homoglyphs = None
+
+
+def get_homoglyphs():
+    """
+        returns the homoglyph table: the homoglyph.json dictionary and its
+        compiled SubstitutionTable, loaded only once per process
+    """
+    global _homoglyphs
+    if _homoglyphs is None:
+        dictionary = keyboard.load_json(HOMOGLYPH_FILE)
+        _homoglyphs = dictionary, keyboard.SubstitutionTable(dictionary)
+    return _homoglyphs
+
+
+def combine_word(word, marks, density=1.0, rng=None, return_kept=False):
+    """
+        Single word version of combine, drawing the same random numbers.
+        returns the word with its combining marks, and with return_kept=True
+        the boolean array of the characters that got one
+    """
+    rng = randomness.get_rng(rng)
+    codes = np.frombuffer(word.encode("utf-32-le"), dtype="<u4")
+    out = np.empty(2 * len(codes), dtype="<u4")
+    out[0::2] = codes
+    out[1::2] = marks[rng.integers(0, len(marks), size=len(codes))]
+    keep = np.ones(len(codes), dtype=bool)
+    if density < 1:
+        keep = rng.random(len(codes)) < density
+        out = out[np.stack([np.ones_like(keep), keep], axis=1).ravel()]
+    if return_kept:
+        return out.tobytes().decode("utf-32-le"), keep
+    return out.tobytes().decode("utf-32-le")
+
+
+def combine(codes, lengths, marks, density=1.0, rng=None):
+    """
+        Appends a combining mark to the characters of a padded (batch, width)
+        code-point array, writing base and mark code points interleaved into one
+        preallocated int32 buffer.
+
+        The marks are drawn with one rng.integers call over all the
+        characters in row-major order (the same stream as one
+        np.random.choice(marks, size=len(word)) per word). With density < 1,
+        a second draw keeps a mark on each character with probability density.
+
+        :codes: (batch, width) int array of code points, zero padded
+        :lengths: (batch,) array of word lengths
+        :marks: int32 array of combining mark code points
+        :density: float in range [0,1], fraction of characters getting a mark
+        :rng: see decepticonlp.utils.randomness.get_rng
+
+        returns the (batch, 2 * width) int32 array and the new lengths
+    """
+    batch, width = codes.shape
+    valid = np.arange(width) < lengths[:, None]
+    total = int(lengths.sum())
+    rng = randomness.get_rng(rng)
+    picked = marks[rng.integers(0, len(marks), size=total)]
+    if density < 1:
+        keep = rng.random(total) < density
+    else:
+        keep = np.ones(total, dtype=bool)
+
+    marked = np.zeros((batch, width), dtype=np.int64)
+    marked[valid] = keep
+    # every character moves right by the number of marks before it
+    base = np.arange(width) + np.cumsum(marked, axis=1) - marked
+    rows = np.broadcast_to(np.arange(batch)[:, None], (batch, width))
+
+    out = np.zeros((batch, 2 * width), dtype=np.int32)
+    out[rows[valid], base[valid]] = codes[valid]
+    out[rows[valid][keep], base[valid][keep] + 1] = picked[keep]
+    return out, lengths + marked.sum(axis=1)
@@ -0,0 +1,151 @@
+import json
+import pkgutil
+
+import numpy as np
+
+from decepticonlp.utils import randomness
+
+# Rows of each layout, top (digit row) to bottom, and the horizontal stagger of each row
+# in key widths. Keys on the same row are neighbours when one key width apart, keys on
+# adjacent rows when they overlap (less than a key width apart).
+ROW_OFFSETS = [0, 0.5, 0.75, 1.25]
+
+LAYOUT_ROWS = {
+    "qwerty": ["1234567890", "qwertyuiop", "asdfghjkl", "zxcvbnm"],
+    "azerty": ["1234567890", "azertyuiop", "qsdfghjklm", "wxcvbn"],
+    "dvorak": ["1234567890", "',.pyfgcrl", "aoeuidhtns", ";qjkxbmwvz"],
+}
+
+# QWERTY letters keep the neighbours shipped in keys_in_proximity.json
+LAYOUT_FILES = {"qwerty": "keys_in_proximity.json"}
+
+
+def load_json(name: str):
+    """Loads a JSON file shipped in the decepticonlp.transforms package."""
+    return json.loads(pkgutil.get_data("decepticonlp.transforms", name).decode("utf-8"))
+
+
+def _grid_neighbours(rows):
+    """returns {key: [neighbouring keys]} for a staggered grid of key rows"""
+    positions = [
+        (key, row, column + ROW_OFFSETS[row])
+        for row, keys in enumerate(rows)
+        for column, key in enumerate(keys)
+    ]
+    neighbours = {}
+    for key, row, x in positions:
+        neighbours[key] = [
+            other
+            for other, other_row, other_x in positions
+            if other != key
+            and (
+                (other_row == row and abs(other_x - x) == 1)
+                or (abs(other_row - row) == 1 and abs(other_x - x) < 1)
+            )
+        ]
+    return neighbours
+
+
+class SubstitutionTable(object):
+    """
+        Character substitution table compiled into flat integer arrays.
+
+        The substitutes (neighbours) of the character with code point c are the
+        code points neighbours[starts[c] : starts[c] + counts[c]], so picking one
+        is an array lookup. Characters without substitutes have counts[c] == 0.
+
+        Args:
+        adjacency: dict
+            -maps each character to the list (or string) of its substitutes.
+    """
+
+    def __init__(self, adjacency):
+        size = max(ord(key) for key in adjacency) + 1
+        self.starts = np.zeros(size, dtype=np.int32)
+        self.counts = np.zeros(size, dtype=np.int32)
+        flat = []
+        for key, keys in adjacency.items():
+            self.starts[ord(key)] = len(flat)
+            self.counts[ord(key)] = len(keys)
+            flat.extend(ord(neighbour) for neighbour in keys)
+        self.neighbours = np.array(flat, dtype=np.int32)
+        self._substitutes = {}
+
+    def __contains__(self, char):
+        code_point = ord(char)
+        return code_point < len(self.counts) and self.counts[code_point] > 0
+
+    def neighbour(self, char, index):
+        """returns the index-th neighbour of char, index < count(char)"""
+        return chr(self.neighbours[self.starts[ord(char)] + index])
+
+    def count(self, char):
+        code_point = ord(char)
+        return int(self.counts[code_point]) if code_point < len(self.counts) else 0
+
+    def substitutes(self, char):
+        """returns the list of the substitutes (neighbours) of char"""
+        if char not in self._substitutes:
+            count = self.count(char)
+            start = self.starts[ord(char)] if count else 0
+            neighbours = self.neighbours[start : start + count].tolist()
+            self._substitutes[char] = [chr(code) for code in neighbours]
+        return self._substitutes[char]
+
+    def substitute(self, codes, rng=None):
+        """
+            Replaces every code point of the int array codes having substitutes
+            by one of them, drawn uniformly with a single rng.integers call
+            (in row-major order, one draw per substituted character).
+            returns the new int32 array
+        """
+        rng = randomness.get_rng(rng)
+        codes = np.asarray(codes)
+        known = codes < len(self.counts)
+        known[known] = self.counts[codes[known]] > 0
+        known_codes = codes[known]
+        choice = rng.integers(0, self.counts[known_codes])
+        out = codes.astype(np.int32)
+        out[known] = self.neighbours[self.starts[known_codes] + choice]
+        return out
+
+
+class KeyboardLayout(SubstitutionTable):
+    """
+        Keyboard adjacency table compiled into flat integer arrays, see
+        SubstitutionTable. The neighbours of a key are the keys next to it.
+    """
+
+    @classmethod
+    def from_rows(cls, rows, overrides=None):
+        """
+            Builds a layout from its rows of (lowercase) keys. Letters get their
+            uppercase counterparts too, with uppercase neighbours.
+        """
+        adjacency = _grid_neighbours(rows)
+        adjacency.update(
+            {
+                key.upper(): [neighbour.upper() for neighbour in keys]
+                for key, keys in adjacency.items()
+                if key.isalpha()
+            }
+        )
+        adjacency.update(overrides or {})
+        return cls(adjacency)
+
+
+_layouts = {}
+
+
+def get_layout(name="qwerty"):
+    """
+        returns the compiled KeyboardLayout for one of LAYOUT_ROWS,
+        built only once per process
+    """
+    assert name in LAYOUT_ROWS, "Layout chosen invalid. Please choose from " + str(
+        list(LAYOUT_ROWS)
+    )
+    if name not in _layouts:
+        overrides = load_json(LAYOUT_FILES[name]) if name in LAYOUT_FILES else None
+        _layouts[name] = KeyboardLayout.from_rows(LAYOUT_ROWS[name], overrides)
+    return _layouts[name]
@@ -1,32 +1,369 @@
 import abc
+import bisect
+import itertools
 import math
-import random
-import json
 import string
 import numpy as np
-from pathlib import Path
+
+from decepticonlp.transforms import edits
+from decepticonlp.transforms import glyphs
+from decepticonlp.transforms import keyboard
+from decepticonlp.utils import randomness
+
+
+def encode_batch(words):
+    """
+        Encodes a list of words as a zero padded (len(words), max length) int32
+        array of code points and the array of their lengths.
+    """
+    lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+    width = int(lengths.max()) if len(words) else 0
+    codes = np.zeros((len(words), width), dtype=np.int32)
+    flat = np.frombuffer("".join(words).encode("utf-32-le"), dtype="<u4")
+    codes[np.arange(width) < lengths[:, None]] = flat
+    return codes, lengths
+
+
+def decode_batch(codes, lengths):
+    """Inverse of encode_batch, returns the list of words."""
+    flat = codes[np.arange(codes.shape[1]) < lengths[:, None]]
+    text = flat.astype("<u4").tobytes().decode("utf-32-le")
+    ends = np.cumsum(lengths).tolist()
+    return [text[end - length : end] for end, length in zip(ends, lengths.tolist())]
+
+
+def _gather(codes, source, lengths):
+    """
+        returns out[i, j] = codes[i, source[i, j]] for j < lengths[i], 0 elsewhere
+    """
+    source = np.clip(source, 0, max(codes.shape[1] - 1, 0))
+    out = np.take_along_axis(codes, source, axis=1) if codes.size else source * 0
+    out[np.arange(source.shape[1]) >= lengths[:, None]] = 0
+    return out.astype(np.int32)
+
+
+def _sample_ranks(count, size, rng=None):
+    """yields size distinct ranks in [0, count), uniformly at random"""
+    assert count < 2 ** 63, "too many candidates to sample from, use limit"
+    rng = randomness.get_rng(rng)
+    if 2 * size > count:
+        # dense: sample from all the ranks
+        for rank in rng.sample(range(count), size):
+            yield rank
+        return
+    drawn = set()
+    while len(drawn) < size:
+        rank = rng.randrange(count)
+        if rank not in drawn:
+            drawn.add(rank)
+            yield rank
+
+
+class _CandidateSpace(object):
+    """
+        All the variants of a word obtained by applying 1 to max_edits edits.
+
+        An edit replaces the slice word[start:end] of one slot (start, end,
+        choices) by one of its choices. The slots of one variant are taken in
+        order and must leave at least gap characters untouched between them,
+        which (with the dedupe rules of each perturbation's slots) makes every
+        variant unique. number(i, j) is the number of variants using exactly j
+        edits among slots i.., computed once, so the total count is closed form
+        and the rank-th variant is built directly, without enumerating the ones
+        before it.
+    """
+
+    def __init__(self, word, slots, max_edits, gap=0):
+        self.word = word
+        self.slots = sorted(slots, key=lambda slot: (slot[0], slot[1]))
+        self.max_edits = max_edits
+        starts = [slot[0] for slot in self.slots]
+        # index of the first slot compatible with (following) each slot
+        self.following = [
+            max(i + 1, bisect.bisect_left(starts, end + gap))
+            for i, (start, end, choices) in enumerate(self.slots)
+        ]
+
+        size = len(self.slots)
+        self.table = [[1] + [0] * max_edits for _ in range(size + 1)]
+        for i in reversed(range(size)):
+            following = self.table[self.following[i]]
+            for j in range(1, max_edits + 1):
+                self.table[i][j] = (
+                    self.table[i + 1][j] + len(self.slots[i][2]) * following[j - 1]
+                )
+        self.count = sum(self.table[0][1:])
+
+    def number(self, i, j):
+        return self.table[min(i, len(self.slots))][j]
+
+    def variants(self):
+        """yields all the variants, in rank order"""
+        for edits in range(1, self.max_edits + 1):
+            for variant in self._variants(0, edits, 0, []):
+                yield variant
+
+    def _variants(self, i, edits, position, pieces):
+        if not edits:
+            yield "".join(pieces) + self.word[position:]
+            return
+        if edits == 1:
+            # last edit, built without recursing
+            prefix = "".join(pieces)
+            for start, end, choices in self.slots[i:]:
+                head = prefix + self.word[position:start]
+                tail = self.word[end:]
+                for choice in choices:
+                    yield head + choice + tail
+            return
+        for m in range(i, len(self.slots)):
+            following = self.following[m]
+            if not self.number(following, edits - 1):
+                # neither this slot nor the ones after it can be completed
+                break
+            start, end, choices = self.slots[m]
+            prefix = pieces + [self.word[position:start]]
+            for choice in choices:
+                for variant in self._variants(
+                    following, edits - 1, end, prefix + [choice]
+                ):
+                    yield variant
+
+    def variant(self, rank):
+        """returns the rank-th variant, 0 <= rank < count"""
+        edits = 1
+        while rank >= self.number(0, edits):
+            rank -= self.number(0, edits)
+            edits += 1
+
+        pieces, position, i = [], 0, 0
+        while edits:
+            # the variants editing slot i come before the ones skipping it
+            start, end, choices = self.slots[i]
+            rest = self.number(self.following[i], edits - 1)
+            if rank >= len(choices) * rest:
+                rank -= len(choices) * rest
+                i += 1
+                continue
+            pieces.append(self.word[position:start])
+            pieces.append(choices[rank // rest])
+            rank %= rest
+            position, i, edits = end, self.following[i], edits - 1
+        pieces.append(self.word[position:])
+        return "".join(pieces)
 
 
 class CharacterPerturbations(metaclass=abc.ABCMeta):
     """
         An abstract class used to represent the character perturbations.SubClass should implement the apply method.
+
+        Every method accepts an rng keyword argument: None (default) draws from
+        the global random and np.random state, a np.random.Generator or a seed
+        draws from that stream instead (see decepticonlp.utils.randomness).
+        With return_edits=True, apply returns (word, list of edits.EditRecord).
+
         Methods
         -------
         apply(self, word: str, **kwargs)
             - applies the perturbation on the word and returns it.
+        apply_batch(self, words: list, **kwargs)
+            - applies the perturbation on every word of the list and returns the list.
+        apply_buffer(self, buffer: TokenBuffer, indices, **kwargs)
+            - applies the perturbation on tokens of a TokenBuffer.
+        is_eligible(self, word: str)
+            - returns whether apply can change the word (ignore=True skips the others).
+        candidates(self, word: str, max_edits=1, **kwargs)
+            - lazily yields every unique perturbation of the word.
+        count_candidates(self, word: str, max_edits=1, **kwargs)
+            - returns the number of candidates, without generating them.
     """
 
+    # words shorter than this are left unchanged (or rejected with ignore=False)
+    min_length = 0
+    # untouched characters required between two edits of one candidate
+    edit_gap = 0
+
     @abc.abstractmethod
     def apply(self, word: str, **kwargs):  # pragma: no cover
         """Applies perturbation and returns the word."""
         raise NotImplementedError
 
+    def apply_batch(self, words, **kwargs):
+        """
+            Applies the perturbation on every word, with the same per-word
+            semantics (ignore, minimum length) as apply.
+
+            Subclasses implementing _apply_codes perturb the whole batch at once:
+            the eligible words are encoded into one padded code-point array, all
+            random positions are drawn in a single NumPy call, and the results
+            are decoded once.
+
+            words = ["Adversarial", "is", "fascinating"]
+            print(DeleteCharacterPerturbations().apply_batch(words))
+            ['Adverarial', 'is', 'fascinatin']
+
+            :words: list of words to be edited
+            :kwargs: the keyword arguments of apply
+
+            returns the list of edited words
+        """
+        assert not kwargs.get("return_edits"), "apply_batch does not return edits"
+        words = list(words)
+        if kwargs.get("rng") is not None:
+            # a seed starts one stream for the whole batch
+            kwargs["rng"] = randomness.get_rng(kwargs["rng"])
+        if type(self)._apply_codes is CharacterPerturbations._apply_codes:
+            return [self.apply(word, **kwargs) for word in words]
+
+        codes, lengths = encode_batch(words)
+        is_word = ~(codes == ord(" ")).any(axis=1)
+        long_enough = lengths >= self.min_length
+        if not kwargs.get("ignore", self.get_ignore_default_value()):
+            assert is_word.all(), self.get_string_not_a_word_error_msg()
+            assert long_enough.all(), self.get_min_length_error_msg()
+
+        rows = np.flatnonzero(is_word & long_enough)
+        if not len(rows):
+            return words
+        lengths = lengths[rows]
+        codes = codes[rows, : max(int(lengths.max()), 0)]
+        codes, lengths = self._apply_codes(codes, lengths, **kwargs)
+        for i, word in zip(rows.tolist(), decode_batch(codes, lengths)):
+            words[i] = word
+        return words
+
+    def apply_buffer(self, buffer, indices, inplace=False, **kwargs):
+        """
+            Applies the perturbation on the tokens at indices of a TokenBuffer,
+            with the semantics of apply_batch, without building their strings.
+
+            buffer = TokenBuffer.from_texts(["Adversarial is fascinating"])
+            edited = DeleteCharacterPerturbations().apply_buffer(buffer, [0, 2])
+            print(edited.decode())
+            ['Adverarial is fascinatin']
+
+            :buffer: decepticonlp.utils.buffer.TokenBuffer
+            :indices: indices of the tokens to be edited
+            :inplace: if True, edits the buffer itself instead of a copy
+            :kwargs: the keyword arguments of apply
+
+            returns the edited TokenBuffer
+        """
+        assert not kwargs.get("return_edits"), "apply_buffer does not return edits"
+        if kwargs.get("rng") is not None:
+            kwargs["rng"] = randomness.get_rng(kwargs["rng"])
+        indices = np.asarray(indices, dtype=np.int64)
+        if type(self)._apply_codes is CharacterPerturbations._apply_codes:
+            words = [buffer.token(index) for index in indices.tolist()]
+            codes, lengths = encode_batch(self.apply_batch(words, **kwargs))
+            return buffer.replace(indices, codes, lengths, inplace=inplace)
+
+        # tokens are split on spaces, so only the length decides eligibility
+        long_enough = buffer.lengths[indices] >= self.min_length
+        if not kwargs.get("ignore", self.get_ignore_default_value()):
+            assert long_enough.all(), self.get_min_length_error_msg()
+        indices = indices[long_enough]
+        if not len(indices):
+            return buffer if inplace else buffer.copy()
+        codes, lengths = self._apply_codes(*buffer.padded(indices), **kwargs)
+        return buffer.replace(indices, codes, lengths, inplace=inplace)
+
+    def _apply_codes(self, codes, lengths, rng=None, **kwargs):  # pragma: no cover
+        """
+            Perturbs a padded (batch, width) code-point array of eligible words.
+            returns the new code-point array and lengths
+        """
+        raise NotImplementedError
+
+    def _slots(self, word, **kwargs):  # pragma: no cover
+        """
+            returns the single edits of the word as (start, end, choices) slots:
+            word[start:end] may be replaced by any of the choices, all different
+            from it and leading to different words
+        """
+        raise NotImplementedError
+
+    def _candidate_space(self, word, max_edits, **kwargs):
+        assert max_edits >= 1, "max_edits must be at least 1"
+        ignore = kwargs.get("ignore", self.get_ignore_default_value())
+        if ignore and not self.is_eligible(word):
+            return _CandidateSpace(word, [], max_edits)
+        assert " " not in word, self.get_string_not_a_word_error_msg()
+        assert len(word) >= self.min_length, self.get_min_length_error_msg()
+        return _CandidateSpace(
+            word, self._slots(word, **kwargs), max_edits, self.edit_gap
+        )
+
+    def count_candidates(self, word, max_edits=1, **kwargs):
+        """
+            returns the number of candidates(word, max_edits, **kwargs) yields
+            without a limit or sample, computed in closed form
+        """
+        return self._candidate_space(word, max_edits, **kwargs).count
+
+    def candidates(
+        self, word, max_edits=1, limit=None, sample=None, rng=None, **kwargs
+    ):
+        """
+            Lazily yields the unique perturbations of the word made of 1 to
+            max_edits edits of the kind apply makes (the original word is never
+            yielded). Candidates are generated one at a time from their rank, so
+            the full set is never built.
+
+            delete = DeleteCharacterPerturbations()
+            print(list(delete.candidates("Noise")))
+            ['Nise', 'Nose', 'Noie']
+            print(delete.count_candidates("Noise", max_edits=2))
+            4
+
+            :word: word to be edited
+            :max_edits: default (1), maximum number of edits per candidate
+            :limit: default (None), maximum number of candidates yielded
+            :sample: default (None), yields this many distinct candidates drawn
+                     uniformly at random (in random order) instead of all of them
+            :rng: default (None), source of randomness for sample
+            :kwargs: the keyword arguments of apply (ignore, char_perturb...)
+
+            returns a generator of words
+        """
+        space = self._candidate_space(word, max_edits, **kwargs)
+        count = space.count if limit is None else min(limit, space.count)
+        if sample is None:
+            variants = space.variants()
+            if limit is not None:
+                variants = itertools.islice(variants, count)
+            for variant in variants:
+                yield variant
+            return
+        for rank in _sample_ranks(space.count, min(sample, count), rng):
+            yield space.variant(rank)
+
+    def get_params(self):
+        """returns the constructor parameters the candidates depend on"""
+        return ()
+
+    def _result(self, word, word_edits, kwargs):
+        """returns the word, or (word, word_edits) if return_edits is set"""
+        if kwargs.get("return_edits", False):
+            return word, word_edits
+        return word
+
+    def is_eligible(self, word):
+        """
+            returns False for the words apply leaves unchanged with ignore=True
+            because they are not a word or are shorter than min_length
+        """
+        return " " not in word and len(word) >= self.min_length
+
     def get_ignore_default_value(self):
         return True
 
     def get_string_not_a_word_error_msg(self):
         return "given string is not a word"
 
+    def get_min_length_error_msg(self):
+        return "Word needs to have a minimum length of {}".format(self.min_length)
+
 
 class InsertSpaceCharacterPerturbations(CharacterPerturbations):
     """
@@ -37,6 +374,12 @@ class InsertSpaceCharacterPerturbations(CharacterPerturbations):
             - applies the space perturbation on the word and returns it.
     """
 
+    min_length = 2
+    edit_gap = 1
+
+    def get_min_length_error_msg(self):
+        return "Word needs to have a minimum length of 2 for an insert operation"
+
     def apply(self, word: str, char_perturb=False, **kwargs):
         """
             Insert space or character at a random position in the word
@@ -55,28 +398,56 @@ class InsertSpaceCharacterPerturbations(CharacterPerturbations):
             :word: word to be edited
             :char_perturb: default(False), boolean, adds a character instead of spaces
             :ignore: default (True), boolean if assertions should be ignored
+            :return_edits: default (False), also return the list of EditRecords
             -returns edited word a random space in between
             """
 
         if kwargs.get("ignore", self.get_ignore_default_value()) and (
             " " in word or len(word) < 2
         ):
-            return word
+            return self._result(word, [], kwargs)
 
         assert " " not in word, self.get_string_not_a_word_error_msg()
 
-        assert (
-            len(word) >= 2
-        ), "Word needs to have a minimum length of 2 for an insert operation"
+        assert len(word) >= 2, self.get_min_length_error_msg()
 
+        rng = randomness.get_rng(kwargs.get("rng"))
         if char_perturb == True:
-            index = random.randint(0, len(word))  # select random index
-            return (
-                word[:index] + random.choice(string.ascii_letters[:26]) + word[index:]
+            index = rng.randint(0, len(word))  # select random index
+            word = (
+                word[:index] + rng.choice(string.ascii_letters[:26]) + word[index:]
             )  # insert character
         else:
-            index = random.randint(1, len(word) - 1)  # select random index
-            return word[:index] + " " + word[index:]  # insert space
+            index = rng.randint(1, len(word) - 1)  # select random index
+            word = word[:index] + " " + word[index:]  # insert space
+        if not kwargs.get("return_edits", False):
+            return word
+        return word, [edits.EditRecord("insert", index, 1)]
+
+    def _apply_codes(self, codes, lengths, rng=None, char_perturb=False, **kwargs):
+        rng = randomness.get_rng(rng)
+        if char_perturb == True:
+            index = rng.integers(0, lengths + 1)
+            inserted = rng.integers(ord("a"), ord("z") + 1, size=len(lengths))
+        else:
+            index = rng.integers(1, lengths)
+            inserted = np.full(len(lengths), ord(" "))
+
+        columns = np.arange(codes.shape[1] + 1)
+        source = np.where(columns < index[:, None], columns, columns - 1)
+        out = _gather(codes, source, lengths + 1)
+        out[np.arange(len(lengths)), index] = inserted
+        return out, lengths + 1
+
+    def _slots(self, word, char_perturb=False, **kwargs):
+        if char_perturb == True:
+            # a letter is only inserted before a run of itself, not inside or after it
+            letters = string.ascii_letters[:26]
+            return [
+                (i, i, [c for c in letters if i == 0 or word[i - 1] != c])
+                for i in range(len(word) + 1)
+            ]
+        return [(i, i, [" "]) for i in range(1, len(word))]
 
 
 class ShuffleCharacterPerturbations(CharacterPerturbations):
@@ -88,6 +459,12 @@ class ShuffleCharacterPerturbations(CharacterPerturbations):
             - applies the shuffle perturbation on the word and returns it.
     """
 
+    min_length = 4
+    edit_gap = 1
+
+    def get_min_length_error_msg(self):
+        return "Word needs to have a minimum length of 4 for a shuffle operation"
+
     def apply(self, word: str, **kwargs):
         """
             if mid=True:
@@ -108,6 +485,8 @@ class ShuffleCharacterPerturbations(CharacterPerturbations):
             :param mid :
             if set, it shuffle all the characters barring the initial and last
             if not set, it swap any two characters barring the initial and last
+            :param return_edits: default (False), also return the list of EditRecords
+            (a shuffle costs the number of characters it moved)
 
 
             returns shuffled word with first and last character intact
@@ -116,30 +495,66 @@ class ShuffleCharacterPerturbations(CharacterPerturbations):
         if kwargs.get("ignore", self.get_ignore_default_value()) and (
             " " in word or len(word) < 4
         ):
-            return word
+            return self._result(word, [], kwargs)
 
         assert " " not in word, self.get_string_not_a_word_error_msg()
 
-        assert (
-            len(word) >= 4
-        ), "Word needs to have a minimum length of 4 for a shuffle operation"
+        assert len(word) >= 4, self.get_min_length_error_msg()
 
+        rng = randomness.get_rng(kwargs.get("rng"))
         if kwargs.get("mid", True):
             # Split word into first & last letter, and middle letters
             first, mid, last = word[0], word[1:-1], word[-1]
 
             mid = list(mid)
-            random.shuffle(mid)
+            rng.shuffle(mid)
 
-            return first + "".join(mid) + last
+            shuffled = first + "".join(mid) + last
+            if not kwargs.get("return_edits", False):
+                return shuffled
+            moved = sum(a != b for a, b in zip(word, shuffled))
+            return shuffled, [edits.EditRecord("shuffle", 1, moved)] if moved else []
         else:
             char_list = list(word)
-            index = random.randint(1, len(word) - 3)  # select random offset for tuple
+            index = rng.randint(1, len(word) - 3)  # select random offset for tuple
             char_list[index], char_list[index + 1] = (
                 char_list[index + 1],
                 char_list[index],
             )  # swap tuple
-            return "".join(char_list)
+            if not kwargs.get("return_edits", False):
+                return "".join(char_list)
+            word_edits = []
+            if char_list[index] != char_list[index + 1]:
+                word_edits.append(edits.EditRecord("transpose", index, 1))
+            return "".join(char_list), word_edits
+
+    def _apply_codes(self, codes, lengths, rng=None, **kwargs):
+        rng = randomness.get_rng(rng)
+        columns = np.arange(codes.shape[1])
+        if kwargs.get("mid", True):
+            # random sort keys for the middle characters, first and last stay in place
+            keys = rng.random(codes.shape)
+            keys[:, 0] = -1
+            last = columns >= lengths[:, None] - 1
+            keys[last] = 1 + np.broadcast_to(columns, codes.shape)[last]
+            source = np.argsort(keys, axis=1)
+        else:
+            index = rng.integers(1, lengths - 2)[:, None]
+            source = np.where(
+                columns == index,
+                index + 1,
+                np.where(columns == index + 1, index, columns),
+            )
+        return _gather(codes, source, lengths), lengths
+
+    def _slots(self, word, **kwargs):
+        # swaps of two different adjacent middle characters, with or without mid;
+        # shuffles of the middle are reached with several edits
+        return [
+            (i, i + 2, [word[i + 1] + word[i]])
+            for i in range(1, len(word) - 2)
+            if word[i] != word[i + 1]
+        ]
 
 
 class DeleteCharacterPerturbations(CharacterPerturbations):
@@ -151,6 +566,14 @@ class DeleteCharacterPerturbations(CharacterPerturbations):
             - applies the delete perturbation on the word and returns it.
     """
 
+    min_length = 3
+    edit_gap = 1
+
+    def get_min_length_error_msg(self):
+        return (
+            "Word needs to have a minimum length of 3 characters for a delete operation"
+        )
+
     def apply(self, word: str, **kwargs):
         """
                 Deletes a random character which is not at the either end
@@ -168,21 +591,38 @@ class DeleteCharacterPerturbations(CharacterPerturbations):
 
                 :word: word to be edited
                 :ignore: default (True), boolean if assertions should be ignored
+                :return_edits: default (False), also return the list of EditRecords
 
                 -returns word with random character deletion
                 """
         if kwargs.get("ignore", self.get_ignore_default_value()) and (
             " " in word or len(word) < 3
         ):
-            return word
+            return self._result(word, [], kwargs)
 
         assert " " not in word, self.get_string_not_a_word_error_msg()
 
-        assert (
-            len(word) >= 3
-        ), "Word needs to have a minimum length of 3 characters for a delete operation"
-        index = random.randint(1, len(word) - 2)  # select random index
-        return word[:index] + word[index + 1 :]  # delete index
+        assert len(word) >= 3, self.get_min_length_error_msg()
+        rng = randomness.get_rng(kwargs.get("rng"))
+        index = rng.randint(1, len(word) - 2)  # select random index
+        word = word[:index] + word[index + 1 :]  # delete index
+        if not kwargs.get("return_edits", False):
+            return word
+        return word, [edits.EditRecord("delete", index, 1)]
+
+    def _apply_codes(self, codes, lengths, rng=None, **kwargs):
+        index = randomness.get_rng(rng).integers(1, lengths - 1)
+        columns = np.arange(codes.shape[1])
+        source = np.where(columns < index[:, None], columns, columns + 1)
+        return _gather(codes, source, lengths - 1), lengths - 1
+
+    def _slots(self, word, **kwargs):
+        # only the first character of a run is deleted, the others give the same word
+        return [
+            (i, i + 1, [""])
+            for i in range(1, len(word) - 1)
+            if i == 1 or word[i] != word[i - 1]
+        ]
 
 
 class TypoCharacterPerturbations(CharacterPerturbations):
@@ -192,15 +632,27 @@ class TypoCharacterPerturbations(CharacterPerturbations):
         -------
         apply(self, word: str, **kwargs)
             - applies the typo perturbation on the word and returns it.
+
+        Args:
+        layout: str (default: "qwerty")
+            -keyboard layout the typos are drawn from, one of "qwerty", "azerty", "dvorak".
     """
 
+    def __init__(self, layout="qwerty"):
+        self.layout = keyboard.get_layout(layout)
+        self.layout_name = layout
+
+    def get_params(self):
+        return (self.layout_name,)
+
     def apply(self, word: str, **kwargs):
         """
             shifts a character by one keyboard space:
             one space up, down, left or right
             each word is typofied with some probability 'p':
             1. (p*100) percent of character will become typos
-            keyboard is defined as:
+            keyboard is defined as (default layout):
+            1234567890
             qwertyuiop
             asdfghjkl
              zxcvbnm
@@ -209,11 +661,12 @@ class TypoCharacterPerturbations(CharacterPerturbations):
             Noide
             :param word : word to be shuffled
             :param probability: probability of a typo
+            :param return_edits: default (False), also return the list of EditRecords
             returns typofied word
             """
 
         if kwargs.get("ignore", self.get_ignore_default_value()) and (" " in word):
-            return word
+            return self._result(word, [], kwargs)
 
         assert " " not in word, self.get_string_not_a_word_error_msg()
 
@@ -222,22 +675,51 @@ class TypoCharacterPerturbations(CharacterPerturbations):
         num_chars_to_shift = math.ceil(chars * kwargs.get("probability", 0.1))
 
         # list of characters to be switched
-        positions_to_shift = random.sample(range(chars), num_chars_to_shift)
+        rng = randomness.get_rng(kwargs.get("rng"))
+        positions_to_shift = rng.sample(range(chars), num_chars_to_shift)
 
-        # defining a dictionary of keys located close to each character
-        json_path = Path("decepticonlp/transforms/keys_in_proximity.json")
-        keys_in_proximity = json.load(open(json_path, "r"))
-
-        for i, c in enumerate(word):
-            # Check Upper
-
-            # Check if in position and given keys
-            if i in positions_to_shift and c in keys_in_proximity:
-                word[i] = random.choice(keys_in_proximity[c])
+        shifted = []
+        for i in sorted(positions_to_shift):
+            count = self.layout.count(word[i])
+            if count:
+                word[i] = self.layout.neighbour(word[i], rng.randrange(count))
+                shifted.append(i)
 
         # recombine
         word = "".join(word)
-        return word
+        if not kwargs.get("return_edits", False):
+            return word
+        return word, [edits.EditRecord("substitute", i, 1) for i in shifted]
+
+    def _apply_codes(self, codes, lengths, rng=None, **kwargs):
+        rng = randomness.get_rng(rng)
+        columns = np.arange(codes.shape[1])
+        padding = columns >= lengths[:, None]
+        num_chars_to_shift = np.ceil(lengths * kwargs.get("probability", 0.1))
+
+        # the positions with the smallest random keys are shifted
+        keys = rng.random(codes.shape)
+        keys[padding] = 2
+        ranks = np.argsort(np.argsort(keys, axis=1), axis=1)
+        shift = (ranks < num_chars_to_shift[:, None]) & ~padding
+
+        counts = self.layout.counts
+        points = np.where(codes < len(counts), codes, 0)
+        count = np.where(codes < len(counts), counts[points], 0)
+        shift &= count > 0
+        choice = (rng.random(codes.shape) * count).astype(np.int64)
+        neighbour = self.layout.neighbours[
+            np.where(shift, self.layout.starts[points] + choice, 0)
+        ]
+        return np.where(shift, neighbour, codes).astype(np.int32), lengths
+
+    def _slots(self, word, **kwargs):
+        slots = []
+        for i, char in enumerate(word):
+            neighbours = self.layout.substitutes(char)
+            if neighbours:
+                slots.append((i, i + 1, neighbours))
+        return slots
 
 
 class VisuallySimilarCharacterPerturbations(CharacterPerturbations):
@@ -249,26 +731,36 @@ class VisuallySimilarCharacterPerturbations(CharacterPerturbations):
             - applies the visually similar perturbation on the word and returns it.
     """
 
-    def __init__(self, *args):
+    def __init__(self, *args, marks=glyphs.COMBINING_MARKS, density=1.0):
         """
         args are the methods in which
         you want to perturb the word.
         Pass "unicode" and "homoglyph" as 
         the args.
+        marks are the combining marks the
+        "unicode" method picks from, and
+        density the fraction of characters
+        getting one.
         """
-        json_path = Path("decepticonlp/transforms/homoglyph.json")
-
-        self.homoglyph_dic = json.load(open(json_path, "r"))
+        assert len(marks) > 0, "marks must contain at least one combining mark"
+        assert 0 <= density <= 1, "density must be in range [0,1]"
+        self.homoglyph_dic, self.homoglyphs = glyphs.get_homoglyphs()
         self.arg = args
+        self.marks = np.array([ord(mark) for mark in marks], dtype=np.int32)
+        self.density = density
 
     def apply(self, word: str, seed=None, **kwargs):
         """
-            unicode_array is a list of different unicodes.
-            each char of the word is perturbed by a unicode chosen at random
-            from the unicode_array.
+            picks "unicode" or "homoglyph" at random.
+            unicode: each char of the word (a fraction density of them) is
+            followed by a combining mark chosen at random from marks.
+            homoglyph: each char is replaced by a random homoglyph.
 
             :word: word to be edited
+            :seed: default (None), when no rng is given, draws from
+                   np.random.RandomState(seed) (the global state is left alone)
             :ignore: default (True), boolean if assertions should be ignored
+            :return_edits: default (False), also return the list of EditRecords
 
             eg:
             input : adversarial
@@ -280,38 +772,76 @@ class VisuallySimilarCharacterPerturbations(CharacterPerturbations):
             visual_similar_chars("Hey Stop", ignore=False)
             assertion error
             """
-        if seed is not None:
-            np.random.seed(seed)
-
         if kwargs.get("ignore", self.get_ignore_default_value()) and " " in word:
-            return word
+            return self._result(word, [], kwargs)
         assert " " not in word, self.get_string_not_a_word_error_msg()
 
-        unicode_array = np.array(
-            [u"\u0301", u"\u0310", u"\u0305", u"\u0315", u"\u0312", u"\u0302"]
-        )
-        method_pick = np.random.choice(len(self.arg), 1)[0]
+        rng = self.get_rng(seed, kwargs.get("rng"))
+        method_pick = rng.integers(0, len(self.arg), 1)[0]
 
+        return_edits = kwargs.get("return_edits", False)
         if self.arg[method_pick] == "unicode":
-            char_array = np.array(list(word))
-
-            picked_unicode = np.random.choice(unicode_array, size=len(word))
-
-            perturbed_array = np.char.add(char_array, picked_unicode)
-            return "".join(perturbed_array)
+            if not return_edits:
+                return glyphs.combine_word(word, self.marks, self.density, rng)
+            word, kept = glyphs.combine_word(
+                word, self.marks, self.density, rng, return_kept=True
+            )
+            # a mark is inserted after each kept character
+            positions = np.flatnonzero(kept) + 1
+            return word, [edits.EditRecord("insert", int(i), 1) for i in positions]
 
         if self.arg[method_pick] == "homoglyph":
-            char_list = list(word)
-
-            char_list_glyph = []
-            for char in char_list:
-                if char in self.homoglyph_dic:
-                    glyph_string = self.homoglyph_dic[char]
-                    glyph_pick = np.random.choice(len(glyph_string), 1)[0]
-                    char_list_glyph.append(glyph_string[glyph_pick])
-                else:
-                    char_list_glyph.append(char)
-            return "".join(char_list_glyph)
+            codes = np.frombuffer(word.encode("utf-32-le"), dtype="<u4")
+            substituted = self.homoglyphs.substitute(codes, rng).astype("<u4")
+            word = substituted.tobytes().decode("utf-32-le")
+            if not return_edits:
+                return word
+            positions = np.flatnonzero(substituted != codes)
+            return word, [edits.EditRecord("substitute", int(i), 1) for i in positions]
+
+    def _apply_codes(self, codes, lengths, rng=None, seed=None, **kwargs):
+        """
+            picks a method for every word with one draw, substitutes the
+            homoglyphs of all the homoglyph words with one more
+        """
+        rng = self.get_rng(seed, rng)
+        methods = np.array(self.arg)[rng.integers(0, len(self.arg), len(lengths))]
+        homoglyph = methods == "homoglyph"
+        codes = codes.copy()
+        codes[homoglyph] = self.homoglyphs.substitute(codes[homoglyph], rng)
+
+        rows = np.flatnonzero(methods == "unicode")
+        if len(rows):
+            marked, marked_lengths = glyphs.combine(
+                codes[rows], lengths[rows], self.marks, self.density, rng
+            )
+            codes = np.pad(codes, ((0, 0), (0, codes.shape[1])), "constant")
+            codes[rows] = marked
+            lengths = lengths.copy()
+            lengths[rows] = marked_lengths
+        return codes, lengths
+
+    def get_params(self):
+        return (self.arg, tuple(self.marks.tolist()), self.density)
+
+    def _slots(self, word, **kwargs):
+        slots = []
+        if "homoglyph" in self.arg:
+            for i, char in enumerate(word):
+                glyphs_of_char = self.homoglyph_dic.get(char, "")
+                choices = sorted(set(glyphs_of_char) - {char}, key=glyphs_of_char.index)
+                if choices:
+                    slots.append((i, i + 1, choices))
+        if "unicode" in self.arg:
+            marks = [chr(mark) for mark in self.marks]
+            slots.extend((i + 1, i + 1, marks) for i in range(len(word)))
+        return slots
+
+    def get_rng(self, seed, rng):
+        """the legacy seed argument applies only when no rng is given"""
+        if rng is None and seed is not None:
+            rng = np.random.RandomState(seed)
+        return randomness.get_rng(rng)
 
 
 if __name__ == "__main__":
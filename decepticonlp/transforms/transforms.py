@@ -2,8 +2,12 @@ _author_ = "Abheesht Sharma"
 
 import abc
 
+from decepticonlp.transforms import edits
+from decepticonlp.transforms import glyphs
 from decepticonlp.transforms import perturbations
 from decepticonlp.extractor import basic
+from decepticonlp.utils import buffer
+from decepticonlp.utils import randomness
 
 __all__ = ["AddChar", "ShuffleChar", "DeleteChar", "TypoChar", "VisuallySimilarChar"]
 
@@ -15,6 +19,21 @@ extractor_list = [
 class Transforms(object):
     """
 		Parent class for all transforms.
+
+		Every transform takes an rng (None, a seed or a np.random.Generator,
+		see decepticonlp.utils.randomness) at construction, and can be given
+		another one per call, e.g. randomness.document_rng(base_seed, index)
+		to get per-document outputs independent of how documents are split
+		between workers. Called with return_edits=True, a transform returns
+		(text, edits.EditLog) so edit budgets are checked without a metric.
+		Given a decepticonlp.utils.buffer.TokenBuffer instead of a str, a
+		transform perturbs every sentence of the batch on code points and
+		returns a new TokenBuffer. Given a list of words, it edits the list in
+		place and returns it, splitting the words that received a space.
+
+		With ignore=True, only the words the perturbation can change (see
+		CharacterPerturbations.is_eligible) are extracted, and requested and
+		applied count the words asked for and actually changed.
 		
 		Methods
 		-------
@@ -24,17 +43,60 @@ class Transforms(object):
 			-Display Message if the extractor string is not a valid extractor
 	"""
 
+    # words perturbed per sentence
+    top_k = 1
+    # words asked for and words actually changed, over every call
+    requested = 0
+    applied = 0
+
     def extractor_not_valid_message(self):
         return "Extractor chosen invalid. Please choose from " + str(extractor_list)
 
-    def apply(self, text, extractor, perturb_type, **kwargs):
-        words = text.split(" ")
-        indices = extractor.extract(words)
+    def apply(self, text, extractor, perturb_type, return_edits=False, **kwargs):
+        kwargs["rng"] = randomness.get_rng(kwargs.get("rng"))
+        eligible = None
+        if isinstance(text, buffer.TokenBuffer):
+            assert not return_edits, "edits are not recorded on a TokenBuffer"
+            if kwargs.get("ignore", perturb_type.get_ignore_default_value()):
+                # tokens hold no spaces, the length decides
+                eligible = text.lengths >= perturb_type.min_length
+            indices = extractor.extract_buffer(
+                text, top_k=self.top_k, rng=kwargs["rng"], eligible=eligible
+            )
+            perturbed = perturb_type.apply_buffer(text, indices, **kwargs)
+            self.requested += self.top_k * len(text)
+            self.applied += int((~text.equal_tokens(perturbed, indices)).sum())
+            return perturbed
+
+        words = text if isinstance(text, list) else text.split(" ")
+        if kwargs.get("ignore", perturb_type.get_ignore_default_value()):
+            eligible = perturb_type.is_eligible
+        indices = extractor.extract(
+            words, top_k=self.top_k, rng=kwargs["rng"], eligible=eligible
+        )
 
+        log = edits.EditLog() if return_edits else None
+        self.requested += self.top_k
         for index in indices:
-            words[index] = perturb_type.apply(words[index], **kwargs)
-
-        return " ".join(word for word in words)
+            word = words[index]
+            if return_edits:
+                words[index], word_edits = perturb_type.apply(
+                    word, return_edits=True, **kwargs
+                )
+                log.extend(index, word_edits)
+            else:
+                words[index] = perturb_type.apply(word, **kwargs)
+            self.applied += words[index] != word
+
+        if words is text:
+            # keep the tokens as the next split of the joined text would be
+            for index in sorted(indices, reverse=True):
+                if " " in words[index]:
+                    words[index : index + 1] = words[index].split(" ")
+            return (words, log) if return_edits else words
+
+        text = " ".join(word for word in words)
+        return (text, log) if return_edits else text
 
 
 class Compose(object):
@@ -43,7 +105,12 @@ class Compose(object):
 
 		Args:
 			transforms: list
-				-list of transforms to execute.
+				-list of transforms to execute; a stage can also be any
+				callable taking and returning a str.
+			tokenize: boolean (default: True)
+				-If True, split the text once and pass the list of words
+				between the transforms, joining it once at the end.
+				-If False, pass the text to every transform.
 
 		Example:
 			tfms=transforms.Compose([
@@ -55,14 +122,54 @@ class Compose(object):
 			This i̅s̅ faschinating!
 	"""
 
-    def __init__(self, transforms):
+    def __init__(self, transforms, tokenize=True):
         self.transforms = transforms
-
-    def __call__(self, text):
+        self.tokenize = tokenize
+
+    @property
+    def requested(self):
+        return sum(getattr(t, "requested", 0) for t in self.transforms)
+
+    @property
+    def applied(self):
+        return sum(getattr(t, "applied", 0) for t in self.transforms)
+
+    def __call__(self, text, rng=None, return_edits=False):
+        if rng is not None:
+            rng = randomness.get_rng(rng)
+        if isinstance(text, buffer.TokenBuffer):
+            assert not return_edits, "edits are not recorded on a TokenBuffer"
+            for t in self.transforms:
+                if _is_transform(t):
+                    text = t(text, rng=rng)
+                else:
+                    texts = [t(sentence) for sentence in text.decode()]
+                    text = buffer.TokenBuffer.from_texts(texts)
+            return text
+
+        # a list of words comes from an enclosing Compose and is returned as one
+        words = text
+        if self.tokenize and isinstance(text, str):
+            words = text.split(" ")
+
+        log = edits.EditLog() if return_edits else None
         for t in self.transforms:
-            text = t(text)
-
-        return text
+            if not _is_transform(t):
+                # any callable taking and returning a str can be a stage,
+                # its edits are not recorded
+                if isinstance(words, list):
+                    words = t(" ".join(words)).split(" ")
+                else:
+                    words = t(words)
+            elif return_edits:
+                words, transform_log = t(words, rng=rng, return_edits=True)
+                log.merge(transform_log)
+            else:
+                words = t(words, rng=rng)
+
+        if isinstance(words, list) and not isinstance(text, list):
+            words = " ".join(words)
+        return (words, log) if return_edits else words
 
     def __repr__(self):
         format_string = self.__class__.__name__ + "("
@@ -75,6 +182,11 @@ class Compose(object):
         return format_string
 
 
+def _is_transform(t):
+    """whether t is a stage accepting the rng and return_edits keywords"""
+    return isinstance(t, (Transforms, Compose))
+
+
 class AddChar(Transforms):
     """
 		To the extracted words, add space/character randomly.
@@ -88,6 +200,8 @@ class AddChar(Transforms):
 		ignore: boolean (default: True)
 			-If True, ignore assertion errors (recommended).
 			-If False, do not ignore assertion errors.
+		rng: None, int or np.random.Generator (default: None)
+			-source of randomness, None for the global random state.
 
 		Example:
 		tfms=transforms.AddChar(extractor="RandomWordExtractor", char_perturb=False)
@@ -97,7 +211,7 @@ class AddChar(Transforms):
 	"""
 
     def __init__(
-        self, extractor="RandomWordExtractor", char_perturb=False, ignore=True
+        self, extractor="RandomWordExtractor", char_perturb=False, ignore=True, rng=None
     ):
 
         assert extractor in ["RandomWordExtractor"], self.extractor_not_valid_message()
@@ -108,9 +222,15 @@ class AddChar(Transforms):
         self.char_perturb = char_perturb
         self.space_char_perturb = perturbations.InsertSpaceCharacterPerturbations()
         self.ignore = ignore
-
-    def __call__(self, text):
-        kwargs = {"char_perturb": self.char_perturb, "ignore": self.ignore}
+        self.rng = randomness.get_rng(rng)
+
+    def __call__(self, text, rng=None, return_edits=False):
+        kwargs = {
+            "char_perturb": self.char_perturb,
+            "ignore": self.ignore,
+            "rng": self.rng if rng is None else rng,
+            "return_edits": return_edits,
+        }
         return self.apply(text, self.extractor, self.space_char_perturb, **kwargs)
 
     def __repr__(self):
@@ -130,6 +250,8 @@ class ShuffleChar(Transforms):
 		ignore: boolean (default: True)
 			-If True, ignore assertion errors (recommended).
 			-If False, do not ignore assertion errors.
+		rng: None, int or np.random.Generator (default: None)
+			-source of randomness, None for the global random state.
 
 		Example:
 		tfms=transforms.ShuffleChar(extractor="RandomWordExtractor", mid=False)
@@ -138,7 +260,9 @@ class ShuffleChar(Transforms):
 		This is fascinatign!
 	"""
 
-    def __init__(self, extractor="RandomWordExtractor", mid=False, ignore=True):
+    def __init__(
+        self, extractor="RandomWordExtractor", mid=False, ignore=True, rng=None
+    ):
 
         assert extractor in ["RandomWordExtractor"], self.extractor_not_valid_message()
 
@@ -148,9 +272,15 @@ class ShuffleChar(Transforms):
         self.shuffle_char_perturb = perturbations.ShuffleCharacterPerturbations()
         self.mid = mid
         self.ignore = ignore
-
-    def __call__(self, text):
-        kwargs = {"mid": self.mid, "ignore": self.ignore}
+        self.rng = randomness.get_rng(rng)
+
+    def __call__(self, text, rng=None, return_edits=False):
+        kwargs = {
+            "mid": self.mid,
+            "ignore": self.ignore,
+            "rng": self.rng if rng is None else rng,
+            "return_edits": return_edits,
+        }
         return self.apply(text, self.extractor, self.shuffle_char_perturb, **kwargs)
 
     def __repr__(self):
@@ -167,6 +297,8 @@ class DeleteChar(Transforms):
 		ignore: boolean (default: True)
 			-If True, ignore assertion errors (recommended).
 			-If False, do not ignore assertion errors.
+		rng: None, int or np.random.Generator (default: None)
+			-source of randomness, None for the global random state.
 
 		Example:
 		tfms=transforms.DeleteChar(extractor="RandomWordExtractor")
@@ -175,7 +307,7 @@ class DeleteChar(Transforms):
 		This is fascinting!
 	"""
 
-    def __init__(self, extractor="RandomWordExtractor", ignore=True):
+    def __init__(self, extractor="RandomWordExtractor", ignore=True, rng=None):
 
         assert extractor in ["RandomWordExtractor"], self.extractor_not_valid_message()
 
@@ -184,9 +316,14 @@ class DeleteChar(Transforms):
 
         self.delete_char_perturb = perturbations.DeleteCharacterPerturbations()
         self.ignore = ignore
-
-    def __call__(self, text):
-        kwargs = {"ignore": self.ignore}
+        self.rng = randomness.get_rng(rng)
+
+    def __call__(self, text, rng=None, return_edits=False):
+        kwargs = {
+            "ignore": self.ignore,
+            "rng": self.rng if rng is None else rng,
+            "return_edits": return_edits,
+        }
         return self.apply(text, self.extractor, self.delete_char_perturb, **kwargs)
 
     def __repr__(self):
@@ -202,9 +339,13 @@ class TypoChar(Transforms):
 			-One of ["RandomWordExtractor"]
 		probability: float in range [0,1] (default: 0.1)
 			-probability*100 percent characters in the word will become typos.
+		layout: str (default: "qwerty")
+			-keyboard layout, one of "qwerty", "azerty", "dvorak".
 		ignore: boolean (default: True)
 			-If True, ignore assertion errors (recommended).
 			-If False, do not ignore assertion errors.
+		rng: None, int or np.random.Generator (default: None)
+			-source of randomness, None for the global random state.
 
 		Example:
 		tfms=transforms.TypoChar(extractor="RandomWordExtractor", probability=0.1)
@@ -213,19 +354,32 @@ class TypoChar(Transforms):
 		This us fascinating!
 	"""
 
-    def __init__(self, extractor="RandomWordExtractor", probability=0.1, ignore=True):
+    def __init__(
+        self,
+        extractor="RandomWordExtractor",
+        probability=0.1,
+        ignore=True,
+        layout="qwerty",
+        rng=None,
+    ):
 
         assert extractor in ["RandomWordExtractor"], self.extractor_not_valid_message()
 
         if extractor == "RandomWordExtractor":
             self.extractor = basic.RandomImportantWordExtractor()
 
-        self.typo_char_perturb = perturbations.TypoCharacterPerturbations()
+        self.typo_char_perturb = perturbations.TypoCharacterPerturbations(layout)
         self.probability = probability
         self.ignore = ignore
-
-    def __call__(self, text):
-        kwargs = {"probability": self.probability, "ignore": self.ignore}
+        self.rng = randomness.get_rng(rng)
+
+    def __call__(self, text, rng=None, return_edits=False):
+        kwargs = {
+            "probability": self.probability,
+            "ignore": self.ignore,
+            "rng": self.rng if rng is None else rng,
+            "return_edits": return_edits,
+        }
         return self.apply(text, self.extractor, self.typo_char_perturb, **kwargs)
 
     def __repr__(self):
@@ -240,10 +394,16 @@ class VisuallySimilarChar(Transforms):
 		extractor: str (default: "RandomWordExtractor")
 			-One of ["RandomWordExtractor"]
 		seed: int (default: None)
-			-seed for random
+			-seed for random, same as rng=seed: one stream for the whole transform.
 		ignore: boolean (default: True)
 			-If True, ignore assertion errors (recommended).
 			-If False, do not ignore assertion errors.
+		marks: str (default: glyphs.COMBINING_MARKS)
+			-combining marks used by the unicode perturbation.
+		density: float in range [0,1] (default: 1.0)
+			-fraction of characters getting a combining mark.
+		rng: None, int or np.random.Generator (default: None)
+			-source of randomness, None for the global random state.
 
 		Example:
 		tfms=transforms.VisuallySimilarChar("RandomWordCharacter", None)
@@ -252,7 +412,15 @@ class VisuallySimilarChar(Transforms):
 		T̕h̒i̕s̒ is fascinating!
 	"""
 
-    def __init__(self, extractor="RandomWordExtractor", seed=None, ignore=True):
+    def __init__(
+        self,
+        extractor="RandomWordExtractor",
+        seed=None,
+        ignore=True,
+        marks=glyphs.COMBINING_MARKS,
+        density=1.0,
+        rng=None,
+    ):
 
         assert extractor in ["RandomWordExtractor"], self.extractor_not_valid_message()
 
@@ -260,13 +428,18 @@ class VisuallySimilarChar(Transforms):
             self.extractor = basic.RandomImportantWordExtractor()
 
         self.visually_similar_char_perturb = perturbations.VisuallySimilarCharacterPerturbations(
-            "unicode", "homoglyph"
+            "unicode", "homoglyph", marks=marks, density=density
         )
         self.ignore = ignore
         self.seed = seed
-
-    def __call__(self, text):
-        kwargs = {"seed": self.seed, "ignore": self.ignore}
+        self.rng = randomness.get_rng(seed if rng is None else rng)
+
+    def __call__(self, text, rng=None, return_edits=False):
+        kwargs = {
+            "ignore": self.ignore,
+            "rng": self.rng if rng is None else rng,
+            "return_edits": return_edits,
+        }
         return self.apply(
             text, self.extractor, self.visually_similar_char_perturb, **kwargs
         )
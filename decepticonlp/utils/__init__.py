@@ -0,0 +1,5 @@
+"""Utilities subpackage for decepticonlp."""
+
+__author__ = """Rajaswa Ravindra Patil"""
+__email__ = "rajp4480@gmail.com"
+__version__ = "0.1.0"
@@ -0,0 +1,162 @@
+import numpy as np
+
+SPACE = ord(" ")
+
+
+def _encode(text):
+    return np.frombuffer(text.encode("utf-32-le"), dtype="<u4").astype(np.int32)
+
+
+def _decode(codes):
+    return codes.astype("<u4").tobytes().decode("utf-32-le")
+
+
+class TokenBuffer(object):
+    """
+        A batch of sentences held as one int32 code-point array, without a
+        Python string per word.
+
+        Tokens are the words of the sentences split on spaces, like
+        Transforms.apply splits them. Token t is data[starts[t] : starts[t] +
+        lengths[t]], and the tokens of sentence s are the ones in
+        [sentence_offsets[s], sentence_offsets[s + 1]). Replacing tokens only
+        writes their new code points and offsets; the text is decoded once, by
+        decode.
+
+        Example:
+        buffer = TokenBuffer.from_texts(["This is fascinating!", "Hey there"])
+        tfms = transforms.DeleteChar()
+        print(tfms(buffer).decode())
+        ['This is fascinatig!', 'Hy there']
+
+        Args:
+        data: int32 array of code points
+        starts, lengths: int64 arrays, start and length of each token in data
+        sentence_offsets: int64 array, first token of each sentence and the
+            number of tokens at the end
+    """
+
+    def __init__(self, data, starts, lengths, sentence_offsets):
+        self.data = data
+        self.starts = starts
+        self.lengths = lengths
+        self.sentence_offsets = sentence_offsets
+
+    @classmethod
+    def from_texts(cls, texts):
+        texts = list(texts)
+        if not texts:
+            empty = np.zeros(0, dtype=np.int64)
+            return cls(np.zeros(0, dtype=np.int32), empty, empty, np.zeros(1, np.int64))
+        data = _encode(" ".join(texts))
+        spaces = np.flatnonzero(data == SPACE)
+        starts = np.concatenate([[0], spaces + 1]).astype(np.int64)
+        ends = np.concatenate([spaces, [len(data)]]).astype(np.int64)
+        tokens = [text.count(" ") + 1 for text in texts]
+        sentence_offsets = np.concatenate([[0], np.cumsum(tokens)]).astype(np.int64)
+        return cls(data, starts, ends - starts, sentence_offsets)
+
+    def __len__(self):
+        return len(self.sentence_offsets) - 1
+
+    @property
+    def num_tokens(self):
+        return len(self.starts)
+
+    def sentence_ids(self):
+        """returns the index of the sentence of every token"""
+        return np.repeat(np.arange(len(self)), np.diff(self.sentence_offsets))
+
+    def token(self, index):
+        start = self.starts[index]
+        return _decode(self.data[start : start + self.lengths[index]])
+
+    def tokens(self, sentence):
+        """returns the words of a sentence"""
+        first, last = self.sentence_offsets[sentence : sentence + 2]
+        return [self.token(index) for index in range(first, last)]
+
+    def padded(self, indices):
+        """
+            returns the (len(indices), max length) zero padded int32 array of
+            the code points of the tokens at indices, and their lengths
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        lengths = self.lengths[indices]
+        width = int(lengths.max()) if len(indices) else 0
+        columns = np.arange(width)
+        valid = columns < lengths[:, None]
+        source = np.where(valid, self.starts[indices][:, None] + columns, 0)
+        codes = self.data[source] if len(self.data) else np.zeros(source.shape)
+        return np.where(valid, codes, 0).astype(np.int32), lengths
+
+    def replace(self, indices, codes, lengths, inplace=False):
+        """
+            Replaces the tokens at indices by the rows of a padded code-point
+            array. Tokens that do not grow are overwritten where they are, the
+            others are appended to data.
+
+            returns the updated TokenBuffer (self if inplace, else a copy)
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        lengths = np.asarray(lengths, dtype=np.int64)
+        target = self if inplace else self.copy()
+        if not len(indices):
+            return target
+        valid = np.arange(codes.shape[1]) < lengths[:, None]
+
+        fits = lengths <= target.lengths[indices]
+        # overwrite the tokens that fit in their current place
+        rows = np.flatnonzero(fits)
+        if len(rows):
+            positions = target.starts[indices[rows]][:, None] + np.arange(
+                codes.shape[1]
+            )
+            target.data[positions[valid[rows]]] = codes[rows][valid[rows]]
+
+        # append the longer ones
+        rows = np.flatnonzero(~fits)
+        if len(rows):
+            appended = codes[rows][valid[rows]].astype(np.int32)
+            offsets = np.cumsum(lengths[rows]) - lengths[rows]
+            target.starts[indices[rows]] = len(target.data) + offsets
+            target.data = np.concatenate([target.data, appended])
+
+        target.lengths[indices] = lengths
+        return target
+
+    def equal_tokens(self, other, indices):
+        """returns whether each token at indices is the same in both buffers"""
+        codes, lengths = self.padded(indices)
+        other_codes, other_lengths = other.padded(indices)
+        width = max(codes.shape[1], other_codes.shape[1])
+        codes = np.pad(codes, ((0, 0), (0, width - codes.shape[1])))
+        other_codes = np.pad(other_codes, ((0, 0), (0, width - other_codes.shape[1])))
+        return (lengths == other_lengths) & (codes == other_codes).all(axis=1)
+
+    def copy(self):
+        return TokenBuffer(
+            self.data.copy(),
+            self.starts.copy(),
+            self.lengths.copy(),
+            self.sentence_offsets.copy(),
+        )
+
+    def decode(self):
+        """returns the list of sentences, decoded from the buffer at once"""
+        if not len(self):
+            return []
+        # every token is written followed by one separator
+        out_starts = np.cumsum(self.lengths + 1) - (self.lengths + 1)
+        total = int((self.lengths + 1).sum())
+        source = np.repeat(self.starts - out_starts, self.lengths + 1) + np.arange(
+            total
+        )
+        out = self.data[np.clip(source, 0, max(len(self.data) - 1, 0))]
+        out[out_starts + self.lengths] = SPACE
+        text = _decode(out)
+
+        first = out_starts[self.sentence_offsets[:-1]]
+        last = self.sentence_offsets[1:] - 1
+        ends = out_starts[last] + self.lengths[last]
+        return [text[a:b] for a, b in zip(first.tolist(), ends.tolist())]
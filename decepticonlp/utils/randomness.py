@@ -0,0 +1,153 @@
+import numbers
+import random
+
+import numpy as np
+
+
+class RNG(object):
+    """
+        Source of randomness used by the perturbations, extractors and transforms.
+
+        Subclasses implement the NumPy style draws (integers, random); the Python
+        random module style draws (randint, randrange, choice, shuffle, sample)
+        are built on them.
+
+        Methods
+        -------
+        integers(self, low, high, size=None)
+            - random integers in [low, high), high may be an array.
+        random(self, size=None)
+            - random floats in [0, 1).
+    """
+
+    def integers(self, low, high, size=None):  # pragma: no cover
+        raise NotImplementedError
+
+    def random(self, size=None):  # pragma: no cover
+        raise NotImplementedError
+
+    def randint(self, a, b):
+        """random integer in [a, b], like random.randint"""
+        return int(self.integers(a, b + 1))
+
+    def randrange(self, n):
+        """random integer in [0, n), like random.randrange"""
+        return int(self.integers(0, n))
+
+    def choice(self, seq):
+        """random element of a non-empty sequence, like random.choice"""
+        return seq[self.randrange(len(seq))]
+
+    def shuffle(self, x):
+        """shuffles the list x in place, like random.shuffle"""
+        x[:] = [x[i] for i in np.argsort(self.random(len(x)), kind="stable")]
+
+    def sample(self, population, k):
+        """k unique elements of population in random order, like random.sample"""
+        assert 0 <= k <= len(population), "sample larger than population"
+        order = np.argsort(self.random(len(population)), kind="stable")[:k]
+        return [population[i] for i in order]
+
+
+class GlobalRNG(RNG):
+    """
+        The global random module and np.random state, drawing exactly what the
+        perturbations drew before they accepted an rng, so random.seed and
+        np.random.seed keep reproducing the same outputs.
+    """
+
+    def integers(self, low, high, size=None):
+        return np.random.randint(low, high, size)
+
+    def random(self, size=None):
+        return np.random.random_sample(size)
+
+    def randint(self, a, b):
+        return random.randint(a, b)
+
+    def randrange(self, n):
+        return random.randrange(n)
+
+    def choice(self, seq):
+        return random.choice(seq)
+
+    def shuffle(self, x):
+        random.shuffle(x)
+
+    def sample(self, population, k):
+        return random.sample(population, k)
+
+
+class RandomStateRNG(RNG):
+    """
+        A legacy np.random.RandomState.
+
+        Args:
+        state: np.random.RandomState
+    """
+
+    def __init__(self, state):
+        self.state = state
+
+    def integers(self, low, high, size=None):
+        return self.state.randint(low, high, size)
+
+    def random(self, size=None):
+        return self.state.random_sample(size)
+
+
+class GeneratorRNG(RNG):
+    """
+        A np.random.Generator.
+
+        Args:
+        generator: np.random.Generator
+    """
+
+    def __init__(self, generator):
+        self.generator = generator
+
+    def integers(self, low, high, size=None):
+        return self.generator.integers(low, high, size)
+
+    def random(self, size=None):
+        return self.generator.random(size)
+
+
+GLOBAL_RNG = GlobalRNG()
+
+
+def get_rng(rng=None):
+    """
+        Converts the rng argument accepted throughout decepticonlp into an RNG.
+
+        :rng: None (the global random and np.random state), an int seed or a
+              np.random.SeedSequence (a new np.random.Generator), a
+              np.random.Generator, a np.random.RandomState or an RNG
+
+        returns an RNG
+    """
+    if rng is None:
+        return GLOBAL_RNG
+    if isinstance(rng, RNG):
+        return rng
+    if isinstance(rng, np.random.Generator):
+        return GeneratorRNG(rng)
+    if isinstance(rng, np.random.RandomState):
+        return RandomStateRNG(rng)
+    assert isinstance(
+        rng, (numbers.Integral, np.random.SeedSequence)
+    ), "rng must be None, a seed, a np.random.Generator or a np.random.RandomState"
+    return GeneratorRNG(np.random.default_rng(rng))
+
+
+def document_rng(base_seed, index):
+    """
+        Independent random stream of the index-th document of a job seeded with
+        base_seed. It depends only on (base_seed, index), so a document gets the
+        same output whichever worker processes it and however many there are.
+
+        returns an RNG
+    """
+    seed_sequence = np.random.SeedSequence(base_seed, spawn_key=(index,))
+    return GeneratorRNG(np.random.default_rng(seed_sequence))
@@ -39,6 +39,7 @@ setup(
     keywords="decepticonlp",
     name="decepticonlp",
     packages=find_packages(include=["decepticonlp", "decepticonlp.*"]),
+    package_data={"decepticonlp.transforms": ["*.json"]},
     setup_requires=setup_requirements,
     test_suite="tests",
     tests_require=test_requirements,
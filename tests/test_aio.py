@@ -0,0 +1,81 @@
+import asyncio
+import concurrent.futures
+
+import pytest
+
+from decepticonlp.pipeline import aio
+from decepticonlp.pipeline import stream
+from decepticonlp.transforms import transforms
+
+TEXTS = [
+    "Twinkle twinkle little star.",
+    "Hey, this is so fascinating!",
+    "The earthen pot has cold water.",
+    "How I wonder what you are.",
+] * 10
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def apply_all(augmenter, texts):
+    try:
+        return await asyncio.gather(*[augmenter.apply_async(text) for text in texts])
+    finally:
+        await augmenter.close()
+
+
+@pytest.mark.parametrize("max_batch_size", [1, 8, 64])
+def test_micro_batches(max_batch_size):
+    augmenter = aio.AsyncAugmenter(
+        transforms.DeleteChar(), max_batch_size=max_batch_size, seed=0
+    )
+    results = run(apply_all(augmenter, TEXTS))
+    assert results == list(
+        stream.StreamAugmenter(transforms.DeleteChar(), seed=0)(TEXTS)
+    )
+    stats = augmenter.stats()
+    assert stats["requests"] == len(TEXTS)
+    assert stats["batches"] == -(-len(TEXTS) // max_batch_size)
+    assert stats["queue_depth"] == stats["in_flight"] == 0
+    assert 0 < stats["p50"] <= stats["p90"] <= stats["p99"]
+
+
+def test_max_wait():
+    async def staggered(augmenter):
+        first = asyncio.ensure_future(augmenter.apply_async(TEXTS[0]))
+        await asyncio.sleep(0.2)
+        second = await augmenter.apply_async(TEXTS[1])
+        await augmenter.close()
+        return [await first, second]
+
+    augmenter = aio.AsyncAugmenter(
+        transforms.DeleteChar(), max_batch_size=8, max_wait=0.01
+    )
+    results = run(staggered(augmenter))
+    assert len(results) == 2 and augmenter.batches == 2
+
+
+def test_process_executor():
+    with concurrent.futures.ProcessPoolExecutor(1) as executor:
+        augmenter = aio.AsyncAugmenter(
+            transforms.TypoChar(probability=0.5), executor=executor, seed=3
+        )
+        results = run(apply_all(augmenter, TEXTS))
+    expected = stream.StreamAugmenter(transforms.TypoChar(probability=0.5), seed=3)
+    assert results == list(expected(TEXTS))
+
+
+def test_errors_reach_callers():
+    def broken(text, rng=None):
+        raise ValueError("broken transform")
+
+    augmenter = aio.AsyncAugmenter(broken, max_batch_size=4)
+    with pytest.raises(ValueError):
+        run(apply_all(augmenter, TEXTS[:6]))
+    assert augmenter.stats()["p50"] == 0.0
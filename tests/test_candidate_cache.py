@@ -0,0 +1,57 @@
+import pytest
+
+from decepticonlp.transforms import candidate_cache
+from decepticonlp.transforms import perturbations
+
+
+def test_candidate_list():
+    candidates = candidate_cache.CandidateList(["Nise", "", "Noie"])
+    assert len(candidates) == 3
+    assert list(candidates) == ["Nise", "", "Noie"]
+    assert candidates[-1] == "Noie"
+    with pytest.raises(IndexError):
+        candidates[3]
+    assert candidates.nbytes > 0
+
+
+def test_candidate_cache_hits():
+    cache = candidate_cache.CandidateCache()
+    typo = perturbations.TypoCharacterPerturbations()
+    expected = list(typo.candidates("the"))
+    assert list(cache.candidates(typo, "the")) == expected
+    assert list(cache.candidates(perturbations.TypoCharacterPerturbations(), "the"))
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5 and stats["bytes"] > 0
+
+
+def test_candidate_cache_keys():
+    cache = candidate_cache.CandidateCache()
+    space_perturb = perturbations.InsertSpaceCharacterPerturbations()
+    assert len(cache.get(space_perturb, "the")) == 2
+    assert len(cache.get(space_perturb, "the", char_perturb=True)) == 26 * 4 - 3
+    assert len(cache.get(space_perturb, "the", max_edits=2)) == 3
+    qwerty = perturbations.TypoCharacterPerturbations()
+    azerty = perturbations.TypoCharacterPerturbations("azerty")
+    assert list(cache.get(qwerty, "a")) != list(cache.get(azerty, "a"))
+    assert cache.stats()["misses"] == 5
+
+
+def test_candidate_cache_eviction():
+    typo = perturbations.TypoCharacterPerturbations()
+    size = candidate_cache.CandidateList(typo.candidates("the")).nbytes
+    cache = candidate_cache.CandidateCache(max_bytes=2 * size)
+    for word in ["the", "she", "thy", "the"]:
+        cache.get(typo, word)
+    stats = cache.stats()
+    assert stats["entries"] <= 2 and stats["evictions"] >= 2
+    assert stats["bytes"] <= 2 * size
+
+
+def test_candidate_cache_sample():
+    cache = candidate_cache.CandidateCache()
+    typo = perturbations.TypoCharacterPerturbations()
+    everything = set(typo.candidates("noise"))
+    sample = list(cache.candidates(typo, "noise", sample=5, rng=0))
+    assert len(set(sample)) == 5 and set(sample) <= everything
+    assert sample == list(cache.candidates(typo, "noise", sample=5, rng=0))
@@ -1,6 +1,9 @@
 _author_ = "Somesh Singh"
 
 import random
+import subprocess
+import sys
+import types
 
 import pytest
 
@@ -8,6 +11,8 @@ from decepticonlp.metrics import char_metrics
 
 import math
 
+import numpy as np
+
 
 @pytest.mark.parametrize(
     "text1, text2, expected_result",
@@ -151,3 +156,228 @@ def test_semantic_similarity(text1, text2, expected_result):
     assert math.isclose(
         semantic_similarity.calculate(text1, text2), expected_result, rel_tol=1e-6
     )
+
+
+def _levenshtein_dp(text1, text2):
+    previous = list(range(len(text2) + 1))
+    for x in range(1, len(text1) + 1):
+        current = [x] + [0] * len(text2)
+        for y in range(1, len(text2) + 1):
+            current[y] = min(
+                previous[y] + 1,
+                current[y - 1] + 1,
+                previous[y - 1] + (text1[x - 1] != text2[y - 1]),
+            )
+        previous = current
+    return previous[-1]
+
+
+@pytest.mark.parametrize("length", [0, 1, 5, 63, 64, 65, 200])
+def test_levenshtein_matches_dp(length):
+    random.seed(length)
+    levenshtein_distance = char_metrics.Levenshtein()
+    for _ in range(20):
+        text1 = "".join(random.choices("abcd ", k=length))
+        text2 = "".join(random.choices("abcde", k=random.randint(0, length + 3)))
+        expected = _levenshtein_dp(text1, text2)
+        assert levenshtein_distance.calculate(text1, text2) == expected
+        assert levenshtein_distance.calculate(text2, text1) == expected
+        if text1 or text2:
+            err = levenshtein_distance.calculate(text1, text2, "sum") - expected / (
+                len(text1) + len(text2)
+            )
+            assert -1e-5 < err < 1e-5
+            err = levenshtein_distance.calculate(text1, text2, "lcs") - expected / max(
+                len(text1), len(text2)
+            )
+            assert -1e-5 < err < 1e-5
+
+
+CDIST_TEXTS = ["Word", "Wordy", "Wrod", "H", "Word was", "Word is that", "a cat"]
+
+
+@pytest.mark.parametrize(
+    "metric, kwargs",
+    [
+        (char_metrics.Levenshtein(), {}),
+        (char_metrics.Levenshtein(), {"normalize": "lcs"}),
+        (char_metrics.DamerauLevenshtein(), {"normalize": "sum"}),
+        (char_metrics.Jaccard(), {"ngrams": 2}),
+        (char_metrics.Euclidean(), {}),
+        (char_metrics.Euclidean(), {"norm": True}),
+    ],
+)
+def test_cdist(metric, kwargs):
+    queries, choices = CDIST_TEXTS[:3], CDIST_TEXTS
+    expected = [[metric.calculate(q, c, **kwargs) for c in choices] for q in queries]
+    matrix = metric.cdist(queries, choices, **kwargs)
+    assert matrix.shape == (len(queries), len(choices))
+    assert (abs(matrix - expected) < 1e-9).all()
+
+    pairs = metric.calculate_many(CDIST_TEXTS, CDIST_TEXTS[::-1], **kwargs)
+    expected = [
+        metric.calculate(t1, t2, **kwargs)
+        for t1, t2 in zip(CDIST_TEXTS, CDIST_TEXTS[::-1])
+    ]
+    assert pairs.shape == (len(CDIST_TEXTS),)
+    assert (abs(pairs - expected) < 1e-9).all()
+
+
+def test_cdist_workers():
+    levenshtein_distance = char_metrics.Levenshtein()
+    matrix = levenshtein_distance.cdist(CDIST_TEXTS, CDIST_TEXTS, workers=2)
+    assert (matrix == levenshtein_distance.cdist(CDIST_TEXTS, CDIST_TEXTS)).all()
+    pairs = levenshtein_distance.calculate_many(
+        CDIST_TEXTS, CDIST_TEXTS[::-1], workers=3
+    )
+    assert (
+        pairs == levenshtein_distance.calculate_many(CDIST_TEXTS, CDIST_TEXTS[::-1])
+    ).all()
+
+
+@pytest.mark.parametrize(
+    "metric", [char_metrics.Levenshtein(), char_metrics.DamerauLevenshtein()]
+)
+def test_max_distance(metric):
+    random.seed(0)
+    for _ in range(300):
+        text1 = "".join(random.choices("abc", k=random.randint(0, 12)))
+        text2 = "".join(random.choices("abc", k=random.randint(0, 12)))
+        max_distance = random.randint(0, 6)
+        expected = min(metric.calculate(text1, text2), max_distance + 1)
+        assert metric.calculate(text1, text2, max_distance=max_distance) == expected
+
+
+@pytest.mark.parametrize(
+    "text1, text2, max_distance, expected_result",
+    [
+        ("a cat", "an abct", 3, 3),
+        ("a cat", "an abct", 2, 3),
+        ("a cat", "a tc", 1, 2),
+        ("short", "a much longer text", 2, 3),
+    ],
+)
+def test_damerau_levenshtein_max_distance(text1, text2, max_distance, expected_result):
+    damerau_levenshtein_distance = char_metrics.DamerauLevenshtein()
+    assert (
+        damerau_levenshtein_distance.calculate(text1, text2, max_distance=max_distance)
+        == expected_result
+    )
+
+
+def test_levenshtein_max_distance_long():
+    random.seed(1)
+    text1 = "".join(random.choices("abcdefgh", k=3000))
+    text2 = text1[:1000] + "x" + text1[1001:2000] + text1[2001:]
+    levenshtein_distance = char_metrics.Levenshtein()
+    assert levenshtein_distance.calculate(text1, text2, max_distance=1) == 2
+    assert levenshtein_distance.calculate(text1, text2, max_distance=2) == 2
+    assert levenshtein_distance.calculate(text1, text2 + "yz", max_distance=3) == 4
+
+
+@pytest.mark.parametrize(
+    "text1, text2, expected_result",
+    [("a cat", "an abct", 4), ("a cat", "a tc", 3), ("ab", "ba", 1), ("", "ab", 2)],
+)
+def test_damerau_levenshtein_restricted(text1, text2, expected_result):
+    damerau_levenshtein_distance = char_metrics.DamerauLevenshtein()
+    assert (
+        damerau_levenshtein_distance.calculate(text1, text2, restricted=True)
+        == expected_result
+    )
+
+
+def test_damerau_levenshtein_bounds():
+    random.seed(2)
+    damerau_levenshtein_distance = char_metrics.DamerauLevenshtein()
+    for _ in range(200):
+        text1 = "".join(random.choices("abcd", k=random.randint(0, 15)))
+        text2 = "".join(random.choices("abcd", k=random.randint(0, 15)))
+        unrestricted = damerau_levenshtein_distance.calculate(text1, text2)
+        restricted = damerau_levenshtein_distance.calculate(
+            text1, text2, restricted=True
+        )
+        assert unrestricted <= restricted <= _levenshtein_dp(text1, text2)
+        assert unrestricted == damerau_levenshtein_distance.calculate(
+            text1, text2, max_distance=len(text1) + len(text2)
+        )
+
+
+def _bag_of_letters_encoder(texts):
+    """A tiny stand-in sentence encoder: letter counts."""
+    embeddings = np.zeros((len(texts), 26))
+    for i, text in enumerate(texts):
+        for char in text.lower():
+            if "a" <= char <= "z":
+                embeddings[i, ord(char) - ord("a")] += 1
+    return embeddings
+
+
+@pytest.mark.parametrize(
+    "text1, text2, expected_result",
+    [("ab", "ab", 1), ("ab", "cd", 0), ("aab", "ab", 0.9486832980505138)],
+)
+def test_semantic_similarity_custom_encoder(text1, text2, expected_result):
+    semantic_similarity = char_metrics.SemanticSimilarity(
+        encoder=_bag_of_letters_encoder
+    )
+    assert math.isclose(
+        semantic_similarity.calculate(text1, text2), expected_result, rel_tol=1e-6
+    )
+
+
+def test_semantic_similarity_loads_encoder_once(monkeypatch, tmp_path):
+    loaded = []
+
+    def load(handle):
+        loaded.append(handle)
+        return _bag_of_letters_encoder
+
+    monkeypatch.setitem(sys.modules, "tensorflow_hub", types.SimpleNamespace(load=load))
+    monkeypatch.setattr(char_metrics, "_encoders", {})
+    handle = str(tmp_path)
+    semantic_similarity = char_metrics.SemanticSimilarity(encoder=handle).warmup()
+    semantic_similarity.calculate("ab", "cd")
+    char_metrics.SemanticSimilarity(encoder=handle).calculate("ab", "ab")
+    assert loaded == [handle]
+
+
+def test_semantic_similarity_batched():
+    batches = []
+
+    def encoder(texts):
+        batches.append(list(texts))
+        return _bag_of_letters_encoder(texts)
+
+    semantic_similarity = char_metrics.SemanticSimilarity(encoder=encoder)
+    originals = ["the cat sat", "a dog ran", "the cat sat", "birds fly"]
+    perturbed = ["teh cat sat", "a dgo ran", "the cta sat", "birds fly"]
+    expected = [
+        semantic_similarity.calculate(t1, t2) for t1, t2 in zip(originals, perturbed)
+    ]
+
+    batches.clear()
+    similarities = semantic_similarity.calculate_many(
+        originals, perturbed, batch_size=3
+    )
+    assert np.allclose(similarities, expected, atol=1e-6)
+    # 6 distinct sentences in chunks of 3
+    assert [len(batch) for batch in batches] == [3, 3]
+
+    matrix = semantic_similarity.cdist(originals, perturbed, dtype=np.float16)
+    assert matrix.shape == (4, 4)
+    assert np.allclose(np.diag(matrix), expected, atol=1e-3)
+    assert semantic_similarity.embed(originals, dtype=np.float16).dtype == np.float16
+
+
+def test_lightweight_metrics_do_not_import_tensorflow():
+    code = (
+        "import sys\n"
+        "from decepticonlp.metrics import char_metrics\n"
+        "from decepticonlp.transforms import transforms\n"
+        "char_metrics.Levenshtein().calculate('Word', 'Wordy')\n"
+        "char_metrics.SemanticSimilarity()\n"
+        "assert 'tensorflow' not in sys.modules\n"
+        "assert 'tensorflow_hub' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import pytest
+
+from decepticonlp.pipeline import corpus
+from decepticonlp.pipeline import parallel
+from decepticonlp.pipeline import stream
+from decepticonlp.transforms import transforms
+
+TEXTS = [
+    "Twinkle twinkle little star.",
+    "",
+    "Héllo wörld \U0001d4ea",
+    "The earthen pot has cold water.",
+]
+
+
+@pytest.mark.parametrize("content", ["\n".join(TEXTS), "\n".join(TEXTS) + "\n"])
+def test_build_index(tmp_path, content):
+    path = str(tmp_path / "corpus.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    offsets = corpus.build_index(path, block_size=5)
+    assert offsets.dtype == np.int64 and len(offsets) == len(TEXTS) + 1
+    assert (np.load(corpus.index_path(path)) == offsets).all()
+    with corpus.MappedCorpus(path) as lines:
+        assert len(lines) == len(TEXTS)
+        assert list(lines) == TEXTS
+        assert lines[2] == TEXTS[2] and lines[-1] == TEXTS[-1]
+        assert lines[1:3] == TEXTS[1:3]
+        assert isinstance(lines.line_bytes(0), memoryview)
+        with pytest.raises(IndexError):
+            lines.line_bytes(len(TEXTS))
+
+
+def test_empty_file(tmp_path):
+    path = str(tmp_path / "empty.txt")
+    open(path, "w").close()
+    with corpus.MappedCorpus(path) as lines:
+        assert len(lines) == 0 and list(lines) == []
+
+
+def test_writer_index(tmp_path):
+    path = str(tmp_path / "out.txt")
+    with corpus.CorpusWriter(path) as writer:
+        assert writer.write_many(TEXTS) == len(TEXTS)
+    saved = np.load(corpus.index_path(path))
+    assert (saved == corpus.build_index(path)).all()
+    with pytest.raises(AssertionError):
+        corpus.CorpusWriter(str(tmp_path / "bad.txt")).write("two\nlines")
+
+
+def test_stale_index_is_rebuilt(tmp_path):
+    path = str(tmp_path / "corpus.txt")
+    with corpus.CorpusWriter(path) as writer:
+        writer.write_many(TEXTS)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("one more line\n")
+    with corpus.MappedCorpus(path) as lines:
+        assert list(lines) == TEXTS + ["one more line"]
+
+
+def test_shards(tmp_path):
+    path = str(tmp_path / "corpus.txt")
+    with corpus.CorpusWriter(path) as writer:
+        writer.write_many(str(i) for i in range(103))
+    with corpus.MappedCorpus(path) as lines:
+        shards = [lines.shard(i, 4) for i in range(4)]
+        assert shards[0][0] == 0 and shards[-1][1] == 103
+        assert all(a[1] == b[0] for a, b in zip(shards, shards[1:]))
+        start, stop = shards[2]
+        first, end = lines.byte_range(start, stop)
+        with open(path, "rb") as f:
+            f.seek(first)
+            data = f.read(end - first).decode("utf-8")
+        assert data.splitlines() == list(lines.lines(start, stop))
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_pipeline_source_and_sink(tmp_path, workers):
+    source = str(tmp_path / "corpus.txt")
+    with corpus.CorpusWriter(source) as writer:
+        writer.write_many(TEXTS * 10)
+    sink = str(tmp_path / "augmented.txt")
+    pipeline = transforms.Compose([transforms.DeleteChar(), transforms.AddChar()])
+    with corpus.MappedCorpus(source) as lines, corpus.CorpusWriter(sink) as writer:
+        augmenter = parallel.ParallelAugmenter(pipeline, workers=workers, seed=2)
+        writer.write_many(augmenter(lines))
+    expected = list(stream.StreamAugmenter(pipeline, seed=2)(TEXTS * 10))
+    with corpus.MappedCorpus(sink) as augmented:
+        assert augmented[17] == expected[17]
+        assert list(augmented) == expected
+    assert os.path.exists(corpus.index_path(sink))
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from decepticonlp.metrics import char_metrics
+from decepticonlp.metrics import embedding_cache
+
+
+def _bag_of_letters_encoder(texts):
+    embeddings = np.zeros((len(texts), 26), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for char in text.lower():
+            if "a" <= char <= "z":
+                embeddings[i, ord(char) - ord("a")] += 1
+    return embeddings
+
+
+def test_text_key_is_stable():
+    assert embedding_cache.text_key("hello") == embedding_cache.text_key("hello")
+    assert embedding_cache.text_key("hello") != embedding_cache.text_key("hellp")
+    assert embedding_cache.text_key("hello") == 9022087748821825191
+
+
+def test_lru_eviction():
+    row = np.ones(4, dtype=np.float32)  # 16 bytes
+    cache = embedding_cache.EmbeddingCache(max_bytes=32)
+    cache.put_many(["a", "b"], [row, 2 * row])
+    assert cache.get("a") is not None  # "a" becomes most recently used
+    cache.put("c", 3 * row)
+    assert cache.get("b") is None
+    assert (cache.get("a") == row).all()
+    assert (cache.get("c") == 3 * row).all()
+    assert cache.stats() == {
+        "hits": 3,
+        "misses": 1,
+        "disk_hits": 0,
+        "evictions": 1,
+        "entries": 2,
+        "bytes": 32,
+    }
+
+
+def test_disk_store(tmp_path):
+    path = str(tmp_path / "cache")
+    embeddings = np.arange(12, dtype=np.float32).reshape(3, 4)
+    writer = embedding_cache.EmbeddingCache(max_bytes=0, path=path)
+    writer.put_many(["a", "b", "a"], embeddings)
+
+    reader = embedding_cache.EmbeddingCache(path=path)
+    found = reader.get_many(["b", "c", "a"])
+    assert (found[0] == embeddings[1]).all()
+    assert found[1] is None
+    assert (found[2] == embeddings[0]).all()
+    assert reader.disk_hits == 2 and reader.misses == 1
+
+    writer.put("c", embeddings[2])
+    assert reader.get("c") is None
+    reader.store.refresh()
+    assert (reader.get("c") == embeddings[2]).all()
+    assert len(reader.store) == 3
+
+
+def test_semantic_similarity_with_cache():
+    encoded = []
+
+    def encoder(texts):
+        encoded.extend(texts)
+        return _bag_of_letters_encoder(texts)
+
+    cache = embedding_cache.EmbeddingCache()
+    semantic_similarity = char_metrics.SemanticSimilarity(encoder=encoder, cache=cache)
+    first = semantic_similarity.calculate_many(["the cat"] * 2, ["teh cat", "the cta"])
+    second = semantic_similarity.calculate_many(["the cat"], ["the act"])
+    assert encoded == ["the cat", "teh cat", "the cta", "the act"]
+    assert np.allclose(first, [1, 1]) and np.allclose(second, [1])
+    assert cache.hits == 1 and cache.misses == 4
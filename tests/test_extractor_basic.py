@@ -1,4 +1,5 @@
 import random
+import numpy as np
 import pytest
 from decepticonlp.extractor import basic
 
@@ -31,3 +32,47 @@ def test_words_less_than_k_extract():
     random_extractor = basic.RandomImportantWordExtractor()
     with pytest.raises(AssertionError):
         random_extractor.extract(["Hey", "There"], top_k=3)
+
+
+def test_random_extract_with_rng():
+    random_extractor = basic.RandomImportantWordExtractor()
+    words = ["This", "is", "a", "longer", "test"]
+    indices = random_extractor.extract(words, top_k=3, rng=np.random.default_rng(0))
+    assert indices == random_extractor.extract(words, top_k=3, rng=0)
+    assert len(set(indices)) == 3
+
+
+def test_random_extract_eligible():
+    random_extractor = basic.RandomImportantWordExtractor()
+    words = ["This", "is", "a", "longer", "test"]
+    eligible = [len(word) >= 4 for word in words]
+    for seed in range(20):
+        indices = random_extractor.extract(words, top_k=2, rng=seed, eligible=eligible)
+        assert len(set(indices)) == 2 and all(eligible[i] for i in indices)
+        # picks that were already eligible are kept
+        unmasked = random_extractor.extract(words, top_k=2, rng=seed)
+        assert set(i for i in unmasked if eligible[i]) <= set(indices)
+    assert random_extractor.extract(words, eligible=[False] * 5) == []
+    assert sorted(
+        random_extractor.extract(words, top_k=3, rng=0, eligible=eligible)
+    ) == [0, 3, 4]
+
+
+def test_random_extract_eligible_predicate():
+    random_extractor = basic.RandomImportantWordExtractor()
+    words = ["This", "is", "a", "longer", "test"]
+    checked = []
+
+    def long_enough(word):
+        checked.append(word)
+        return len(word) >= 4
+
+    for seed in range(20):
+        del checked[:]
+        indices = random_extractor.extract(words, rng=seed, eligible=long_enough)
+        mask = [len(word) >= 4 for word in words]
+        assert indices == random_extractor.extract(words, rng=seed, eligible=mask)
+        assert len(words[indices[0]]) >= 4
+        # a first eligible pick is the only word checked
+        if checked[0] == words[indices[0]]:
+            assert checked == [words[indices[0]]]
@@ -0,0 +1,58 @@
+import random
+
+import numpy as np
+import pytest
+
+from decepticonlp.metrics import char_metrics
+from decepticonlp.metrics import minhash
+
+
+@pytest.mark.parametrize("ngrams", [1, 2, 3])
+def test_minhash_estimates_jaccard(ngrams):
+    random.seed(ngrams)
+    jaccard = char_metrics.Jaccard()
+    hasher = minhash.MinHash(num_perm=512, ngrams=ngrams)
+    texts = ["".join(random.choices("abcdefghij ", k=40)) for _ in range(10)]
+    texts += [text[:30] + "xyz" for text in texts]
+    signatures = hasher.signatures(texts, batch_size=7)
+    assert signatures.shape == (20, 512) and signatures.dtype == np.uint32
+    for i in range(10):
+        for j in (i + 1, i + 10):
+            exact = jaccard.calculate(texts[i], texts[j], ngrams=ngrams)
+            estimate = minhash.MinHash.distance(signatures[i], signatures[j])
+            assert abs(exact - estimate) < 0.15
+
+
+def test_minhash_identical_and_empty():
+    hasher = minhash.MinHash(num_perm=64)
+    signatures = hasher.signatures(["Word", "Word", ""])
+    assert minhash.MinHash.distance(signatures[0], signatures[1]) == 0
+    assert (signatures[2] == 2 ** 32 - 1).all()
+    assert (hasher.signature("Word") == signatures[0]).all()
+    assert (
+        minhash.MinHash(num_perm=64, seed=2).signature("Word") != signatures[0]
+    ).any()
+
+
+def test_ngram_hashes_short_text():
+    assert len(minhash.ngram_hashes("Word", ngrams=10)) == 4
+    with pytest.raises(AssertionError):
+        minhash.ngram_hashes("Word", ngrams=10, ignore=False)
+
+
+def test_lsh_index():
+    random.seed(0)
+    corpus = [
+        " ".join("".join(random.choices("abcdefghijklmnop", k=6)) for _ in range(6))
+        for _ in range(200)
+    ]
+    index = minhash.LSHIndex(threshold=0.4, minhash=minhash.MinHash(ngrams=3))
+    assert index.bands * index.rows <= 128
+    index.add_many(range(len(corpus)), corpus)
+    assert len(index) == 200
+
+    query = corpus[42][:-1] + "z"
+    results = dict(index.query(query))
+    assert 42 in results and results[42] < 0.4
+    assert all(distance < 0.4 for distance in results.values())
+    assert index.query("completely unrelated qqqq") == []
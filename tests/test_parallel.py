@@ -0,0 +1,54 @@
+import pytest
+
+from decepticonlp.pipeline import parallel
+from decepticonlp.pipeline import stream
+from decepticonlp.transforms import transforms
+
+TEXTS = [
+    "Twinkle twinkle little star.",
+    "Hey, this is so fascinating!",
+    "The earthen pot has cold water.",
+    "How I wonder what you are.",
+] * 50
+
+
+def make_pipeline():
+    return transforms.Compose(
+        [
+            transforms.AddChar(),
+            transforms.TypoChar(probability=0.3),
+            transforms.VisuallySimilarChar(),
+            transforms.ShuffleChar(),
+        ]
+    )
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(0, None), (1, 7), (2, None), (3, 1)])
+def test_deterministic_for_seed(workers, chunk_size):
+    expected = list(stream.StreamAugmenter(make_pipeline(), seed=5)(TEXTS))
+    augmenter = parallel.ParallelAugmenter(
+        make_pipeline(), workers=workers, seed=5, chunk_size=chunk_size
+    )
+    assert list(augmenter(iter(TEXTS))) == expected
+    assert sum(augmenter.chunk_sizes) == len(TEXTS)
+    if chunk_size is not None:
+        assert set(augmenter.chunk_sizes[:-1]) == {chunk_size}
+
+
+def test_records_keep_order():
+    records = [{"id": i, "text": text} for i, text in enumerate(TEXTS)]
+    augmenter = parallel.ParallelAugmenter(transforms.DeleteChar(), workers=2)
+    augmented = list(augmenter(records))
+    assert [record["id"] for record in augmented] == list(range(len(TEXTS)))
+    for record, original in zip(augmented, records):
+        assert len(record["text"]) == len(original["text"]) - 1
+
+
+def test_adaptive_chunk_size():
+    augmenter = parallel.ParallelAugmenter(
+        transforms.DeleteChar(), workers=0, target_seconds=1.0
+    )
+    list(augmenter(TEXTS * 20))
+    assert augmenter.chunk_sizes[0] == augmenter.min_chunk_size
+    assert max(augmenter.chunk_sizes) > augmenter.min_chunk_size
+    assert max(augmenter.chunk_sizes) <= augmenter.max_chunk_size
@@ -1,9 +1,13 @@
 _author_ = "Rohit Patil"
 
+import math
 import random
 
+import numpy as np
 import pytest
 
+from decepticonlp.metrics import char_metrics
+from decepticonlp.transforms import glyphs
 from decepticonlp.transforms import perturbations
 
 
@@ -120,3 +124,274 @@ def test_perturb_unicode(word, expected_result):
 def test_perturb_homoglyph(word, expected_result):
     viz = perturbations.VisuallySimilarCharacterPerturbations("unicode", "homoglyph")
     assert viz.apply(word, 1) == expected_result
+
+
+def test_perturb_typo_outside_repository_root(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    random.seed(0)
+    type_perturbations = perturbations.TypoCharacterPerturbations()
+    assert type_perturbations.apply("Noise") == "Noixe"
+
+
+@pytest.mark.parametrize(
+    "layout, word, expected_result",
+    [
+        ("qwerty", "ab12", "avq2"),
+        ("azerty", "ab12", "aga2"),
+        ("dvorak", "ab12", "ad'2"),
+        ("qwerty", "HEY", "UET"),
+    ],
+)
+def test_perturb_typo_layouts(layout, word, expected_result):
+    random.seed(1)
+    type_perturbations = perturbations.TypoCharacterPerturbations(layout)
+    assert type_perturbations.apply(word, probability=0.5) == expected_result
+
+
+def test_perturb_typo_invalid_layout():
+    with pytest.raises(AssertionError):
+        perturbations.TypoCharacterPerturbations("colemak")
+
+
+BATCH_EXAMPLE = ["Adversarial", "is", "fascinating", "a b", "", "héllo", "xyzw"]
+
+
+def _is_subsequence(short, long):
+    chars = iter(long)
+    return all(char in chars for char in short)
+
+
+def test_perturb_batch_encode_decode():
+    codes, lengths = perturbations.encode_batch(BATCH_EXAMPLE)
+    assert codes.shape == (len(BATCH_EXAMPLE), 11)
+    assert lengths.tolist() == [len(word) for word in BATCH_EXAMPLE]
+    assert perturbations.decode_batch(codes, lengths) == BATCH_EXAMPLE
+
+
+@pytest.mark.parametrize("char_perturb", [False, True])
+def test_perturb_insert_batch(char_perturb):
+    np.random.seed(0)
+    space_perturb = perturbations.InsertSpaceCharacterPerturbations()
+    result = space_perturb.apply_batch(BATCH_EXAMPLE, char_perturb=char_perturb)
+    for word, perturbed in zip(BATCH_EXAMPLE, result):
+        if " " in word or len(word) < 2:
+            assert perturbed == word
+        else:
+            assert len(perturbed) == len(word) + 1
+            assert _is_subsequence(word, perturbed)
+            if not char_perturb:
+                assert perturbed.replace(" ", "", 1) == word
+                assert perturbed[0] != " " and perturbed[-1] != " "
+
+
+@pytest.mark.parametrize("mid", [True, False])
+def test_perturb_shuffle_batch(mid):
+    np.random.seed(0)
+    shuffle_perturbations = perturbations.ShuffleCharacterPerturbations()
+    result = shuffle_perturbations.apply_batch(BATCH_EXAMPLE * 20, mid=mid)
+    for word, perturbed in zip(BATCH_EXAMPLE * 20, result):
+        assert sorted(perturbed) == sorted(word)
+        if len(word) >= 4:
+            assert perturbed[0] == word[0] and perturbed[-1] == word[-1]
+        if not mid:
+            assert sum(a != b for a, b in zip(word, perturbed)) in (0, 2)
+
+
+def test_perturb_delete_batch():
+    np.random.seed(0)
+    delete_perturbations = perturbations.DeleteCharacterPerturbations()
+    result = delete_perturbations.apply_batch(BATCH_EXAMPLE * 20)
+    for word, perturbed in zip(BATCH_EXAMPLE * 20, result):
+        if " " in word or len(word) < 3:
+            assert perturbed == word
+        else:
+            assert len(perturbed) == len(word) - 1
+            assert _is_subsequence(perturbed, word)
+            assert perturbed[0] == word[0] and perturbed[-1] == word[-1]
+
+
+@pytest.mark.parametrize("probability", [0.1, 0.5, 1])
+def test_perturb_typo_batch(probability):
+    np.random.seed(0)
+    type_perturbations = perturbations.TypoCharacterPerturbations()
+    layout = type_perturbations.layout
+    result = type_perturbations.apply_batch(BATCH_EXAMPLE, probability=probability)
+    for word, perturbed in zip(BATCH_EXAMPLE, result):
+        if " " in word:
+            assert perturbed == word
+            continue
+        assert len(perturbed) == len(word)
+        changed = [(a, b) for a, b in zip(word, perturbed) if a != b]
+        assert len(changed) <= math.ceil(len(word) * probability)
+        for a, b in changed:
+            assert b in [layout.neighbour(a, i) for i in range(layout.count(a))]
+
+
+def test_perturb_batch_not_ignored():
+    delete_perturbations = perturbations.DeleteCharacterPerturbations()
+    with pytest.raises(AssertionError):
+        delete_perturbations.apply_batch(["Bob", "To"], ignore=False)
+    with pytest.raises(AssertionError):
+        delete_perturbations.apply_batch(["Bob", WHITE_SPACE_EXAMPLE], ignore=False)
+
+
+def test_perturb_visually_similar_batch():
+    viz = perturbations.VisuallySimilarCharacterPerturbations("unicode", "homoglyph")
+    words = ["adversarial", "Hi there"]
+    assert viz.apply_batch(words, seed=1) == [viz.apply(word, 1) for word in words]
+
+
+def test_perturb_homoglyph_batch():
+    np.random.seed(0)
+    viz = perturbations.VisuallySimilarCharacterPerturbations("homoglyph")
+    result = viz.apply_batch(BATCH_EXAMPLE * 10)
+    for word, perturbed in zip(BATCH_EXAMPLE * 10, result):
+        if " " in word:
+            assert perturbed == word
+            continue
+        assert len(perturbed) == len(word)
+        for char, glyph in zip(word, perturbed):
+            assert glyph in viz.homoglyph_dic.get(char, char)
+
+
+def test_perturb_homoglyph_outside_repository_root(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    viz = perturbations.VisuallySimilarCharacterPerturbations("unicode", "homoglyph")
+    assert viz.apply("adversarial", 1) == "𝓪𝓭ꮩ𝑒𝓇ｓ𝖺rꙇa1"
+
+
+def test_perturb_unicode_marks_density():
+    np.random.seed(0)
+    viz = perturbations.VisuallySimilarCharacterPerturbations(
+        "unicode", marks="\u0308", density=0.5
+    )
+    perturbed = viz.apply("adversarial" * 10)
+    assert perturbed.replace("\u0308", "") == "adversarial" * 10
+    assert 0 < perturbed.count("\u0308") < 110
+    assert "\u0308\u0308" not in perturbed
+
+
+@pytest.mark.parametrize("density", [1.0, 0.3, 0.0])
+def test_perturb_unicode_batch(density):
+    np.random.seed(0)
+    viz = perturbations.VisuallySimilarCharacterPerturbations(
+        "unicode", density=density
+    )
+    result = viz.apply_batch(BATCH_EXAMPLE * 10)
+    for word, perturbed in zip(BATCH_EXAMPLE * 10, result):
+        if " " in word:
+            assert perturbed == word
+            continue
+        stripped = "".join(
+            char for char in perturbed if char not in glyphs.COMBINING_MARKS
+        )
+        assert stripped == word
+        if density == 1.0:
+            assert len(perturbed) == 2 * len(word)
+        if density == 0.0:
+            assert perturbed == word
+
+
+def test_perturb_unicode_invalid_density():
+    with pytest.raises(AssertionError):
+        perturbations.VisuallySimilarCharacterPerturbations("unicode", density=2)
+
+
+CANDIDATE_PERTURBATIONS = [
+    (perturbations.InsertSpaceCharacterPerturbations(), {}),
+    (perturbations.InsertSpaceCharacterPerturbations(), {"char_perturb": True}),
+    (perturbations.ShuffleCharacterPerturbations(), {}),
+    (perturbations.DeleteCharacterPerturbations(), {}),
+    (perturbations.TypoCharacterPerturbations(), {}),
+    (perturbations.VisuallySimilarCharacterPerturbations("unicode", "homoglyph"), {}),
+]
+
+
+@pytest.mark.parametrize("perturbation, kwargs", CANDIDATE_PERTURBATIONS)
+@pytest.mark.parametrize("word", ["Noise", "aabba", "book"])
+@pytest.mark.parametrize("max_edits", [1, 2])
+def test_perturb_candidates_unique(perturbation, kwargs, word, max_edits):
+    candidates = list(perturbation.candidates(word, max_edits, **kwargs))
+    assert len(candidates) == len(set(candidates))
+    assert len(candidates) == perturbation.count_candidates(word, max_edits, **kwargs)
+    assert word not in candidates
+
+
+def test_perturb_candidates_single_edits():
+    delete_perturbations = perturbations.DeleteCharacterPerturbations()
+    assert list(delete_perturbations.candidates("Noise")) == ["Nise", "Nose", "Noie"]
+    assert list(delete_perturbations.candidates("Hello")) == ["Hllo", "Helo"]
+    shuffle_perturbations = perturbations.ShuffleCharacterPerturbations()
+    assert list(shuffle_perturbations.candidates("Noise")) == ["Niose", "Nosie"]
+    space_perturb = perturbations.InsertSpaceCharacterPerturbations()
+    assert list(space_perturb.candidates("Hey")) == ["H ey", "He y"]
+    assert space_perturb.count_candidates("Hey", char_perturb=True) == 4 * 26 - 2
+    type_perturbations = perturbations.TypoCharacterPerturbations()
+    layout = type_perturbations.layout
+    assert list(type_perturbations.candidates("a")) == [
+        layout.neighbour("a", i) for i in range(layout.count("a"))
+    ]
+
+
+def test_perturb_candidates_ignore():
+    delete_perturbations = perturbations.DeleteCharacterPerturbations()
+    assert list(delete_perturbations.candidates("To")) == []
+    assert list(delete_perturbations.candidates(WHITE_SPACE_EXAMPLE)) == []
+    with pytest.raises(AssertionError):
+        list(delete_perturbations.candidates("To", ignore=False))
+
+
+def test_perturb_candidates_closed_form_count():
+    type_perturbations = perturbations.TypoCharacterPerturbations()
+    word = "adversarial" * 10
+    count = type_perturbations.count_candidates(word, max_edits=4)
+    assert count > 10 ** 9
+    candidates = type_perturbations.candidates(word, max_edits=4, limit=5)
+    assert len(list(candidates)) == 5
+
+
+def test_perturb_candidates_sample():
+    type_perturbations = perturbations.TypoCharacterPerturbations()
+    everything = set(type_perturbations.candidates("Noise", max_edits=2))
+    sample = list(type_perturbations.candidates("Noise", 2, sample=20, rng=0))
+    assert len(sample) == len(set(sample)) == 20
+    assert set(sample) <= everything
+    assert sample == list(type_perturbations.candidates("Noise", 2, sample=20, rng=0))
+    dense = list(type_perturbations.candidates("Noise", 2, sample=10 ** 6, rng=0))
+    assert set(dense) == everything and len(dense) == len(everything)
+
+
+@pytest.mark.parametrize(
+    "perturbation, kwargs",
+    [
+        (perturbations.InsertSpaceCharacterPerturbations(), {}),
+        (perturbations.InsertSpaceCharacterPerturbations(), {"char_perturb": True}),
+        (perturbations.ShuffleCharacterPerturbations(), {"mid": False}),
+        (perturbations.DeleteCharacterPerturbations(), {}),
+        (perturbations.TypoCharacterPerturbations(), {"probability": 0.5}),
+        (perturbations.VisuallySimilarCharacterPerturbations("homoglyph"), {}),
+        (perturbations.VisuallySimilarCharacterPerturbations("unicode"), {}),
+    ],
+)
+def test_perturb_return_edits_cost(perturbation, kwargs):
+    damerau_levenshtein = char_metrics.DamerauLevenshtein()
+    for seed, word in enumerate(["Adversarial", "fascinating", "book", "Hi"]):
+        perturbed, edits = perturbation.apply(
+            word, return_edits=True, rng=seed, **kwargs
+        )
+        assert perturbed == perturbation.apply(word, rng=seed, **kwargs)
+        cost = sum(edit.cost for edit in edits)
+        assert cost == damerau_levenshtein.calculate(word, perturbed)
+        for edit in edits:
+            assert 0 <= edit.position <= len(word)
+
+
+def test_perturb_return_edits_records():
+    delete_perturbations = perturbations.DeleteCharacterPerturbations()
+    assert delete_perturbations.apply("To", return_edits=True) == ("To", [])
+    word, edits = delete_perturbations.apply("Bob", return_edits=True, rng=0)
+    assert word == "Bb" and edits == [("delete", 1, 1)]
+    shuffle_perturbations = perturbations.ShuffleCharacterPerturbations()
+    word, edits = shuffle_perturbations.apply("Adversarial", return_edits=True, rng=0)
+    assert [edit.operation for edit in edits] == ["shuffle"]
+    assert edits[0].cost == sum(a != b for a, b in zip(word, "Adversarial"))
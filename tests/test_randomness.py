@@ -0,0 +1,110 @@
+import random
+
+import numpy as np
+import pytest
+
+from decepticonlp.transforms import perturbations
+from decepticonlp.transforms import transforms
+from decepticonlp.utils import randomness
+
+TEXTS = [
+    "Twinkle twinkle little star.",
+    "Hey, this is so fascinating!",
+    "The earthen pot has cold water.",
+    "How I wonder what you are.",
+]
+
+
+def test_get_rng():
+    assert randomness.get_rng() is randomness.GLOBAL_RNG
+    generator = np.random.default_rng(0)
+    assert randomness.get_rng(generator).generator is generator
+    state = np.random.RandomState(0)
+    assert randomness.get_rng(state).state is state
+    rng = randomness.get_rng(3)
+    assert randomness.get_rng(rng) is rng
+    with pytest.raises(AssertionError):
+        randomness.get_rng("seed")
+
+
+def test_rng_python_style_draws():
+    rng = randomness.get_rng(0)
+    assert all(1 <= rng.randint(1, 3) <= 3 for _ in range(50))
+    assert {rng.randint(1, 3) for _ in range(100)} == {1, 2, 3}
+    assert rng.choice("abc") in "abc"
+    sample = rng.sample(range(10), 4)
+    assert len(set(sample)) == 4 and all(0 <= i < 10 for i in sample)
+    items = list(range(10))
+    rng.shuffle(items)
+    assert sorted(items) == list(range(10))
+
+
+def test_global_rng_matches_random_module():
+    random.seed(7)
+    expected = random.sample(range(10), 3), random.randint(0, 9)
+    random.seed(7)
+    rng = randomness.get_rng()
+    assert (rng.sample(range(10), 3), rng.randint(0, 9)) == expected
+
+
+def test_document_rng():
+    first = randomness.document_rng(42, 3).random(4)
+    assert np.array_equal(first, randomness.document_rng(42, 3).random(4))
+    assert not np.array_equal(first, randomness.document_rng(42, 4).random(4))
+    assert not np.array_equal(first, randomness.document_rng(43, 3).random(4))
+
+
+def test_perturbation_generator_leaves_global_state():
+    random.seed(0)
+    np.random.seed(0)
+    expected = random.random(), np.random.random_sample()
+    random.seed(0)
+    np.random.seed(0)
+    words = ["Adversarial", "fascinating"]
+    for perturbation in [
+        perturbations.InsertSpaceCharacterPerturbations(),
+        perturbations.ShuffleCharacterPerturbations(),
+        perturbations.DeleteCharacterPerturbations(),
+        perturbations.TypoCharacterPerturbations(),
+        perturbations.VisuallySimilarCharacterPerturbations("unicode", "homoglyph"),
+    ]:
+        for word in words:
+            assert perturbation.apply(word, rng=5) == perturbation.apply(word, rng=5)
+        assert perturbation.apply_batch(words, rng=5) == perturbation.apply_batch(
+            words, rng=5
+        )
+    viz = perturbations.VisuallySimilarCharacterPerturbations("unicode", "homoglyph")
+    assert viz.apply("adversarial", 1) == viz.apply("adversarial", 1)
+    assert (random.random(), np.random.random_sample()) == expected
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3])
+def test_document_rng_independent_of_worker_split(workers):
+    tfms = transforms.Compose(
+        [
+            transforms.AddChar(),
+            transforms.ShuffleChar("RandomWordExtractor", True),
+            transforms.VisuallySimilarChar(),
+            transforms.TypoChar("RandomWordExtractor", probability=0.5),
+        ]
+    )
+    expected = [
+        tfms(text, rng=randomness.document_rng(7, index))
+        for index, text in enumerate(TEXTS)
+    ]
+    # each worker takes every workers-th document, in reverse order
+    outputs = {}
+    for worker in range(workers):
+        for index in reversed(range(worker, len(TEXTS), workers)):
+            outputs[index] = tfms(TEXTS[index], rng=randomness.document_rng(7, index))
+    assert [outputs[index] for index in range(len(TEXTS))] == expected
+
+
+def test_transform_seed_is_one_stream():
+    text = "aaaaaaaa aaaaaaaa"
+    tfms = transforms.VisuallySimilarChar(seed=0)
+    outputs = {tfms(text) for _ in range(10)}
+    assert len(outputs) > 1
+    assert [transforms.DeleteChar(rng=1)(TEXTS[0]) for _ in range(2)] == [
+        transforms.DeleteChar(rng=1)(TEXTS[0])
+    ] * 2
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from decepticonlp.pipeline import stream
+from decepticonlp.transforms import transforms
+
+TEXTS = [
+    "Twinkle twinkle little star.",
+    "Hey, this is so fascinating!",
+    "The earthen pot has cold water.",
+    "How I wonder what you are.",
+] * 5
+
+
+@pytest.mark.parametrize("batch_size, max_pending", [(1, 0), (3, 0), (7, 2), (50, 1)])
+def test_seeded_output_ignores_batching(batch_size, max_pending):
+    expected = list(stream.StreamAugmenter(transforms.DeleteChar(), seed=0)(TEXTS))
+    augmenter = stream.StreamAugmenter(
+        transforms.DeleteChar(), batch_size=batch_size, seed=0, max_pending=max_pending,
+    )
+    assert list(augmenter(iter(TEXTS))) == expected
+    assert augmenter.processed == len(TEXTS)
+    assert sum(a != b for a, b in zip(expected, TEXTS)) == len(TEXTS)
+
+
+def test_use_buffer():
+    augmenter = stream.StreamAugmenter(
+        transforms.DeleteChar(), batch_size=6, seed=0, use_buffer=True
+    )
+    augmented = list(augmenter(TEXTS))
+    assert augmented == list(augmenter(TEXTS))
+    assert all(len(a) == len(b) - 1 for a, b in zip(augmented, TEXTS))
+
+
+@pytest.mark.parametrize("name, fmt", [("corpus.txt", None), ("corpus.jsonl", None)])
+def test_read_write(tmp_path, name, fmt):
+    path = str(tmp_path / name)
+    records = (
+        TEXTS
+        if name.endswith(".txt")
+        else [{"id": i, "text": t} for i, t in enumerate(TEXTS)]
+    )
+    assert stream.write_records(records, path, fmt) == len(TEXTS)
+    assert list(stream.read_records(path, fmt)) == records
+
+    augmenter = stream.StreamAugmenter(transforms.TypoChar(probability=0.5), seed=1)
+    out = str(tmp_path / ("out_" + name))
+    stream.write_records(augmenter(stream.read_records(path)), out)
+    augmented = list(stream.read_records(out))
+    assert augmented == list(augmenter(records))
+    if isinstance(records[0], dict):
+        assert [r["id"] for r in augmented] == list(range(len(TEXTS)))
+
+
+def test_csv_column(tmp_path):
+    path = str(tmp_path / "corpus.csv")
+    records = [{"label": str(i % 2), "sentence": t} for i, t in enumerate(TEXTS)]
+    stream.write_records(records, path)
+    assert list(stream.read_records(path)) == records
+    augmenter = stream.StreamAugmenter(
+        transforms.DeleteChar(), seed=0, field="sentence"
+    )
+    for record, original in zip(augmenter(stream.read_records(path)), records):
+        assert record["label"] == original["label"]
+        assert len(record["sentence"]) == len(original["sentence"]) - 1
+
+
+def test_backpressure():
+    read = []
+    threads = threading.active_count()
+
+    def source():
+        for i in range(1000):
+            read.append(i)
+            yield TEXTS[i % len(TEXTS)]
+
+    augmenter = stream.StreamAugmenter(
+        transforms.DeleteChar(), batch_size=10, seed=0, max_pending=2
+    )
+    results = augmenter(source())
+    next(results)
+    time.sleep(0.2)
+    # the consumed batch, the full queue and the batch waiting to be queued
+    assert len(read) <= 10 * 4
+    results.close()
+    assert threading.active_count() == threads
+
+
+def test_producer_error():
+    def source():
+        yield TEXTS[0]
+        raise ValueError("broken source")
+
+    augmenter = stream.StreamAugmenter(transforms.DeleteChar(), max_pending=1)
+    with pytest.raises(ValueError):
+        list(augmenter(source()))
+
+
+def test_invalid_format():
+    with pytest.raises(AssertionError):
+        list(stream.read_records("corpus.txt", fmt="parquet"))
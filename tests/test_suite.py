@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from decepticonlp.metrics import char_metrics
+from decepticonlp.metrics import suite
+
+ORIGINALS = ["Word", "Word was", "a cat", "Word", "H"]
+PERTURBED = ["Wordy", "Word is that", "an abct", "Wordy", "H"]
+
+
+def test_metric_suite_matches_metrics():
+    metric_suite = suite.MetricSuite(
+        [
+            "levenshtein",
+            ("levenshtein", {"normalize": "lcs"}),
+            "damerau_levenshtein",
+            ("jaccard", {"ngrams": 2}),
+            (char_metrics.Euclidean(), {"norm": True}),
+        ]
+    )
+    scores = metric_suite.calculate(ORIGINALS, PERTURBED)
+    assert scores.dtype.names == (
+        "levenshtein",
+        "levenshtein(normalize=lcs)",
+        "damerau_levenshtein",
+        "jaccard(ngrams=2)",
+        "Euclidean(norm=True)",
+    )
+    assert len(scores) == len(ORIGINALS)
+    for name, metric, kwargs in metric_suite.columns:
+        expected = [
+            metric.calculate(text1, text2, **kwargs)
+            for text1, text2 in zip(ORIGINALS, PERTURBED)
+        ]
+        assert np.allclose(scores[name], expected)
+
+
+def test_metric_suite_memoises_pairs():
+    metric_suite = suite.MetricSuite(["levenshtein", "jaccard"], memo_size=2)
+    columns = metric_suite.calculate(ORIGINALS, PERTURBED, as_dict=True)
+    assert list(columns) == ["levenshtein", "jaccard"]
+    assert list(columns["levenshtein"]) == [1, 6, 4, 1, 0]
+    assert (metric_suite.hits, metric_suite.misses) == (1, 4)
+    assert len(metric_suite.memo) == 2
+
+    metric_suite.calculate(["H", "Word"], ["H", "Wrod"])
+    assert (metric_suite.hits, metric_suite.misses) == (2, 5)
+
+
+def test_metric_suite_invalid_metric():
+    with pytest.raises(AssertionError):
+        suite.MetricSuite(["hamming"])
+    with pytest.raises(AssertionError):
+        suite.MetricSuite(["levenshtein", "levenshtein"])
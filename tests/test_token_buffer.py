@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+
+from decepticonlp.extractor import basic
+from decepticonlp.transforms import perturbations
+from decepticonlp.transforms import transforms
+from decepticonlp.utils.buffer import TokenBuffer
+
+TEXTS = [
+    "Twinkle twinkle little star.",
+    "Hey, this is so fascinating!",
+    "",
+    "two  spaces",
+    "héllo \U0001d4ea",
+]
+
+
+def test_round_trip():
+    buffer = TokenBuffer.from_texts(TEXTS)
+    assert len(buffer) == len(TEXTS)
+    assert buffer.num_tokens == sum(len(text.split(" ")) for text in TEXTS)
+    assert buffer.decode() == TEXTS
+    for sentence, text in enumerate(TEXTS):
+        assert buffer.tokens(sentence) == text.split(" ")
+    assert TokenBuffer.from_texts([]).decode() == []
+
+
+def test_padded():
+    buffer = TokenBuffer.from_texts(TEXTS)
+    codes, lengths = buffer.padded([0, 13])
+    assert lengths.tolist() == [7, 5]
+    assert perturbations.decode_batch(codes, lengths) == ["Twinkle", "héllo"]
+
+
+@pytest.mark.parametrize("inplace", [False, True])
+def test_replace(inplace):
+    buffer = TokenBuffer.from_texts(TEXTS)
+    codes, lengths = perturbations.encode_batch(["Sparkle", "x", "longer words"])
+    edited = buffer.replace([0, 4, 14], codes, lengths, inplace=inplace)
+    assert edited.decode() == [
+        "Sparkle twinkle little star.",
+        "x this is so fascinating!",
+        "",
+        "two  spaces",
+        "héllo longer words",
+    ]
+    assert (edited is buffer) == inplace
+    if not inplace:
+        assert buffer.decode() == TEXTS
+
+
+def test_replace_views():
+    buffer = TokenBuffer.from_texts(TEXTS)
+    codes, lengths = perturbations.encode_batch(["Twinkle twinkle"])
+    edited = buffer.replace([0], codes, lengths)
+    assert edited.decode()[0] == "Twinkle twinkle twinkle little star."
+    # the grown token is appended, the others still point to the original codes
+    assert edited.starts[0] >= len(buffer.data)
+    assert (edited.starts[1:] == buffer.starts[1:]).all()
+
+
+def test_extract_buffer():
+    extractor = basic.RandomImportantWordExtractor()
+    buffer = TokenBuffer.from_texts(TEXTS[:2] * 3)
+    indices = extractor.extract_buffer(buffer, top_k=2, rng=0)
+    sentences = buffer.sentence_ids()[indices]
+    assert np.bincount(sentences).tolist() == [2] * 6
+    assert len(set(indices.tolist())) == len(indices)
+    assert (indices == extractor.extract_buffer(buffer, top_k=2, rng=0)).all()
+    with pytest.raises(AssertionError):
+        extractor.extract_buffer(TokenBuffer.from_texts(["Hey there"]), top_k=3)
+
+
+def test_apply_buffer():
+    buffer = TokenBuffer.from_texts(["Adversarial is fascinating"])
+    perturbation = perturbations.DeleteCharacterPerturbations()
+    edited = perturbation.apply_buffer(buffer, [0, 1, 2], rng=0)
+    words = edited.tokens(0)
+    assert words[1] == "is"
+    for word, original in zip(words, ["Adversarial", "is", "fascinating"]):
+        assert word[0] == original[0] and word[-1] == original[-1]
+    assert [len(word) for word in words] == [10, 2, 10]
+
+
+@pytest.mark.parametrize(
+    "tfms",
+    [
+        transforms.AddChar(char_perturb=True),
+        transforms.ShuffleChar(mid=False),
+        transforms.DeleteChar(),
+        transforms.TypoChar(probability=0.5),
+        transforms.VisuallySimilarChar(),
+    ],
+)
+def test_transforms_on_buffer(tfms):
+    texts = TEXTS[:2] * 4
+    buffer = TokenBuffer.from_texts(texts)
+    perturbed = tfms(buffer, rng=1).decode()
+    assert perturbed == tfms(TokenBuffer.from_texts(texts), rng=1).decode()
+    assert buffer.decode() == texts
+    changed = [
+        sum(a != b for a, b in zip(text.split(" "), new.split(" ")))
+        for text, new in zip(texts, perturbed)
+    ]
+    assert max(changed) <= 1
+
+
+def test_compose_on_buffer():
+    tfms = transforms.Compose([transforms.AddChar(), transforms.DeleteChar()])
+    buffer = TokenBuffer.from_texts(TEXTS[:2])
+    perturbed = tfms(buffer, rng=1)
+    assert isinstance(perturbed, TokenBuffer)
+    assert perturbed.decode() == tfms(buffer, rng=1).decode()
+    with pytest.raises(AssertionError):
+        tfms(buffer, return_edits=True)
+
+
+def test_extract_buffer_eligible():
+    extractor = basic.RandomImportantWordExtractor()
+    buffer = TokenBuffer.from_texts(TEXTS[:2] * 3)
+    eligible = buffer.lengths >= 4
+    indices = extractor.extract_buffer(buffer, top_k=2, rng=0, eligible=eligible)
+    assert eligible[indices].all()
+    assert np.bincount(buffer.sentence_ids()[indices]).tolist() == [2] * 6
+    short = TokenBuffer.from_texts(["a b", "Hey there"])
+    indices = extractor.extract_buffer(short, rng=0, eligible=short.lengths >= 4)
+    assert indices.tolist() == [3]
+
+
+def test_transform_counts_on_buffer():
+    tfms = transforms.DeleteChar()
+    buffer = TokenBuffer.from_texts(["a b", "Hey there", "is so far"] * 5)
+    perturbed = tfms(buffer, rng=0)
+    assert tfms.requested == 15 and tfms.applied == 10
+    changed = [a != b for a, b in zip(buffer.decode(), perturbed.decode())]
+    assert changed == [False, True, True] * 5
@@ -1,11 +1,20 @@
 __author__ = "Abheesht Sharma"
 
 import random
+
+import numpy as np
 import pytest
 
+from decepticonlp.metrics import char_metrics
 from decepticonlp.transforms import transforms
 
 
+@pytest.fixture(scope="module", autouse=True)
+def numpy_seed():
+    # the visually similar expectations below are drawn from np.random seeded with 1
+    np.random.seed(1)
+
+
 @pytest.mark.parametrize(
     "text, expected_result",
     [
@@ -109,7 +118,7 @@ def test_visually_similar_char(text, expected_result):
     [
         ("Twinkle twinkle little star.", "R winkle tknwlie little 𝒔𝘵𝖆𝘳."),
         ("Hey, this is so fascinating!", "Y̐ ey, this is so fitcgaasnin!"),
-        ("The earthen pot has cold water.", "The earthen oor has cold 𝚠 ater."),
+        ("The earthen pot has cold water.", "The earthen pot gae c01𝔡 w aetr."),
     ],
 )
 def test_compose_transforms(text, expected_result):
@@ -123,3 +132,101 @@ def test_compose_transforms(text, expected_result):
         ]
     )
     assert tfms(text) == expected_result
+
+
+def test_compose_return_edits():
+    tfms = transforms.Compose(
+        [
+            transforms.AddChar(),
+            transforms.DeleteChar(),
+            transforms.TypoChar("RandomWordExtractor", probability=0.5),
+        ]
+    )
+    text = "The earthen pot has cold water."
+    perturbed, log = tfms(text, rng=7, return_edits=True)
+    assert perturbed == tfms(text, rng=7)
+    assert log.total == sum(edit.cost for _, edit in log) > 0
+    assert log.within(log.total) and not log.within(log.total - 1)
+    levenshtein = char_metrics.Levenshtein()
+    assert levenshtein.calculate(text, perturbed) <= log.total
+
+
+def test_transform_return_edits():
+    tfms = transforms.DeleteChar()
+    perturbed, log = tfms("Twinkle twinkle", rng=0, return_edits=True)
+    [(word_index, edit)] = list(log)
+    assert edit.operation == "delete" and log.total == 1
+    assert len(perturbed.split(" ")[word_index]) == len("twinkle") - 1
+
+
+def test_transform_eligible_words():
+    tfms = transforms.ShuffleChar(mid=False)
+    text = "It is a tiny bit of an odd sentence"
+    for seed in range(20):
+        assert tfms(text, rng=seed) != text
+    assert tfms.requested == tfms.applied == 20
+    assert tfms("It is a bit odd", rng=0) == "It is a bit odd"
+    assert (tfms.requested, tfms.applied) == (21, 20)
+
+
+def test_compose_counts():
+    tfms = transforms.Compose([transforms.AddChar(), transforms.DeleteChar()])
+    tfms("The earthen pot has cold water.", rng=0)
+    assert tfms.requested == 2 and tfms.applied == 2
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_compose_tokenize(seed):
+    stages = [
+        transforms.AddChar(),
+        transforms.AddChar(char_perturb=True),
+        transforms.ShuffleChar(mid=True),
+        transforms.DeleteChar(),
+        transforms.TypoChar(probability=0.5),
+    ]
+    text = "Hey, this is so fascinating!"
+    tokens, tokens_log = transforms.Compose(stages)(text, rng=seed, return_edits=True)
+    joined, joined_log = transforms.Compose(stages, tokenize=False)(
+        text, rng=seed, return_edits=True
+    )
+    assert tokens == joined
+    assert list(tokens_log) == list(joined_log)
+
+
+def test_transform_on_words():
+    words = "The earthen pot has cold water.".split(" ")
+    tfms = transforms.AddChar()
+    assert tfms(words, rng=0) is words
+    assert " ".join(words) == tfms("The earthen pot has cold water.", rng=0)
+    assert len(words) == 7 and " " not in "".join(words)
+
+
+def test_compose_plain_callable():
+    tfms = transforms.Compose([transforms.DeleteChar(), lambda s: s.upper()])
+    perturbed = tfms("hello there", rng=0)
+    assert perturbed == perturbed.upper() and len(perturbed) == len("hello there") - 1
+
+
+def test_compose_plain_callable_edits():
+    tfms = transforms.Compose([transforms.DeleteChar(), str.upper])
+    perturbed, log = tfms("hello there", rng=0, return_edits=True)
+    assert perturbed == tfms("hello there", rng=0)
+    [(_, edit)] = list(log)
+    assert edit.operation == "delete" and log.total == 1
+    assert tfms.requested == 2 and tfms.applied == 2
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compose_tokenize_mixed_stages(seed):
+    def stages():
+        return [
+            transforms.AddChar(),
+            lambda s: s.replace("e", "E"),
+            transforms.Compose([transforms.DeleteChar(), str.lower]),
+            transforms.TypoChar(probability=0.5),
+        ]
+
+    text = "The earthen pot has cold water."
+    tokens = transforms.Compose(stages())(text, rng=seed)
+    assert isinstance(tokens, str)
+    assert tokens == transforms.Compose(stages(), tokenize=False)(text, rng=seed)